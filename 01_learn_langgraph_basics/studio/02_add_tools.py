@@ -4,11 +4,18 @@ Add Tools to LangGraph Chatbot
 """
 
 
+import asyncio
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Dict, Optional
 
 from langchain_tavily import TavilySearch
+from studies_common.search_cache import cached_search_tool
 from langchain.chat_models import init_chat_model
 from langchain_core.messages import ToolMessage
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages, MessagesState
 
@@ -18,32 +25,143 @@ class State(MessagesState):
     pass
 
 
+# Tool execution limits
+MAX_TOOL_CONCURRENCY = 4  # tool calls of a turn run at the same time
+TOOL_TIMEOUT_SECONDS = 20.0  # per call, unless overridden per tool
+MAX_TOOL_OUTPUT_CHARS = 4000  # serialized result kept in the ToolMessage
+
+
+def serialize_tool_result(result, max_chars: int = MAX_TOOL_OUTPUT_CHARS) -> str:
+    """
+    JSON-encode a tool result, truncated to max_chars.
+
+    The result is encoded chunk by chunk and encoding stops once the cap is
+    reached, so a huge result is never serialized in full. A string is a
+    single chunk, so it is cut before it is encoded instead.
+    """
+    truncated = f"... [output truncated at {max_chars} characters]"
+    if isinstance(result, str):
+        # Escaping never shortens a string: its first max_chars + 1 characters
+        # encode to the same prefix, and to more than max_chars if it is too long
+        encoded = json.dumps(result[: max_chars + 1])
+        return encoded[:max_chars] + truncated if len(encoded) > max_chars else encoded
+    parts, size = [], 0
+    for chunk in json.JSONEncoder(default=str).iterencode(result):
+        parts.append(chunk)
+        size += len(chunk)
+        if size > max_chars:
+            return "".join(parts)[:max_chars] + truncated
+    return "".join(parts)
+
+
 class BasicToolNode:
-    """A node that runs the tools requested in the last AIMessage."""
+    """A node that runs the tools requested in the last AIMessage.
+
+    Tool calls run concurrently (up to max_concurrency), each under a timeout;
+    a call that times out or fails is reported to the model as an error
+    ToolMessage instead of stalling or breaking the turn. Results are capped
+    at max_output_chars once serialized.
+
+    Async runs await `acall`; sync runs (`__call__`) run the calls in worker
+    threads, so they also work where an event loop is already running (e.g.
+    Jupyter, or an async host calling invoke inline). A timeout cancels async
+    tools in `acall`, but a tool running in a thread cannot be interrupted: the
+    call is abandoned (the turn goes on without it) and the thread keeps
+    running until the tool returns.
+    """
 
-    def __init__(self, tools: list) -> None:
+    def __init__(
+        self,
+        tools: list,
+        max_concurrency: int = MAX_TOOL_CONCURRENCY,
+        timeout: float = TOOL_TIMEOUT_SECONDS,
+        timeouts: Optional[Dict[str, float]] = None,
+        max_output_chars: int = MAX_TOOL_OUTPUT_CHARS,
+    ) -> None:
+        """
+        Args:
+            tools: Tools the model can call
+            max_concurrency: Maximum number of tool calls running at the same time
+            timeout: Seconds a tool call may run before it is cancelled (async tools
+                in acall) or abandoned (tools running in a thread, which keep running
+                in the background)
+            timeouts: Per-tool timeouts (tool name -> seconds) overriding `timeout`
+            max_output_chars: Maximum serialized size of a tool result
+        """
         self.tools_by_name = {tool.name: tool for tool in tools}
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.timeouts = timeouts or {}
+        self.max_output_chars = max_output_chars
 
-    def __call__(self, inputs: dict):
+    @staticmethod
+    def _tool_calls(inputs: dict) -> list:
         if messages := inputs.get("messages", []):
-            message = messages[-1]
-        else:
-            raise ValueError("No message found in input")
-        
+            return messages[-1].tool_calls
+        raise ValueError("No message found in input")
+
+    def __call__(self, inputs: dict):
+        tool_calls = self._tool_calls(inputs)
         outputs = []
-        for tool_call in message.tool_calls:
-            tool_result = self.tools_by_name[tool_call["name"]].invoke(
-                tool_call["args"]
-            )
-            outputs.append(
-                ToolMessage(
-                    content=json.dumps(tool_result),
-                    name=tool_call["name"],
-                    tool_call_id=tool_call["id"],
-                )
-            )
+        # Up to max_concurrency calls at a time, each in its own thread: a fresh pool
+        # per batch, so threads of abandoned calls never hold up the next batch
+        for i in range(0, len(tool_calls), self.max_concurrency):
+            batch = tool_calls[i : i + self.max_concurrency]
+            executor = ThreadPoolExecutor(max_workers=len(batch))
+            try:
+                started = time.monotonic()
+                futures = [executor.submit(self._invoke_tool, tool_call) for tool_call in batch]
+                outputs += [
+                    self._collect_tool(tool_call, future, started)
+                    for tool_call, future in zip(batch, futures)
+                ]
+            finally:
+                # Don't wait for abandoned calls: they finish in the background
+                executor.shutdown(wait=False)
         return {"messages": outputs}
 
+    def _invoke_tool(self, tool_call: dict):
+        return self.tools_by_name[tool_call["name"]].invoke(tool_call["args"])
+
+    def _collect_tool(self, tool_call: dict, future, started: float) -> ToolMessage:
+        """Wait for one threaded tool call until its timeout (counted from `started`)."""
+        name = tool_call["name"]
+        timeout = self.timeouts.get(name, self.timeout)
+        status = "success"
+        try:
+            tool_result = future.result(timeout=max(0.0, started + timeout - time.monotonic()))
+            content = serialize_tool_result(tool_result, self.max_output_chars)
+        except FutureTimeoutError:
+            content, status = f"Error: {name} timed out after {timeout:g} s", "error"
+        except Exception as e:
+            content, status = f"Error: {name} failed: {e!r}", "error"
+        return ToolMessage(content=content, name=name, tool_call_id=tool_call["id"], status=status)
+
+    async def acall(self, inputs: dict):
+        tool_calls = self._tool_calls(inputs)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        outputs = await asyncio.gather(
+            *(self._run_tool(tool_call, semaphore) for tool_call in tool_calls)
+        )
+        return {"messages": list(outputs)}
+
+    async def _run_tool(self, tool_call: dict, semaphore: asyncio.Semaphore) -> ToolMessage:
+        """Run one tool call under the concurrency limit and its timeout."""
+        name = tool_call["name"]
+        timeout = self.timeouts.get(name, self.timeout)
+        status = "success"
+        async with semaphore:
+            try:
+                tool_result = await asyncio.wait_for(
+                    self.tools_by_name[name].ainvoke(tool_call["args"]), timeout
+                )
+                content = serialize_tool_result(tool_result, self.max_output_chars)
+            except asyncio.TimeoutError:
+                content, status = f"Error: {name} timed out after {timeout:g} s", "error"
+            except Exception as e:
+                content, status = f"Error: {name} failed: {e!r}", "error"
+        return ToolMessage(content=content, name=name, tool_call_id=tool_call["id"], status=status)
+
 
 def route_tools(state: State):
     """
@@ -74,7 +192,7 @@ def stream_graph_updates(graph, user_input: str):
             print("Assistant:", value["messages"][-1].content)
 
 
-tool = TavilySearch(max_results=2)
+tool = cached_search_tool(TavilySearch(max_results=2))
 tools = [tool]
 tool_node = BasicToolNode(tools=[tool])
 
@@ -83,7 +201,8 @@ llm_with_tools = llm.bind_tools(tools)
 
 graph_builder = StateGraph(State)
 graph_builder.add_node("chatbot", chatbot)
-graph_builder.add_node("tools", tool_node)
+# Sync runs call the node, async runs (e.g. the LangGraph server) await acall
+graph_builder.add_node("tools", RunnableLambda(tool_node, afunc=tool_node.acall))
 graph_builder.add_conditional_edges(
     "chatbot",
     route_tools,
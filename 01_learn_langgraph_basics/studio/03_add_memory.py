@@ -6,6 +6,7 @@
 
 from langchain.chat_models import init_chat_model
 from langchain_tavily import TavilySearch
+from studies_common.search_cache import cached_search_tool
 from typing_extensions import TypedDict
 
 from langgraph.graph import StateGraph
@@ -24,7 +25,7 @@ def chatbot(state: State):
 
 
     
-tool = TavilySearch(max_results=2)
+tool = cached_search_tool(TavilySearch(max_results=2))
 tools = [tool]
 tool_node = ToolNode(tools=[tool])
 
@@ -5,6 +5,7 @@
 
 from langchain.chat_models import init_chat_model
 from langchain_tavily import TavilySearch
+from studies_common.search_cache import cached_search_tool
 from langchain_core.tools import tool
 
 from langgraph.graph import StateGraph, START
@@ -37,7 +38,7 @@ def chatbot(state: State):
     return {"messages": [message]}
 
 
-search_tool = TavilySearch(max_results=2)
+search_tool = cached_search_tool(TavilySearch(max_results=2))
 tools = [search_tool, human_assistance]
 tool_node = ToolNode(tools=tools)
 
@@ -9,6 +9,7 @@ from langchain.chat_models import init_chat_model
 from langchain_core.messages import ToolMessage
 from langchain_core.tools import InjectedToolCallId, tool
 from langchain_tavily import TavilySearch
+from studies_common.search_cache import cached_search_tool
 
 from langgraph.types import Command, interrupt
 from langgraph.graph import StateGraph, START
@@ -63,7 +64,7 @@ def chatbot(state: State):
     assert len(message.tool_calls) <= 1
     return {"messages": [message]}
 
-search_tool = TavilySearch(max_results=2)
+search_tool = cached_search_tool(TavilySearch(max_results=2))
 tools = [search_tool, human_assistance]
 tool_node = ToolNode(tools=tools)
 
@@ -4,6 +4,7 @@ Time Travel Chatbot using LangGraph
 
 from langchain_openai import ChatOpenAI
 from langchain_tavily import TavilySearch
+from studies_common.search_cache import cached_search_tool
 
 from langgraph.graph import StateGraph, START
 from langgraph.graph.message import MessagesState
@@ -18,7 +19,7 @@ def chatbot(state: State):
     return {"messages": [llm_with_tools.invoke(state["messages"])]}
 
 
-tool = TavilySearch(max_results=2)
+tool = cached_search_tool(TavilySearch(max_results=2))
 tools = [tool]
 
 llm = ChatOpenAI(model="gpt-4o-mini")
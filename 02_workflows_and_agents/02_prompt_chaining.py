@@ -1,12 +1,22 @@
 from typing_extensions import TypedDict
 from langgraph.graph import StateGraph, START, END
 from langchain_openai import ChatOpenAI
+from pathlib import Path
 from util import get_openai_api_key, save_workflow_png
+from studies_common.node_cache import NodeCache, node_cache_policy
 
 
 # Initialize the LLM
 llm = ChatOpenAI(model="gpt-4o", api_key=get_openai_api_key())
 
+# Cache of the node results (in memory, persisted across runs): a repeated topic skips the
+# LLM calls whose inputs and model are unchanged. Delete the file to start from scratch.
+NODE_CACHE_PATH = Path(__file__).resolve().parent / ".node_cache.sqlite"
+node_cache = NodeCache(path=NODE_CACHE_PATH)
+# The jokes are sampled at the default temperature: an entry expires after an hour,
+# so a repeated topic gets a new joke instead of the same one forever
+NODE_CACHE_TTL = 60 * 60
+
 
 # Graph state
 class State(TypedDict):
@@ -50,10 +60,10 @@ def polish_joke(state: State):
 # Build workflow
 workflow = StateGraph(State)
 
-# Add nodes
-workflow.add_node("generate_joke", generate_joke)
-workflow.add_node("improve_joke", improve_joke)
-workflow.add_node("polish_joke", polish_joke)
+# Add nodes (each cached by the state keys it reads and the model, for NODE_CACHE_TTL seconds)
+workflow.add_node("generate_joke", generate_joke, cache_policy=node_cache_policy("topic", llm=llm, ttl=NODE_CACHE_TTL))
+workflow.add_node("improve_joke", improve_joke, cache_policy=node_cache_policy("joke", llm=llm, ttl=NODE_CACHE_TTL))
+workflow.add_node("polish_joke", polish_joke, cache_policy=node_cache_policy("improved_joke", llm=llm, ttl=NODE_CACHE_TTL))
 
 # Add edges to connect nodes
 workflow.add_edge(START, "generate_joke")
@@ -64,7 +74,7 @@ workflow.add_edge("improve_joke", "polish_joke")
 workflow.add_edge("polish_joke", END)
 
 # Compile
-chain = workflow.compile()
+chain = workflow.compile(cache=node_cache)
 
 # Save the workflow
 save_workflow_png(chain, "02_prompt_chaining.png")
@@ -78,3 +88,4 @@ state = chain.invoke({"topic": "cats"})
 print("--------------------------------")
 print("# Joke:")
 print(state)
+print(f"# Node cache: {node_cache.stats.summary()}")
@@ -1,5 +1,8 @@
+import asyncio
+import time
 from typing_extensions import TypedDict
 from langgraph.graph import StateGraph, START, END
+from langgraph.types import StreamWriter
 from langchain_openai import ChatOpenAI
 from typing_extensions import TypedDict
 from util import get_openai_api_key, save_workflow_png
@@ -8,6 +11,12 @@ from util import get_openai_api_key, save_workflow_png
 # Initialize the LLM
 llm = ChatOpenAI(model="gpt-4o", api_key=get_openai_api_key())
 
+# Maximum number of LLM calls running at once (None = no limit)
+MAX_CONCURRENCY = 10
+
+# Stream each section to the client as it is generated (False: print the combined output at the end)
+STREAM_SECTIONS = True
+
 
 # Graph state
 class State(TypedDict):
@@ -18,26 +27,46 @@ class State(TypedDict):
     combined_output: str
 
 
+async def stream_section(writer: StreamWriter, section: str, prompt: str) -> str:
+    """
+    Generate one section, streaming its tokens to the client as they arrive.
+    
+    Emits {"section", "token"} events and a final {"section", "done"} event on
+    the "custom" stream mode; when the graph is not streamed, the writer is a no-op.
+    
+    Returns:
+        Full text of the section
+    """
+    content = ""
+    async for chunk in llm.astream(prompt):
+        content += chunk.content
+        writer({"section": section, "token": chunk.content})
+    writer({"section": section, "done": True})
+    return content
+
+
 # Nodes
-def call_llm_1(state: State):
+# The LLM calls are async: the branches run concurrently on the event loop
+# (astream), instead of each one holding an executor thread while it waits
+async def call_llm_1(state: State, writer: StreamWriter):
     """First LLM call to generate initial joke"""
     print("Generating joke...")
-    msg = llm.invoke(f"Write a joke about {state['topic']}")
-    return {"joke": msg.content}
+    joke = await stream_section(writer, "joke", f"Write a joke about {state['topic']}")
+    return {"joke": joke}
 
 
-def call_llm_2(state: State):
+async def call_llm_2(state: State, writer: StreamWriter):
     """Second LLM call to generate story"""
     print("Generating story...")
-    msg = llm.invoke(f"Write a story about {state['topic']}")
-    return {"story": msg.content}
+    story = await stream_section(writer, "story", f"Write a story about {state['topic']}")
+    return {"story": story}
 
 
-def call_llm_3(state: State):
+async def call_llm_3(state: State, writer: StreamWriter):
     """Third LLM call to generate poem"""
     print("Generating poem...")
-    msg = llm.invoke(f"Write a poem about {state['topic']}")
-    return {"poem": msg.content}
+    poem = await stream_section(writer, "poem", f"Write a poem about {state['topic']}")
+    return {"poem": poem}
 
 
 def aggregator(state: State):
@@ -67,15 +96,83 @@ parallel_builder.add_edge("call_llm_1", "aggregator")
 parallel_builder.add_edge("call_llm_2", "aggregator")
 parallel_builder.add_edge("call_llm_3", "aggregator")
 parallel_builder.add_edge("aggregator", END)
-parallel_workflow = parallel_builder.compile()
+parallel_workflow = parallel_builder.compile().with_config(max_concurrency=MAX_CONCURRENCY)
 
 # Save the workflow
 save_workflow_png(parallel_workflow, "03_parallelization.png")
 
 
-# Invoke
-state = parallel_workflow.invoke({"topic": "cats"})
+async def stream_sections(workflow, inputs: dict) -> dict:
+    """
+    Run the workflow and print each section as soon as it is generated.
+    
+    One section at a time is printed token by token; the tokens of the other
+    sections are buffered and printed in one go when their turn comes, finished
+    sections first. The first content therefore shows up with the first token
+    of any branch, and the fastest branch is never held back by the slowest.
+    A section that finishes without any token is still printed (empty), and
+    the combined output is printed once the stream ends.
+    
+    Returns:
+        Final state of the workflow (with the combined output)
+    """
+    start = time.perf_counter()
+    buffers, done, printed = {}, set(), set()
+    live, state, first_token_at = None, None, None
+
+    def print_section(section):
+        print(f"\n--- {section.upper()} ---")
+        print(buffers.get(section, ""), end="", flush=True)
+
+    async for mode, data in workflow.astream(inputs, stream_mode=["custom", "values"]):
+        if mode == "values":
+            state = data
+            continue
+        section = data["section"]
+        if "token" in data:
+            first_token_at = first_token_at or time.perf_counter() - start
+            buffers[section] = buffers.get(section, "") + data["token"]
+            if live is None:
+                live = section
+                printed.add(section)
+                print_section(section)
+            elif section == live:
+                print(data["token"], end="", flush=True)
+        if data.get("done"):
+            done.add(section)
+            buffers.setdefault(section, "")
+            if live is None and section not in printed:
+                # Finished without a token while no other section was live
+                printed.add(section)
+                print_section(section)
+                print(f"\n[{section} done after {time.perf_counter() - start:.2f} s]")
+            elif section == live:
+                print(f"\n[{section} done after {time.perf_counter() - start:.2f} s]")
+                # Flush the sections that finished meanwhile, then follow the furthest one still running
+                for finished in [s for s in buffers if s in done and s not in printed]:
+                    printed.add(finished)
+                    print_section(finished)
+                    print(f"\n[{finished} done]")
+                running = [s for s in buffers if s not in done]
+                live = max(running, key=lambda s: len(buffers[s])) if running else None
+                if live:
+                    printed.add(live)
+                    print_section(live)
+
+    # Sections still buffered (e.g. finished after the last live one without a token)
+    for finished in [s for s in buffers if s not in printed]:
+        print_section(finished)
+        print(f"\n[{finished} done]")
+
+    print(f"\nFirst token after {first_token_at or 0:.2f} s, all sections after {time.perf_counter() - start:.2f} s")
+    return state
+
 
+# Invoke
+if STREAM_SECTIONS:
+    state = asyncio.run(stream_sections(parallel_workflow, {"topic": "cats"}))
+else:
+    state = asyncio.run(parallel_workflow.ainvoke({"topic": "cats"}))
 
 # Print the output
 print("--------------------------------")
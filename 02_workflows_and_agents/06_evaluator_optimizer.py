@@ -1,6 +1,8 @@
-from typing import Literal
+import time
+from typing import List, Literal
 from pydantic import BaseModel, Field
 from langchain_openai import ChatOpenAI
+from langgraph.errors import GraphRecursionError
 from langgraph.graph import StateGraph, START, END
 from langchain_core.messages import SystemMessage, HumanMessage
 from typing_extensions import TypedDict
@@ -10,6 +12,11 @@ from util import get_openai_api_key, save_workflow_png
 # Initialize the LLM
 llm = ChatOpenAI(model="gpt-4o", api_key=get_openai_api_key())
 
+# Batched mode: candidates written (and graded) per round, and the budget of the loop
+CANDIDATES_PER_ROUND = 4
+MAX_ROUNDS = 3
+LATENCY_BUDGET_SECONDS = 60
+
 
 # Graph state
 class State(TypedDict):
@@ -33,6 +40,23 @@ class Feedback(BaseModel):
 evaluator = llm.with_structured_output(Feedback)
 
 
+# Schemas for the batched mode: several jokes written, then graded, in one call each
+class Jokes(BaseModel):
+    jokes: List[str] = Field(
+        description="The jokes, each one different from the others.",
+    )
+
+
+class BatchFeedback(BaseModel):
+    grades: List[Feedback] = Field(
+        description="One grade per joke, in the same order as the jokes.",
+    )
+
+
+batch_generator = llm.with_structured_output(Jokes)
+batch_evaluator = llm.with_structured_output(BatchFeedback)
+
+
 # Nodes
 def llm_call_generator(state: State):
     """LLM generates a joke"""
@@ -85,14 +109,124 @@ optimizer_builder.add_conditional_edges(
 # Compile the workflow
 optimizer_workflow = optimizer_builder.compile()
 
-# Save the workflow
-save_workflow_png(optimizer_workflow, "06_evaluator_optimizer.png")
 
-# Invoke
-state = optimizer_workflow.invoke({"topic": "Cats"})
+# Batched mode: N candidates per round, generated in one call and graded in one call
+class BatchState(TypedDict):
+    topic: str
+    candidates: list[str]
+    joke: str
+    feedback: str
+    funny_or_not: str
+    rounds: int
+    started_at: float
+
 
+def batch_start(state: BatchState):
+    """Reset the budget and the previous run's result (a Studio thread keeps its state across runs)"""
+
+    return {"rounds": 0, "started_at": time.time(), "candidates": [], "joke": "", "feedback": "", "funny_or_not": ""}
+
+
+def batch_call_generator(state: BatchState):
+    """LLM writes a round of candidate jokes in a single call"""
+
+    prompt = f"Write {CANDIDATES_PER_ROUND} different jokes about {state['topic']}"
+    if state.get("feedback"):
+        prompt += f" and take into account the feedback on the previous ones: {state['feedback']}"
+    jokes = batch_generator.invoke(prompt).jokes[:CANDIDATES_PER_ROUND]
+    return {"candidates": jokes, "rounds": state["rounds"] + 1}
 
-# Print the output
-print("--------------------------------")
-print("# Joke:")
-print(state)
\ No newline at end of file
+
+def grade_candidates(candidates: List[str], attempts: int = 2) -> List[Feedback]:
+    """Grade the jokes in one call, asking again if the number of grades does not match"""
+
+    numbered = "\n".join(f"{i + 1}. {joke}" for i, joke in enumerate(candidates))
+    prompt = f"Grade each of these {len(candidates)} jokes, exactly one grade per joke:\n{numbered}"
+    for _ in range(attempts):
+        grades = batch_evaluator.invoke(prompt).grades
+        if len(grades) == len(candidates):
+            return grades
+    raise ValueError(f"Expected {len(candidates)} grades, got {len(grades)} after {attempts} attempts")
+
+
+def batch_call_evaluator(state: BatchState):
+    """LLM grades the whole round in a single call and keeps the first funny joke"""
+
+    if not state["candidates"]:
+        # The generator returned no jokes: the round counts, ask again
+        return {"funny_or_not": "not funny", "feedback": f"No jokes were written, write {CANDIDATES_PER_ROUND}."}
+
+    grades = grade_candidates(state["candidates"])
+    for joke, grade in zip(state["candidates"], grades, strict=True):
+        if grade.grade == "funny":
+            return {"joke": joke, "funny_or_not": "funny", "feedback": grade.feedback}
+
+    # Nothing accepted: keep the first candidate and pass all the feedback to the next round
+    feedback = " ".join(grade.feedback for grade in grades)
+    return {"joke": state["candidates"][0], "funny_or_not": "not funny", "feedback": feedback}
+
+
+def route_batch(state: BatchState):
+    """Stop on the first accepted joke or when the round/latency budget is spent"""
+
+    if state["funny_or_not"] == "funny":
+        return "Accepted"
+    if state["rounds"] >= MAX_ROUNDS or time.time() - state["started_at"] >= LATENCY_BUDGET_SECONDS:
+        return "Budget exhausted"
+    return "Rejected + Feedback"
+
+
+batch_optimizer_builder = StateGraph(BatchState)
+batch_optimizer_builder.add_node("start", batch_start)
+batch_optimizer_builder.add_node("llm_call_generator", batch_call_generator)
+batch_optimizer_builder.add_node("llm_call_evaluator", batch_call_evaluator)
+batch_optimizer_builder.add_edge(START, "start")
+batch_optimizer_builder.add_edge("start", "llm_call_generator")
+batch_optimizer_builder.add_edge("llm_call_generator", "llm_call_evaluator")
+batch_optimizer_builder.add_conditional_edges(
+    "llm_call_evaluator",
+    route_batch,
+    {
+        "Accepted": END,
+        "Budget exhausted": END,
+        "Rejected + Feedback": "llm_call_generator",
+    },
+)
+batch_optimizer_workflow = batch_optimizer_builder.compile()
+
+# Save the workflow
+save_workflow_png(optimizer_workflow, "06_evaluator_optimizer.png")
+save_workflow_png(batch_optimizer_workflow, "06_evaluator_optimizer_batched.png")
+
+
+def run_and_measure(workflow, inputs: dict, config: dict = None):
+    """Run a workflow and return (final state, generator rounds, wall time)"""
+    start = time.perf_counter()
+    rounds, state = 0, None
+    try:
+        for mode, data in workflow.stream(inputs, config, stream_mode=["updates", "values"]):
+            if mode == "updates":
+                rounds += "llm_call_generator" in data
+            else:
+                state = data
+    except GraphRecursionError:
+        # Step budget spent without an accepted joke: report the last one
+        pass
+    return state, rounds, time.perf_counter() - start
+
+
+# The one-joke-at-a-time loop has no budget of its own: give it the same number of
+# rounds (a generator and an evaluator step each) so it cannot loop forever
+runs = [
+    ("one joke per round", optimizer_workflow, {"recursion_limit": 2 * MAX_ROUNDS}),
+    ("batched", batch_optimizer_workflow, None),
+]
+
+# Invoke: the one-joke-at-a-time loop, then the batched mode
+for name, workflow, config in runs:
+    state, rounds, wall = run_and_measure(workflow, {"topic": "Cats"}, config)
+
+    # Print the output
+    print("--------------------------------")
+    print(f"# Joke ({name}): {rounds} rounds, {wall:.2f} s, {state['funny_or_not']}")
+    print(state["joke"])
\ No newline at end of file
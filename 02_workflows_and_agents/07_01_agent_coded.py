@@ -4,6 +4,7 @@ from langgraph.graph import START, StateGraph, MessagesState
 from util import get_openai_api_key, save_workflow_png
 from typing import Literal
 from langchain_core.tools import tool
+from studies_common.calculator import evaluate_expression
 
 
 # Define tools
@@ -41,7 +42,9 @@ def divide(a: int, b: int) -> float:
 llm = ChatOpenAI(model="gpt-4o", api_key=get_openai_api_key())
 
 # Augment the LLM with tools
-tools = [add, multiply, divide]
+# evaluate_expression computes a whole calculation in one call (one LLM round trip
+# instead of one per add/multiply/divide step)
+tools = [tool(evaluate_expression), add, multiply, divide]
 tools_by_name = {tool.name: tool for tool in tools} # Map tool name to tool function
 llm_with_tools = llm.bind_tools(tools)
 
@@ -55,7 +58,9 @@ def llm_call(state: MessagesState):
             llm_with_tools.invoke(
                 [
                     SystemMessage(
-                        content="You are a helpful assistant tasked with performing arithmetic on a set of inputs."
+                        content="You are a helpful assistant tasked with performing arithmetic on a set of inputs. "
+                        "Write the whole calculation as a single expression and compute it with one evaluate_expression call; "
+                        "only use add, multiply or divide for a single step."
                     )
                 ]
                 + state["messages"]
@@ -70,7 +75,12 @@ def tool_node(state: dict):
     result = []
     for tool_call in state["messages"][-1].tool_calls:
         tool = tools_by_name[tool_call["name"]]
-        observation = tool.invoke(tool_call["args"])
+        # A bad expression (or a division by zero) is reported to the model instead of ending the run
+        try:
+            observation = tool.invoke(tool_call["args"])
+        except Exception as e:
+            result.append(ToolMessage(content=f"Error: {e!r}", tool_call_id=tool_call["id"], status="error"))
+            continue
         result.append(ToolMessage(content=observation, tool_call_id=tool_call["id"]))
     return {"messages": result}
 
@@ -0,0 +1,100 @@
+"""
+Benchmark: chained arithmetic tools vs. a single expression-evaluation tool.
+
+Runs the same multi-step arithmetic tasks through two prebuilt ReAct agents:
+
+- "tool chain": add / multiply / divide, one tool call per step (as in 07_02_agent_prebuilt.py)
+- "expression": evaluate_expression, the whole calculation in one call
+
+and reports the number of LLM round trips and the wall time per task.
+Needs OPENAI_API_KEY.
+"""
+
+import time
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.tools import tool
+from langchain_openai import ChatOpenAI
+from langgraph.prebuilt import create_react_agent
+from util import get_openai_api_key
+from studies_common.calculator import evaluate_expression
+
+
+@tool
+def add(a: int, b: int) -> int:
+    """Adds a and b.
+
+    Args:
+        a: first int
+        b: second int
+    """
+    return a + b
+
+@tool
+def multiply(a: int, b: int) -> int:
+    """Multiplies a and b.
+
+    Args:
+        a: first int
+        b: second int
+    """
+    return a * b
+
+@tool
+def divide(a: int, b: int) -> float:
+    """Divide a and b.
+
+    Args:
+        a: first int
+        b: second int
+    """
+    return a / b
+
+
+TASKS = [
+    "Add 3 and 4. Multiply the output by 2. Divide the output by 5",
+    "Add 10 and 20. Multiply the output by 3. Divide the output by 4",
+    "Multiply 6 by 7. Add 8 to the output. Divide the output by 2",
+]
+REPEATS = 3
+
+
+llm = ChatOpenAI(model="gpt-4o", temperature=0, api_key=get_openai_api_key())
+
+agents = {
+    "tool chain": create_react_agent(
+        llm,
+        tools=[add, multiply, divide],
+        prompt="You are a helpful assistant tasked with performing arithmetic on a set of inputs.",
+    ),
+    "expression": create_react_agent(
+        llm,
+        tools=[evaluate_expression],
+        prompt=(
+            "You are a helpful assistant tasked with performing arithmetic on a set of inputs. "
+            "Write the whole calculation as a single expression and compute it with one evaluate_expression call."
+        ),
+    ),
+}
+
+
+if __name__ == "__main__":
+    print(f"{'agent':<12} {'task':<64} {'LLM calls':>9} {'tool calls':>10} {'wall (s)':>9}")
+    totals = {name: [0, 0.0] for name in agents}
+    for task in TASKS:
+        for name, agent in agents.items():
+            round_trips, tool_calls, wall = 0, 0, 0.0
+            for _ in range(REPEATS):
+                start = time.perf_counter()
+                output = agent.invoke({"messages": [HumanMessage(content=task)]})
+                wall += time.perf_counter() - start
+                ai_messages = [m for m in output["messages"] if isinstance(m, AIMessage)]
+                round_trips += len(ai_messages)
+                tool_calls += sum(len(m.tool_calls) for m in ai_messages)
+            totals[name][0] += round_trips
+            totals[name][1] += wall
+            print(f"{name:<12} {task:<64} {round_trips / REPEATS:>9.1f} {tool_calls / REPEATS:>10.1f} {wall / REPEATS:>9.2f}")
+
+    print("--------------------------------")
+    runs = len(TASKS) * REPEATS
+    for name, (round_trips, wall) in totals.items():
+        print(f"{name:<12} avg LLM calls per task: {round_trips / runs:.1f}, avg wall time: {wall / runs:.2f}s")
@@ -0,0 +1,146 @@
+"""
+Offline benchmark: sync (thread) vs. async fan-out in the parallelization workflow.
+
+Builds the 03_parallelization.py graph with N LLM branches fanned out from
+START and runs it with a fake chat model that only waits (fixed latency per
+call), comparing:
+
+- "sync threads": sync nodes calling llm.invoke, run with graph.invoke
+  (concurrency bounded by the executor's thread pool)
+- "async": async nodes calling llm.ainvoke, run with graph.ainvoke, with
+  and without a max_concurrency limit
+
+at 3, 30 and 300 branches. Reports wall time, the peak number of LLM calls in
+flight and the effective parallelism (total LLM latency / wall time).
+No API keys or network access are needed.
+"""
+
+import asyncio
+import operator
+import threading
+import time
+from typing import Annotated, Any, List, Optional
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langgraph.graph import END, START, StateGraph
+from typing_extensions import TypedDict
+
+
+BRANCH_COUNTS = [3, 30, 300]
+LATENCY = 0.5  # seconds per fake LLM call
+MAX_CONCURRENCY = 50  # limit used by the "async, max_concurrency" run
+
+
+class FakeLatencyChatModel(BaseChatModel):
+    """Chat model that waits `latency` seconds and echoes the prompt, tracking calls in flight."""
+
+    latency: float = LATENCY
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    lock: Any = None
+
+    def model_post_init(self, __context: Any) -> None:
+        self.lock = threading.Lock()
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-latency"
+
+    def reset(self) -> None:
+        self.in_flight = self.peak_in_flight = 0
+
+    def _enter(self) -> None:
+        with self.lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def _exit(self) -> None:
+        with self.lock:
+            self.in_flight -= 1
+
+    def _result(self, messages: List[BaseMessage]) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=f"Re: {messages[-1].content}"))])
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> ChatResult:
+        self._enter()
+        try:
+            time.sleep(self.latency)
+        finally:
+            self._exit()
+        return self._result(messages)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> ChatResult:
+        self._enter()
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self._exit()
+        return self._result(messages)
+
+
+# Graph state: one output per branch
+class State(TypedDict):
+    topic: str
+    outputs: Annotated[list, operator.add]
+    combined_output: str
+
+
+def build_parallel_workflow(llm: BaseChatModel, num_branches: int, use_async: bool):
+    """Parallelization workflow with `num_branches` LLM calls fanned out from START."""
+
+    def make_branch(i: int):
+        if use_async:
+            async def call_llm(state: State):
+                msg = await llm.ainvoke(f"Write piece {i} about {state['topic']}")
+                return {"outputs": [msg.content]}
+        else:
+            def call_llm(state: State):
+                msg = llm.invoke(f"Write piece {i} about {state['topic']}")
+                return {"outputs": [msg.content]}
+        return call_llm
+
+    def aggregator(state: State):
+        return {"combined_output": "\n\n".join(state["outputs"])}
+
+    builder = StateGraph(State)
+    builder.add_node("aggregator", aggregator)
+    for i in range(num_branches):
+        builder.add_node(f"call_llm_{i + 1}", make_branch(i + 1))
+        builder.add_edge(START, f"call_llm_{i + 1}")
+        builder.add_edge(f"call_llm_{i + 1}", "aggregator")
+    builder.add_edge("aggregator", END)
+    return builder.compile()
+
+
+def report(name: str, num_branches: int, llm: FakeLatencyChatModel, state: dict, wall: float) -> None:
+    assert len(state["outputs"]) == num_branches
+    parallelism = num_branches * llm.latency / wall
+    print(f"{name:<26} branches={num_branches:<4} wall={wall:7.2f} s  "
+          f"peak in flight={llm.peak_in_flight:<4} effective parallelism={parallelism:6.1f}x")
+
+
+if __name__ == "__main__":
+    print(f"Fake LLM latency {LATENCY * 1000:.0f} ms per call\n")
+    llm = FakeLatencyChatModel()
+
+    for num_branches in BRANCH_COUNTS:
+        sync_workflow = build_parallel_workflow(llm, num_branches, use_async=False)
+        async_workflow = build_parallel_workflow(llm, num_branches, use_async=True)
+
+        llm.reset()
+        start = time.perf_counter()
+        state = sync_workflow.invoke({"topic": "cats"})
+        report("sync threads", num_branches, llm, state, time.perf_counter() - start)
+
+        llm.reset()
+        start = time.perf_counter()
+        state = asyncio.run(async_workflow.ainvoke({"topic": "cats"}))
+        report("async", num_branches, llm, state, time.perf_counter() - start)
+
+        llm.reset()
+        start = time.perf_counter()
+        state = asyncio.run(async_workflow.ainvoke({"topic": "cats"}, {"max_concurrency": MAX_CONCURRENCY}))
+        report(f"async, max_concurrency={MAX_CONCURRENCY}", num_branches, llm, state, time.perf_counter() - start)
+        print()
@@ -0,0 +1,197 @@
+"""
+Offline benchmark: orchestrator-worker fan-out against a rate-limited model server.
+
+Starts a local fake OpenAI-compatible chat completions server that enforces a
+requests-per-window and tokens-per-window limit (HTTP 429 with a retry-after
+header when exceeded, like the real API) and writes a planned report with
+ChatOpenAI pointed at it:
+
+- "unbounded": one Send per section, every worker fires at once and relies on
+  the client's retries after 429s (the original 05_orchestrator_worker.py)
+- "scheduled": workers are admitted by RateLimitScheduler (studies_common/rate_limits.py)
+  against the same limits, in plan order
+
+Reports wall time, 429 responses, token throughput and the time at which the
+first sections of the plan were written. The one-minute provider window is
+scaled down to WINDOW_SECONDS so the benchmark runs in seconds.
+No API keys or network access are needed.
+"""
+
+import json
+import operator
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Annotated, List
+
+from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_openai import ChatOpenAI
+from langgraph.graph import END, START, StateGraph
+from langgraph.types import Send
+from typing_extensions import TypedDict
+
+from studies_common.rate_limits import RateLimitScheduler
+
+
+NUM_SECTIONS = 24
+WINDOW_SECONDS = 5.0  # stands in for the provider's one-minute window
+REQUESTS_PER_WINDOW = 10
+TOKENS_PER_WINDOW = 4000
+COMPLETION_TOKENS = 500  # tokens written per section
+LATENCY = 0.3  # seconds per accepted request
+
+
+# ============================================================================
+# RATE-LIMITED FAKE MODEL SERVER
+# ============================================================================
+
+class FakeModelServer(ThreadingHTTPServer):
+    """Chat completions endpoint with a sliding-window request and token limit."""
+
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), FakeModelHandler)
+        self.lock = threading.Lock()
+        self.window = deque()  # (time, tokens) of the accepted requests
+        self.accepted = 0
+        self.rejected = 0
+        self.tokens = 0
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+    def admit(self, tokens: int) -> float:
+        """Record the request and return 0, or the seconds to wait if it is over the limit."""
+        with self.lock:
+            now = time.monotonic()
+            while self.window and now - self.window[0][0] >= WINDOW_SECONDS:
+                self.window.popleft()
+            used = sum(t for _, t in self.window)
+            if len(self.window) < REQUESTS_PER_WINDOW and used + tokens <= TOKENS_PER_WINDOW:
+                self.window.append((now, tokens))
+                self.accepted += 1
+                self.tokens += tokens
+                return 0.0
+            self.rejected += 1
+            return max(self.window[0][0] + WINDOW_SECONDS - now, 0.05)
+
+
+class FakeModelHandler(BaseHTTPRequestHandler):
+    def do_POST(self) -> None:
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt_tokens = sum(len(str(m.get("content", ""))) for m in request["messages"]) // 4
+        total_tokens = prompt_tokens + COMPLETION_TOKENS
+
+        retry_after = self.server.admit(total_tokens)
+        if retry_after:
+            self._send(429, {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}},
+                       {"retry-after-ms": str(int(retry_after * 1000))})
+            return
+
+        time.sleep(LATENCY)
+        self._send(200, {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "lorem " * COMPLETION_TOKENS},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": COMPLETION_TOKENS, "total_tokens": total_tokens},
+        })
+
+    def _send(self, status: int, body: dict, headers: dict = None) -> None:
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+# ============================================================================
+# ORCHESTRATOR-WORKER FAN-OUT
+# ============================================================================
+
+class State(TypedDict):
+    topic: str
+    sections: List[str]
+    completed_sections: Annotated[list, operator.add]
+
+
+class WorkerState(TypedDict):
+    section: str
+    index: int
+
+
+def build_workflow(llm: ChatOpenAI, scheduler: RateLimitScheduler = None, written_at: dict = None):
+    """Fixed plan of NUM_SECTIONS sections, each written by an llm_call worker."""
+    start = time.monotonic()
+
+    def orchestrator(state: State):
+        return {"sections": [f"Section {i + 1} of a report on {state['topic']}" for i in range(NUM_SECTIONS)]}
+
+    def llm_call(state: WorkerState):
+        messages = [
+            SystemMessage(content="Write a report section following the provided name. Use markdown formatting."),
+            HumanMessage(content=f"Here is the section name: {state['section']}"),
+        ]
+        if scheduler is not None:
+            estimated_tokens = count_tokens_approximately(messages) + COMPLETION_TOKENS
+            reservation = scheduler.acquire(estimated_tokens, priority=state["index"])
+            section = llm.invoke(messages)
+            scheduler.settle(reservation, (section.usage_metadata or {}).get("total_tokens"))
+        else:
+            section = llm.invoke(messages)
+        written_at[state["index"]] = time.monotonic() - start
+        return {"completed_sections": [section.content]}
+
+    def assign_workers(state: State):
+        return [Send("llm_call", {"section": s, "index": i}) for i, s in enumerate(state["sections"])]
+
+    builder = StateGraph(State)
+    builder.add_node("orchestrator", orchestrator)
+    builder.add_node("llm_call", llm_call)
+    builder.add_edge(START, "orchestrator")
+    builder.add_conditional_edges("orchestrator", assign_workers, ["llm_call"])
+    builder.add_edge("llm_call", END)
+    return builder.compile()
+
+
+def run(name: str, use_scheduler: bool) -> None:
+    server = FakeModelServer()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    llm = ChatOpenAI(model="gpt-4o", base_url=server.base_url, api_key="fake", max_retries=50)
+    scheduler = RateLimitScheduler(REQUESTS_PER_WINDOW, TOKENS_PER_WINDOW, window_seconds=WINDOW_SECONDS) if use_scheduler else None
+    written_at = {}
+
+    workflow = build_workflow(llm, scheduler, written_at)
+    start = time.perf_counter()
+    state = workflow.invoke({"topic": "LLM scaling laws"}, {"max_concurrency": NUM_SECTIONS})
+    wall = time.perf_counter() - start
+    server.shutdown()
+
+    assert len(state["completed_sections"]) == NUM_SECTIONS
+    # Time until the first quarter of the plan (in plan order) was written
+    first_quarter = max(written_at[i] for i in range(NUM_SECTIONS // 4))
+    print(f"{name:<10} wall={wall:6.2f} s  429s={server.rejected:<4} "
+          f"throughput={server.tokens / wall * WINDOW_SECONDS:7.0f} tokens/window  "
+          f"first {NUM_SECTIONS // 4} sections after {first_quarter:5.2f} s")
+
+
+if __name__ == "__main__":
+    print(f"{NUM_SECTIONS} sections, limits per {WINDOW_SECONDS:.0f} s window: "
+          f"{REQUESTS_PER_WINDOW} requests, {TOKENS_PER_WINDOW} tokens\n")
+    run("unbounded", use_scheduler=False)
+    run("scheduled", use_scheduler=True)
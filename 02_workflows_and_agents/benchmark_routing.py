@@ -0,0 +1,116 @@
+"""
+Offline benchmark of the local router (studies_common/local_router.py) against the LLM router.
+
+Routes a labeled set of requests, from explicit ("write me a poem about ...")
+to implicit ("make me laugh about Mondays"), with:
+
+- "cold start": no routing log, the classifier learns from the LLM fallbacks
+  as it goes
+- "trained": the classifier is first trained on a log of earlier decisions
+  (the first half of the set), then routes the held-out second half
+
+The LLM router is stood in for by an oracle that returns the label after
+LLM_LATENCY seconds, so the routes it decides count as correct. Reports
+routing accuracy, local accuracy, fallback rate and latency per source.
+No API keys or network access are needed.
+"""
+
+import random
+import time
+
+from studies_common.local_router import LocalRouter
+
+
+LLM_LATENCY = 0.3  # seconds of a structured-output routing call
+
+EXAMPLES = [
+    ("Write me a joke about cats", "joke"),
+    ("Write me a poem about cats", "poem"),
+    ("Write me a story about cats", "story"),
+    ("Tell me a pun about bakers", "joke"),
+    ("A haiku about autumn leaves, please", "poem"),
+    ("Tell me a bedtime tale about a brave mouse", "story"),
+    ("Give me a one-liner about programmers", "joke"),
+    ("Compose a sonnet about the ocean", "poem"),
+    ("I'd like a short fable about a greedy fox", "story"),
+    ("Something funny about Monday mornings", "joke"),
+    ("Some verses about the first snow", "poem"),
+    ("A fairy tale about a lost crown", "story"),
+    ("Make me laugh about airline food", "joke"),
+    ("Write a limerick about a cat from Peru", "poem"),
+    ("Narrate the adventures of a robot who learns to paint", "story"),
+    ("Can you roast my cooking skills a little", "joke"),
+    ("Something that rhymes about the moon", "poem"),
+    ("Once upon a time there was a dragon, continue it", "story"),
+    ("Cheer me up with something witty about dogs", "joke"),
+    ("An ode to my morning coffee", "poem"),
+    ("Describe what happens to a sailor lost at sea, beginning to end", "story"),
+    ("What do you call a bear with no teeth", "joke"),
+    ("A few lines in iambic pentameter about rain", "poem"),
+    ("Tell me about a girl who finds a door in her garden and where it leads", "story"),
+    ("Tell me something hilarious about penguins", "joke"),
+    ("Lyrical lines about a summer night", "poem"),
+    ("A tale of two rival chefs", "story"),
+    ("Knock knock, you start", "joke"),
+    ("Put my love for the mountains into stanzas", "poem"),
+    ("Invent the plot of a mystery in a small town and tell it", "story"),
+    ("Give me a dad joke about pizza", "joke"),
+    ("Write free verse about city lights", "poem"),
+    ("A story where a cat becomes mayor", "story"),
+    ("Say something witty about meetings", "joke"),
+    ("Rhyming couplets about my dog", "poem"),
+    ("Tell me about the knight who was afraid of the dark and how he got over it", "story"),
+    ("Roast my taste in music", "joke"),
+    ("Stanzas about the sea at dawn", "poem"),
+    ("Narrate a heist gone wrong", "story"),
+    ("Something witty about taxes", "joke"),
+    ("An ode to the city at night", "poem"),
+    ("Narrate how a shy robot made its first friend", "story"),
+    ("Make me laugh about dentists", "joke"),
+    ("A few lines in iambic pentameter about the wind", "poem"),
+    ("What do you call a fish with no eyes", "joke"),
+    ("Tell me about the lighthouse keeper who never left and what happened one stormy night", "story"),
+    ("Lyrical lines about an old friendship", "poem"),
+    ("Roast my handwriting", "joke"),
+]
+
+
+def llm_oracle(labels):
+    def route_with_llm(text: str) -> str:
+        time.sleep(LLM_LATENCY)
+        return labels[text]
+    return route_with_llm
+
+
+def run(name: str, router: LocalRouter, examples, labels) -> None:
+    correct = local_correct = local_total = 0
+    for text, label in examples:
+        route, source = router.route(text, fallback=llm_oracle(labels))
+        correct += route == label
+        if source != "llm":
+            local_total += 1
+            local_correct += route == label
+    stats = router.stats
+    latencies = [l for ls in stats.latencies.values() for l in ls]
+    print(f"{name:<12} requests={len(examples):<3} accuracy={correct / len(examples):6.1%}  "
+          f"local accuracy={local_correct / max(local_total, 1):6.1%}  "
+          f"fallback rate={stats.fallback_rate:6.1%}  "
+          f"avg routing time={sum(latencies) / len(latencies) * 1000:7.2f} ms "
+          f"(LLM only: {LLM_LATENCY * 1000:.0f} ms)")
+    for source, summary in stats.summary().items():
+        print(f"{'':<12} {source:<9} decisions={summary['decisions']:<3} "
+              f"p50={summary['p50_ms']:9.3f} ms  max={summary['max_ms']:9.3f} ms")
+
+
+if __name__ == "__main__":
+    labels = dict(EXAMPLES)
+    examples = EXAMPLES[:]
+    random.Random(0).shuffle(examples)
+    half = len(examples) // 2
+
+    run("cold start", LocalRouter(), examples, labels)
+    print()
+
+    router = LocalRouter()
+    router.train(examples[:half])
+    run("trained", router, examples[half:], labels)
@@ -1,5 +1,6 @@
 from typing_extensions import TypedDict
 from langgraph.graph import StateGraph, START, END
+from langgraph.types import StreamWriter
 from langchain_openai import ChatOpenAI
 from typing_extensions import TypedDict
 from util import get_openai_api_key, save_workflow_png
@@ -8,6 +9,9 @@ from util import get_openai_api_key, save_workflow_png
 # Initialize the LLM
 llm = ChatOpenAI(model="gpt-4o", api_key=get_openai_api_key())
 
+# Maximum number of LLM calls running at once (None = no limit)
+MAX_CONCURRENCY = 10
+
 
 # Graph state
 class State(TypedDict):
@@ -18,26 +22,46 @@ class State(TypedDict):
     combined_output: str
 
 
+async def stream_section(writer: StreamWriter, section: str, prompt: str) -> str:
+    """
+    Generate one section, streaming its tokens to the client as they arrive.
+    
+    Emits {"section", "token"} events and a final {"section", "done"} event on
+    the "custom" stream mode; when the graph is not streamed, the writer is a no-op.
+    
+    Returns:
+        Full text of the section
+    """
+    content = ""
+    async for chunk in llm.astream(prompt):
+        content += chunk.content
+        writer({"section": section, "token": chunk.content})
+    writer({"section": section, "done": True})
+    return content
+
+
 # Nodes
-def call_llm_1(state: State):
+# The LLM calls are async: the branches run concurrently on the event loop
+# (astream), instead of each one holding an executor thread while it waits
+async def call_llm_1(state: State, writer: StreamWriter):
     """First LLM call to generate initial joke"""
     print("Generating joke...")
-    msg = llm.invoke(f"Write a joke about {state['topic']}")
-    return {"joke": msg.content}
+    joke = await stream_section(writer, "joke", f"Write a joke about {state['topic']}")
+    return {"joke": joke}
 
 
-def call_llm_2(state: State):
+async def call_llm_2(state: State, writer: StreamWriter):
     """Second LLM call to generate story"""
     print("Generating story...")
-    msg = llm.invoke(f"Write a story about {state['topic']}")
-    return {"story": msg.content}
+    story = await stream_section(writer, "story", f"Write a story about {state['topic']}")
+    return {"story": story}
 
 
-def call_llm_3(state: State):
+async def call_llm_3(state: State, writer: StreamWriter):
     """Third LLM call to generate poem"""
     print("Generating poem...")
-    msg = llm.invoke(f"Write a poem about {state['topic']}")
-    return {"poem": msg.content}
+    poem = await stream_section(writer, "poem", f"Write a poem about {state['topic']}")
+    return {"poem": poem}
 
 
 def aggregator(state: State):
@@ -67,4 +91,4 @@ parallel_builder.add_edge("call_llm_1", "aggregator")
 parallel_builder.add_edge("call_llm_2", "aggregator")
 parallel_builder.add_edge("call_llm_3", "aggregator")
 parallel_builder.add_edge("aggregator", END)
-parallel_workflow = parallel_builder.compile()
+parallel_workflow = parallel_builder.compile().with_config(max_concurrency=MAX_CONCURRENCY)
@@ -1,10 +1,18 @@
+import threading
 from typing_extensions import Literal
-from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.config import get_executor_for_config
 from pydantic import BaseModel, Field
 from typing_extensions import TypedDict
+from langgraph.constants import TAG_NOSTREAM
 from langgraph.graph import StateGraph, START, END  
 from langchain_openai import ChatOpenAI
+from pathlib import Path
 from util import save_workflow_png, get_openai_api_key
+from studies_common.local_router import SPECULATIVE_TAG, LocalRouter
+from studies_common.node_cache import NodeCache, node_cache_policy
 
 
 # Initialize the LLM
@@ -21,11 +29,29 @@ class Route(BaseModel):
 # Augment the LLM with schema for structured output
 router = llm.with_structured_output(Route)
 
+# Local router (keyword rules + centroid classifier) tried before the LLM router;
+# the LLM's decisions are logged and train the classifier for the next runs
+local_router = LocalRouter(log_path=Path(__file__).resolve().parent / "routing_log.jsonl")
+
+# Speculative mode: while the LLM router runs, start writing the most likely branch
+# (local best guess); the output is kept if the router agrees, cancelled otherwise
+SPECULATIVE_ROUTING = True
+speculation_stats = {"speculations": 0, "hits": 0, "wasted_tokens": 0}
+speculation_stats_lock = threading.Lock()
+
+# Cache of the branch outputs per input and model (in memory, persisted across runs);
+# the router itself is not cached, it already answers locally when it can
+node_cache = NodeCache(path=Path(__file__).resolve().parent / ".node_cache.sqlite")
+# The branches are sampled at the default temperature: an entry expires after an hour,
+# so a repeated input gets a new story/joke/poem instead of the same one forever
+NODE_CACHE_TTL = 60 * 60
+
 
 # State
 class State(TypedDict):
     input: str
     decision: str
+    speculated: bool  # set by the router on every run: the output was written speculatively
     output: str
 
 
@@ -51,24 +77,77 @@ def llm_call_3(state: State):
     return {"output": result.content}
 
 
-def llm_call_router(state: State):
-    """Route the input to the appropriate node"""
-    print("Routing the input...")
+def route_with_llm(user_input: str) -> str:
+    """Route with the LLM (fallback of the local router)"""
     # Run the augmented LLM with structured output to serve as routing logic
     decision = router.invoke(
         [
             SystemMessage(
                 content="Route the input to story, joke, or poem based on the user's request."
             ),
-            HumanMessage(content=state["input"]),
+            HumanMessage(content=user_input),
         ]
     )
-    print("Routing decision:", decision.step)
-    return {"decision": decision.step}
+    return decision.step
+
+
+def write_speculatively(user_input: str, cancelled: threading.Event) -> str:
+    """Stream a branch output, stopping as soon as the speculation is cancelled"""
+    content = ""
+    # Tagged so its tokens stay out of the messages stream (nostream) and out of
+    # stream_messages: the branch may be cancelled, and a kept output reaches the
+    # client through the state instead
+    for chunk in llm.stream(user_input, config={"tags": [SPECULATIVE_TAG, TAG_NOSTREAM]}):
+        if cancelled.is_set():
+            break
+        content += chunk.content
+    return content
+
+
+def llm_call_router(state: State, config: RunnableConfig):
+    """Route the input to the appropriate node"""
+    print("Routing the input...")
+    speculation = {"speculated": False}
+
+    def route_with_speculation(user_input: str) -> str:
+        """LLM routing, with the most likely branch written meanwhile"""
+        guess = local_router.best_guess(user_input)
+        cancelled = threading.Event()
+        with speculation_stats_lock:
+            speculation_stats["speculations"] += 1
+        with get_executor_for_config(config) as executor:
+            future = executor.submit(write_speculatively, user_input, cancelled)
+            decision = route_with_llm(user_input)
+            if decision != guess:
+                cancelled.set()
+            output = future.result()
+
+        if decision == guess:
+            speculation.update(speculated=True, output=output)
+            with speculation_stats_lock:
+                speculation_stats["hits"] += 1
+        else:
+            # Everything sent and generated for the wrong branch is wasted
+            wasted_tokens = count_tokens_approximately(
+                [HumanMessage(content=user_input), AIMessage(content=output)]
+            )
+            with speculation_stats_lock:
+                speculation_stats["wasted_tokens"] += wasted_tokens
+        print(f"Speculated {guess}: {'kept' if decision == guess else 'cancelled'}")
+        return decision
+
+    fallback = route_with_speculation if SPECULATIVE_ROUTING else route_with_llm
+    decision, source = local_router.route(state["input"], fallback=fallback)
+    print(f"Routing decision: {decision} ({source})")
+    return {"decision": decision, **speculation}
 
 
 # Conditional edge function to route to the appropriate node
 def route_decision(state: State):
+    # The branch already ran speculatively in this run (an output left over from
+    # an earlier run on the same thread does not count)
+    if state["speculated"]:
+        return "speculated"
     # Return the node name you want to visit next
     if state["decision"] == "story":
         return "llm_call_1"
@@ -82,9 +161,9 @@ def route_decision(state: State):
 router_builder = StateGraph(State)
 
 # Add nodes
-router_builder.add_node("llm_call_1", llm_call_1)
-router_builder.add_node("llm_call_2", llm_call_2)
-router_builder.add_node("llm_call_3", llm_call_3)
+router_builder.add_node("llm_call_1", llm_call_1, cache_policy=node_cache_policy("input", llm=llm, ttl=NODE_CACHE_TTL))
+router_builder.add_node("llm_call_2", llm_call_2, cache_policy=node_cache_policy("input", llm=llm, ttl=NODE_CACHE_TTL))
+router_builder.add_node("llm_call_3", llm_call_3, cache_policy=node_cache_policy("input", llm=llm, ttl=NODE_CACHE_TTL))
 router_builder.add_node("router", llm_call_router)
 
 # Add edges to connect nodes
@@ -96,6 +175,7 @@ router_builder.add_conditional_edges(
         "llm_call_1": "llm_call_1",
         "llm_call_2": "llm_call_2",
         "llm_call_3": "llm_call_3",
+        "speculated": END,
     },
 )
 router_builder.add_edge("llm_call_1", END)
@@ -103,4 +183,4 @@ router_builder.add_edge("llm_call_2", END)
 router_builder.add_edge("llm_call_3", END)
 
 # Compile workflow
-router_workflow = router_builder.compile()
+router_workflow = router_builder.compile(cache=node_cache)
@@ -1,17 +1,36 @@
 from typing import Annotated, List
+import hashlib
 import operator
 from pydantic import BaseModel, Field
 from langchain_openai import ChatOpenAI
 from langgraph.graph import StateGraph, START, END
 from langchain_core.messages import SystemMessage, HumanMessage
+from langchain_core.messages.utils import count_tokens_approximately
 from typing_extensions import TypedDict
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
 from langgraph.types import Send
+from pathlib import Path
 from util import get_openai_api_key, save_workflow_png
+from studies_common.rate_limits import RateLimitScheduler
+from studies_common.node_cache import NodeCache, node_cache_policy
 
 
 # Initialize the LLM
 llm = ChatOpenAI(model="gpt-4o", api_key=get_openai_api_key())
 
+# Rate limits of the model (OpenAI tier 1 for gpt-4o); workers are admitted against them
+WORKER_REQUESTS_PER_MINUTE = 500
+WORKER_TOKENS_PER_MINUTE = 30000
+# Completion tokens reserved per section until the actual usage is known
+EXPECTED_SECTION_TOKENS = 1000
+
+scheduler = RateLimitScheduler(WORKER_REQUESTS_PER_MINUTE, WORKER_TOKENS_PER_MINUTE)
+
+# Durable cache of the plan (per topic and model) and of every written section (per topic,
+# plan, section and model): re-running a topic after a failure only writes the sections that are missing.
+# Delete the file to start a topic from scratch.
+REPORT_CACHE_PATH = Path(__file__).resolve().parent / ".report_cache.sqlite"
+
 
 # Schema for structured output to use in planning
 class Section(BaseModel):
@@ -39,13 +58,16 @@ class State(TypedDict):
     sections: list[Section]  # List of report sections
     completed_sections: Annotated[
         list, operator.add
-    ]  # All workers write to this key in parallel
+    ]  # All workers write {"index", "content"} to this key in parallel, in completion order
     final_report: str  # Final report
 
 
 # Worker state
 class WorkerState(TypedDict):
+    topic: str
+    plan_hash: str  # Identifies the plan the section belongs to
     section: Section
+    index: int  # Position of the section in the plan (lower is scheduled first)
     completed_sections: Annotated[list, operator.add]
 
 
@@ -67,27 +89,32 @@ def orchestrator(state: State):
 def llm_call(state: WorkerState):
     """Worker writes a section of the report"""
 
+    messages = [
+        SystemMessage(
+            content="Write a report section following the provided name and description. Include no preamble for each section. Use markdown formatting."
+        ),
+        HumanMessage(
+            content=f"Here is the section name: {state['section'].name} and description: {state['section'].description}"
+        ),
+    ]
+
+    # Wait for room in the rate limit budget; earlier sections go first
+    estimated_tokens = count_tokens_approximately(messages) + EXPECTED_SECTION_TOKENS
+    reservation = scheduler.acquire(estimated_tokens, priority=state["index"])
+
     # Generate section
-    section = llm.invoke(
-        [
-            SystemMessage(
-                content="Write a report section following the provided name and description. Include no preamble for each section. Use markdown formatting."
-            ),
-            HumanMessage(
-                content=f"Here is the section name: {state['section'].name} and description: {state['section'].description}"
-            ),
-        ]
-    )
+    section = llm.invoke(messages)
+    scheduler.settle(reservation, (section.usage_metadata or {}).get("total_tokens"))
 
-    # Write the updated section to completed sections
-    return {"completed_sections": [section.content]}
+    # Write the updated section to completed sections, tagged with its place in the plan
+    return {"completed_sections": [{"index": state["index"], "content": section.content}]}
 
 
 def synthesizer(state: State):
     """Synthesize full report from sections"""
 
-    # List of completed sections
-    completed_sections = state["completed_sections"]
+    # List of completed sections, back in plan order
+    completed_sections = [s["content"] for s in sorted(state["completed_sections"], key=lambda s: s["index"])]
 
     # Format completed section to str to use as context for final sections
     completed_report_sections = "\n\n---\n\n".join(completed_sections)
@@ -95,20 +122,30 @@ def synthesizer(state: State):
     return {"final_report": completed_report_sections}
 
 
+def plan_hash(sections: list[Section]) -> str:
+    """Stable hash of a report plan"""
+    plan = "\n".join(f"{s.name}\t{s.description}" for s in sections)
+    return hashlib.sha256(plan.encode("utf-8")).hexdigest()[:16]
+
+
 # Conditional edge function to create llm_call workers that each write a section of the report
 def assign_workers(state: State):
     """Assign a worker to each section in the plan"""
 
-    # Kick off section writing in parallel via Send() API
-    return [Send("llm_call", {"section": s}) for s in state["sections"]]
+    # Kick off section writing in parallel via Send() API; the scheduler paces the workers
+    topic, plan = state["topic"], plan_hash(state["sections"])
+    return [
+        Send("llm_call", {"topic": topic, "plan_hash": plan, "section": s, "index": i})
+        for i, s in enumerate(state["sections"])
+    ]
 
 
 # Build workflow
 orchestrator_worker_builder = StateGraph(State)
 
 # Add the nodes
-orchestrator_worker_builder.add_node("orchestrator", orchestrator)
-orchestrator_worker_builder.add_node("llm_call", llm_call)
+orchestrator_worker_builder.add_node("orchestrator", orchestrator, cache_policy=node_cache_policy("topic", llm=llm))
+orchestrator_worker_builder.add_node("llm_call", llm_call, cache_policy=node_cache_policy("topic", "plan_hash", "index", "section", llm=llm))
 orchestrator_worker_builder.add_node("synthesizer", synthesizer)
 
 # Add edges to connect nodes
@@ -120,4 +157,9 @@ orchestrator_worker_builder.add_edge("llm_call", "synthesizer")
 orchestrator_worker_builder.add_edge("synthesizer", END)
 
 # Compile the workflow
-orchestrator_worker = orchestrator_worker_builder.compile()
+# (cached plans hold Section objects, which the serializer must be allowed to restore)
+report_cache = NodeCache(
+    path=REPORT_CACHE_PATH,
+    serde=JsonPlusSerializer(allowed_msgpack_modules=[(Section.__module__, Section.__name__)]),
+)
+orchestrator_worker = orchestrator_worker_builder.compile(cache=report_cache)
@@ -3,6 +3,7 @@ from langchain_openai import ChatOpenAI
 from util import get_openai_api_key, save_workflow_png
 from langchain_core.tools import tool
 from langgraph.prebuilt import create_react_agent
+from studies_common.calculator import evaluate_expression
 
 
 # Define tools
@@ -39,7 +40,15 @@ def divide(a: int, b: int) -> float:
 # Initialize the LLM
 llm = ChatOpenAI(model="gpt-4o", api_key=get_openai_api_key())
 
-tools = [add, multiply, divide]
+# evaluate_expression computes a whole calculation in one call (one LLM round trip
+# instead of one per add/multiply/divide step)
+tools = [evaluate_expression, add, multiply, divide]
+
+prompt = (
+    "You are a helpful assistant tasked with performing arithmetic on a set of inputs. "
+    "Write the whole calculation as a single expression and compute it with one evaluate_expression call; "
+    "only use add, multiply or divide for a single step."
+)
 
 # Create the agent
-agent = create_react_agent(llm, tools=tools)
+agent = create_react_agent(llm, tools=tools, prompt=prompt)
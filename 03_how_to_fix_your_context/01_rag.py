@@ -4,9 +4,10 @@ from langchain.embeddings import init_embeddings
 from langchain_core.vectorstores import InMemoryVectorStore
 from langchain.tools.retriever import create_retriever_tool
 from typing_extensions import Literal
-from langchain_core.messages import SystemMessage, ToolMessage
+from langchain_core.messages import ToolMessage
 from langgraph.graph import END, START, StateGraph, MessagesState
-from utils import save_workflow_png, format_retriever_results, get_anthropic_api_key, format_messages
+from utils import save_workflow_png, format_retriever_results, get_anthropic_api_key, stream_messages
+from studies_common.prompt_cache import cached_system_message, PromptCacheMonitor
 from langchain_anthropic import ChatAnthropic
 
 
@@ -64,6 +65,9 @@ retriever_tool = create_retriever_tool(
 # Initialize language model
 llm = ChatAnthropic(model="claude-sonnet-4-20250514", temperature=0, anthropic_api_key=get_anthropic_api_key())
 
+# Record the request prefixes and prompt cache usage of every call
+prompt_cache = PromptCacheMonitor(llm)
+
 # Bind tools
 tools = [retriever_tool]
 tools_by_name = {tool.name: tool for tool in tools}
@@ -88,7 +92,7 @@ def llm_call(state: MessagesState) -> dict:
     return {
         "messages": [
             llm_with_tools.invoke(
-                [SystemMessage(content=rag_prompt)] + state["messages"]
+                [cached_system_message(rag_prompt)] + state["messages"]
             )
         ]
     }
@@ -155,7 +159,8 @@ save_workflow_png(agent, "01_rag.png")
 
 # Execute the RAG agent
 query = "What are the types of reward hacking discussed in the blogs?"
-result = agent.invoke({"messages": [{"role": "user", "content": query}]})
+# Stream the run: tokens show up as they are generated, large retriever outputs are collapsed
+result = stream_messages(agent, {"messages": [{"role": "user", "content": query}]})
 
-# Format and display results
-format_messages(result['messages'])
\ No newline at end of file
+# Prompt cache usage (cached_ratio: share of input tokens read from the cache)
+print(f"Prompt cache: {prompt_cache.summary()}")
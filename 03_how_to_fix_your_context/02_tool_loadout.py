@@ -8,11 +8,12 @@ from langgraph.store.memory import InMemoryStore
 from langgraph_bigtool.utils import convert_positional_only_function_to_tool
 
 from utils import save_workflow_png, format_messages
+from studies_common.prompt_cache import cached_system_message, PromptCacheMonitor, stable_tools
 from langchain_anthropic import ChatAnthropic
 from utils import get_anthropic_api_key, get_openai_api_key
 from typing import Dict, Any
 from typing_extensions import Literal
-from langchain_core.messages import SystemMessage, ToolMessage, HumanMessage
+from langchain_core.messages import ToolMessage, HumanMessage
 from langgraph.store.base import BaseStore
 from langgraph.graph import END, START, StateGraph, MessagesState
 
@@ -20,6 +21,9 @@ from langgraph.graph import END, START, StateGraph, MessagesState
 # Initialize the primary language model for the agent
 llm = ChatAnthropic(model="claude-sonnet-4-20250514", temperature=0, anthropic_api_key=get_anthropic_api_key())
 
+# Record the request prefixes and prompt cache usage of every call
+prompt_cache = PromptCacheMonitor(llm)
+
 # Extract and convert all mathematical functions from Python's math module
 all_tools = []
 for function_name in dir(math):
@@ -115,12 +119,13 @@ def llm_call(state: ToolLoadoutState, store: BaseStore) -> dict:
             relevant_tools.append(tool)
             tools_by_name[tool.name] = tool
     
-    # Bind only relevant tools to avoid context overload
-    llm_with_tools = llm.bind_tools(relevant_tools) if relevant_tools else llm
+    # Bind only relevant tools to avoid context overload (in a stable order, so the
+    # same tool set always produces the same cacheable prompt prefix)
+    llm_with_tools = llm.bind_tools(stable_tools(relevant_tools)) if relevant_tools else llm
     
     # Generate response with focused context
     response = llm_with_tools.invoke(
-        [SystemMessage(content=system_prompt)] + state["messages"]
+        [cached_system_message(system_prompt)] + state["messages"]
     )
     
     return {
@@ -194,4 +199,7 @@ save_workflow_png(agent, "02_tool_loadout.png")
 
 query = "Use available tools to calculate arc cosine of 0.5."
 result = agent.invoke({"messages": [HumanMessage(content=query)]})
-format_messages(result['messages'])
\ No newline at end of file
+format_messages(result['messages'])
+
+# Prompt cache usage (cached_ratio: share of input tokens read from the cache)
+print(f"Prompt cache: {prompt_cache.summary()}")
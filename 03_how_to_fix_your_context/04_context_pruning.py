@@ -1,5 +1,6 @@
 from langchain_community.document_loaders import WebBaseLoader
-from utils import save_workflow_png, format_messages, get_anthropic_api_key, get_openai_api_key
+from utils import save_workflow_png, stream_messages, get_anthropic_api_key, get_openai_api_key
+from studies_common.prompt_cache import cached_system_message, PromptCacheMonitor
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_core.vectorstores import InMemoryVectorStore
 from langchain.tools.retriever import create_retriever_tool
@@ -7,7 +8,7 @@ from typing_extensions import Literal
 #from rich.console import Console
 #from rich.pretty import pprint
 from langchain_anthropic import ChatAnthropic
-from langchain_core.messages import SystemMessage, ToolMessage
+from langchain_core.messages import ToolMessage
 from langgraph.graph import END, START, MessagesState, StateGraph
 from langchain_openai import ChatOpenAI
 from langchain_openai import OpenAIEmbeddings
@@ -51,6 +52,9 @@ result = retriever_tool.invoke({"query": "types of reward hacking"})
 # Initialize the language model
 llm = ChatAnthropic(model="claude-sonnet-4-20250514", temperature=0, anthropic_api_key=get_anthropic_api_key())
 
+# Record the request prefixes and prompt cache usage of every call
+prompt_cache = PromptCacheMonitor(llm)
+
 # Set up tools and bind them to the LLM
 tools = [retriever_tool]
 tools_by_name = {tool.name: tool for tool in tools}
@@ -82,7 +86,7 @@ def llm_call(state: MessagesState) -> dict:
         Dictionary with new messages
     """
     # Add system prompt to the trimmed messages
-    messages = [SystemMessage(content=rag_prompt)] + state['messages']    
+    messages = [cached_system_message(rag_prompt)] + state['messages']    
     response = llm_with_tools.invoke(messages)
     return {"messages": [response]}
 
@@ -162,6 +166,7 @@ agent = agent_builder.compile()
 save_workflow_png(agent, "04_context_pruning.png")
 
 query = "What are the types of reward hacking discussed in the blogs?"
-result = agent.invoke({"messages": [{"role": "user", "content": query}]})
+result = stream_messages(agent, {"messages": [{"role": "user", "content": query}]})
 
-format_messages(result['messages'])
+# Prompt cache usage (cached_ratio: share of input tokens read from the cache)
+print(f"Prompt cache: {prompt_cache.summary()}")
@@ -1,5 +1,6 @@
 from langchain_community.document_loaders import WebBaseLoader
-from utils import save_workflow_png, get_anthropic_api_key, get_openai_api_key, format_messages
+from utils import save_workflow_png, get_anthropic_api_key, get_openai_api_key, stream_messages
+from studies_common.prompt_cache import cached_system_message, PromptCacheMonitor
 from langchain_anthropic import ChatAnthropic
 from langchain_openai import ChatOpenAI
 from langchain_openai import OpenAIEmbeddings
@@ -7,7 +8,7 @@ from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_core.vectorstores import InMemoryVectorStore
 from langchain.tools.retriever import create_retriever_tool
 from typing_extensions import Literal
-from langchain_core.messages import SystemMessage, ToolMessage
+from langchain_core.messages import ToolMessage
 from langgraph.graph import END, START, MessagesState, StateGraph
 
 urls = [
@@ -55,6 +56,9 @@ retriever_tool = create_retriever_tool(
 # Initialize the language model
 llm = ChatAnthropic(model="claude-sonnet-4-20250514", temperature=0, anthropic_api_key=get_anthropic_api_key())
 
+# Record the request prefixes and prompt cache usage of every call
+prompt_cache = PromptCacheMonitor(llm)
+
 # Set up tools and bind them to the LLM
 tools = [retriever_tool]
 tools_by_name = {tool.name: tool for tool in tools}
@@ -82,7 +86,7 @@ def llm_call(state: State) -> dict:
     Returns:
         Dictionary with new messages
     """
-    messages = [SystemMessage(content=rag_prompt)] + state["messages"]
+    messages = [cached_system_message(rag_prompt)] + state["messages"]
     response = llm_with_tools.invoke(messages)
     return {"messages": [response]}
 
@@ -169,5 +173,7 @@ agent = agent_builder.compile()
 save_workflow_png(agent, "05_context_summarization.png")
 
 query = "What are the types of reward hacking discussed in the blogs?"
-result = agent.invoke({"messages": query})
-format_messages(result['messages'])
+result = stream_messages(agent, {"messages": query})
+
+# Prompt cache usage (cached_ratio: share of input tokens read from the cache)
+print(f"Prompt cache: {prompt_cache.summary()}")
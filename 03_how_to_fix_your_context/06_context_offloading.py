@@ -1,28 +1,46 @@
+from typing import Optional
 from typing_extensions import Literal
-from utils import save_workflow_png, format_messages, get_anthropic_api_key, get_tavily_api_key
+from utils import save_workflow_png, stream_messages, get_anthropic_api_key, get_openai_api_key, get_tavily_api_key
+from studies_common.prompt_cache import cached_system_message, PromptCacheMonitor
+from studies_common.scratchpad import (
+    DEFAULT_PAGE_SIZE,
+    append_note,
+    format_notes,
+    format_search_results,
+    get_thread_id,
+    read_notes,
+    search_notes,
+)
+from studies_common.search_cache import cached_search_tool
 
 # Pydantic for data modeling
 from pydantic import BaseModel, Field
 
 # LangChain core components
 from langchain_anthropic import ChatAnthropic
-from langchain_core.messages import SystemMessage, ToolMessage
+from langchain_core.messages import ToolMessage
 from langchain_core.tools import tool
+from langchain.embeddings import init_embeddings
 from langchain_tavily import TavilySearch
 from langchain_core.messages import HumanMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.config import get_executor_for_config
 
 # LangGraph components for workflow and state management
 from langgraph.graph import END, START, StateGraph, MessagesState
+from langgraph.store.base import BaseStore
+from langgraph.store.memory import InMemoryStore
 
 
 # Extended state class to include scratchpad functionality
 class ScratchpadState(MessagesState):
-    """State that extends MessagesState to include a scratchpad field.
+    """State that extends MessagesState to track the scratchpad read position.
     
-    The scratchpad provides temporary storage during agent execution,
-    allowing information to persist within a single conversation thread.
+    The notes themselves live in the store as append-only entries (one
+    namespace per thread); the state only remembers how far the agent has
+    read, so that a read can return just the notes added since the last one.
     """
-    scratchpad: str = Field(description="The scratchpad for storing notes")
+    scratchpad_cursor: int = Field(description="Index of the first scratchpad note not read yet")
 
 # Scratchpad management tools
 @tool
@@ -32,18 +50,35 @@ class WriteToScratchpad(BaseModel):
 
 @tool  
 class ReadFromScratchpad(BaseModel):
-    """Read previously saved notes from the scratchpad."""
+    """Read previously saved notes from the scratchpad.
+    
+    By default only the notes added since the last read are returned. Pass an
+    offset to page through older notes, or a query to fetch only the most
+    relevant notes."""
     reasoning: str = Field(description="Reasoning for fetching notes from the scratchpad")
-
-search_tool = TavilySearch(
-    max_results=5,
-    topic="general",
-    api_key=get_tavily_api_key(),
+    query: Optional[str] = Field(
+        None, description="What you are looking for. If set, returns the most relevant notes instead of the next page."
+    )
+    offset: Optional[int] = Field(
+        None, description="Number of the first note to read (as shown in brackets). Leave empty to read only new notes."
+    )
+    limit: int = Field(DEFAULT_PAGE_SIZE, description="Maximum number of notes to return")
+
+# Web search with an on-disk result cache (see search_cache.py, SEARCH_MODE=live|record|replay|off)
+search_tool = cached_search_tool(
+    TavilySearch(
+        max_results=5,
+        topic="general",
+        api_key=get_tavily_api_key(),
+    )
 )
 
 # Initialize the language model
 llm = ChatAnthropic(model="claude-sonnet-4-20250514", temperature=0, anthropic_api_key=get_anthropic_api_key())
 
+# Record the request prefixes and prompt cache usage of every call
+prompt_cache = PromptCacheMonitor(llm)
+
 # Configure scratchpad tools
 tools = [ReadFromScratchpad, WriteToScratchpad, search_tool]
 tools_by_name = {tool.name: tool for tool in tools}
@@ -62,8 +97,8 @@ Your Research Workflow:
 6. **Complete Task**: Provide a thorough response based on your accumulated research
 
 Tools Available:
-- WriteToScratchpad: Save research plans, findings, and progress updates
-- ReadFromScratchpad: Retrieve previous research work and notes
+- WriteToScratchpad: Save research plans, findings, and progress updates (each write adds a new note; earlier notes are kept)
+- ReadFromScratchpad: Retrieve previous research work and notes (returns only notes added since your last read; pass an offset to page through older notes, or a query to get only the most relevant notes)
 - TavilySearch: Search the web for current information
 
 Always maintain organized notes in your scratchpad and build upon previous research systematically."""
@@ -80,42 +115,81 @@ def llm_call(state: ScratchpadState) -> dict:
     return {
         "messages": [
             llm_with_tools.invoke(
-                [SystemMessage(content=scratchpad_prompt)] + state["messages"]
+                [cached_system_message(scratchpad_prompt)] + state["messages"]
             )
         ]
     }
     
-def tool_node(state: ScratchpadState) -> dict:
-    """Execute tool calls and manage scratchpad state updates.
+def tool_node(state: ScratchpadState, config: RunnableConfig, store: BaseStore) -> dict:
+    """Execute all tool calls of a turn and merge their results.
     
-    Handles both reading from and writing to the scratchpad, updating
-    the conversation state accordingly.
+    Searches are submitted to a thread pool up front, so a turn with several
+    searches takes as long as the slowest one. Scratchpad calls are cheap and
+    order-dependent (a read should see the writes issued before it), so they
+    run in call order while the searches are in flight.
+    
+    Writes append a new note entry to the thread's scratchpad namespace (the
+    store embeds it if it has an index). Reads with a query return the most
+    relevant notes; other reads return a page of notes, starting after the
+    last note read unless an explicit offset is given. Only those default
+    reads advance the read cursor in state: paging through older notes does
+    not mark the newer ones as read.
     
     Args:
         state: Current conversation state with tool calls
+        config: Runnable config carrying the thread id
+        store: Store holding the scratchpad notes
         
     Returns:
-        Dictionary with tool results and updated state
+        Dictionary with one ToolMessage per tool call and the updated read cursor
     """
-    result = []
-    for tool_call in state["messages"][-1].tool_calls:
-        tool = tools_by_name[tool_call["name"]]
-        observation = tool.invoke(tool_call["args"])
-        if tool_call["name"] == "WriteToScratchpad":
-            # Save notes to scratchpad and update state
-            notes = observation.notes
-            result.append(ToolMessage(content=f"Wrote to scratchpad: {notes}", tool_call_id=tool_call["id"]))
-            update = {"messages": result, "scratchpad": notes}
-        elif tool_call["name"] == "ReadFromScratchpad":
-            # Retrieve notes from scratchpad state
-            notes = state.get("scratchpad", "")
-            result.append(ToolMessage(content=f"Notes from scratchpad: {notes}", tool_call_id=tool_call["id"]))
-            update = {"messages": result}
-        elif tool_call["name"] == "tavily_search":
-            # Write search tool observation to messages
-            result.append(ToolMessage(content=observation, tool_call_id=tool_call["id"]))
-            update = {"messages": result}
-    return update
+    thread_id = get_thread_id(config)
+    cursor = state.get("scratchpad_cursor", 0)
+    tool_calls = state["messages"][-1].tool_calls
+    messages = {}
+
+    with get_executor_for_config(config) as executor:
+        # Fan out the searches (and any other non-scratchpad tool)
+        futures = {
+            tool_call["id"]: executor.submit(tools_by_name[tool_call["name"]].invoke, tool_call["args"])
+            for tool_call in tool_calls
+            if tool_call["name"] not in ("WriteToScratchpad", "ReadFromScratchpad")
+        }
+
+        for tool_call in tool_calls:
+            if tool_call["name"] == "WriteToScratchpad":
+                # Append notes as a new scratchpad entry
+                notes = tools_by_name[tool_call["name"]].invoke(tool_call["args"]).notes
+                index = append_note(store, thread_id, notes)
+                content = f"Wrote note [{index + 1}] to scratchpad: {notes}"
+                messages[tool_call["id"]] = ToolMessage(content=content, tool_call_id=tool_call["id"])
+            elif tool_call["name"] == "ReadFromScratchpad":
+                request = tools_by_name[tool_call["name"]].invoke(tool_call["args"])
+                if request.query:
+                    # Semantic read: top-k relevant notes under a token budget
+                    notes, total = search_notes(store, thread_id, request.query, limit=request.limit)
+                    content = format_search_results(notes, total, request.query)
+                else:
+                    # Read a page of notes, by default only the ones not read yet
+                    start = cursor if request.offset is None else request.offset - 1
+                    notes, total = read_notes(store, thread_id, start=start, limit=request.limit)
+                    if notes and request.offset is None:
+                        cursor = max(cursor, notes[-1]["index"] + 1)
+                    content = format_notes(notes, total)
+                messages[tool_call["id"]] = ToolMessage(content=content, tool_call_id=tool_call["id"])
+
+        # Join the searches; a failed search is reported to the model instead of dropping the others
+        for tool_call_id, future in futures.items():
+            try:
+                messages[tool_call_id] = ToolMessage(content=future.result(), tool_call_id=tool_call_id)
+            except Exception as e:
+                messages[tool_call_id] = ToolMessage(content=f"Error: {e!r}", tool_call_id=tool_call_id, status="error")
+
+    # Merge everything into one update, in the order the model issued the calls
+    return {
+        "messages": [messages[tool_call["id"]] for tool_call in tool_calls],
+        "scratchpad_cursor": cursor,
+    }
 
 def should_continue(state: ScratchpadState) -> Literal["tool_node", "__end__"]:
     """Determine workflow continuation based on tool calls.
@@ -141,13 +215,19 @@ agent_builder.add_node("tool_node", tool_node)
 agent_builder.add_edge(START, "llm_call")
 agent_builder.add_conditional_edges("llm_call", should_continue, {"tool_node": "tool_node", END: END})
 agent_builder.add_edge("tool_node", "llm_call")
-agent = agent_builder.compile()
+# Store that embeds each scratchpad note at write time for query-driven reads
+embeddings = init_embeddings("openai:text-embedding-3-small", openai_api_key=get_openai_api_key())
+store = InMemoryStore(index={"embed": embeddings, "dims": 1536})
+
+agent = agent_builder.compile(store=store)
 
 # Display the workflow graph
 save_workflow_png(agent, "06_context_offloading.png")
 
 # Research request 
 query = "Comparae the funding rounds and recent developments of Commonwealth Fusion Systems vs Helion Energy."
-state = agent.invoke({"messages": [HumanMessage(content=query)]})
+config = {"configurable": {"thread_id": "1"}}
+state = stream_messages(agent, {"messages": [HumanMessage(content=query)]}, config)
 
-format_messages(state['messages'])
+# Prompt cache usage (cached_ratio: share of input tokens read from the cache)
+print(f"Prompt cache: {prompt_cache.summary()}")
@@ -0,0 +1,74 @@
+"""
+Offline benchmark of the cached search layer (studies_common/search_cache.py).
+
+Runs the same search workload (repeated queries, issued from several threads)
+against the local stand-in backend and reports backend calls, hit rate,
+latency percentiles and wall time for:
+
+- no cache (single-flight only)
+- cold on-disk cache
+- warm on-disk cache after a "restart" (new CachedSearch, same SQLite file)
+- replay from a recorded cassette
+
+No API keys or network access are needed.
+"""
+
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from studies_common.search_cache import CachedSearch, LocalSearchBackend, RecordingBackend, ReplayBackend, SearchCache
+
+
+NUM_REQUESTS = 200
+NUM_DISTINCT_QUERIES = 20
+NUM_THREADS = 8
+BACKEND_LATENCY = 0.2  # seconds per backend search
+
+
+def make_workload(seed: int = 0) -> list:
+    """Queries with a skewed (Zipf-like) popularity, like a research session."""
+    rng = random.Random(seed)
+    queries = [f"fusion energy startup funding {i}" for i in range(NUM_DISTINCT_QUERIES)]
+    weights = [1 / (rank + 1) for rank in range(NUM_DISTINCT_QUERIES)]
+    return [{"query": q, "max_results": 5} for q in rng.choices(queries, weights=weights, k=NUM_REQUESTS)]
+
+
+def run(name: str, search: CachedSearch, backend, workload: list) -> None:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=NUM_THREADS) as executor:
+        list(executor.map(search, workload))
+    wall = time.perf_counter() - start
+    stats = search.stats.summary()
+    print(
+        f"{name:<22} backend calls={backend.calls:<4} hit rate={stats['hit_rate']:<6} "
+        f"coalesced={stats['coalesced']:<4} p50={stats['p50_ms']:>8.2f} ms  "
+        f"p95={stats['p95_ms']:>8.2f} ms  wall={wall:6.2f} s"
+    )
+
+
+if __name__ == "__main__":
+    workload = make_workload()
+    workdir = Path(tempfile.mkdtemp(prefix="search-cache-bench-"))
+    cache_path = workdir / "search_cache.sqlite"
+    cassette_path = workdir / "cassette.json"
+
+    print(f"{NUM_REQUESTS} requests, {NUM_DISTINCT_QUERIES} distinct queries, "
+          f"{NUM_THREADS} threads, backend latency {BACKEND_LATENCY * 1000:.0f} ms\n")
+
+    backend = LocalSearchBackend(latency=BACKEND_LATENCY)
+    run("no cache", CachedSearch(backend), backend, workload)
+
+    backend = LocalSearchBackend(latency=BACKEND_LATENCY)
+    run("cold cache", CachedSearch(backend, SearchCache(str(cache_path))), backend, workload)
+
+    backend = LocalSearchBackend(latency=BACKEND_LATENCY)
+    run("warm cache (restart)", CachedSearch(backend, SearchCache(str(cache_path))), backend, workload)
+
+    backend = LocalSearchBackend(latency=BACKEND_LATENCY)
+    run("record", CachedSearch(RecordingBackend(backend, str(cassette_path))), backend, workload)
+
+    backend = ReplayBackend(str(cassette_path))
+    run("replay", CachedSearch(backend), backend, workload)
@@ -4,9 +4,10 @@ from langchain.embeddings import init_embeddings
 from langchain_core.vectorstores import InMemoryVectorStore
 from langchain.tools.retriever import create_retriever_tool
 from typing_extensions import Literal
-from langchain_core.messages import SystemMessage, ToolMessage
+from langchain_core.messages import ToolMessage
 from langgraph.graph import END, START, StateGraph, MessagesState
 from utils import save_workflow_png, format_retriever_results, get_anthropic_api_key, format_messages
+from studies_common.prompt_cache import cached_system_message
 from langchain_anthropic import ChatAnthropic
 
 
@@ -88,7 +89,7 @@ def llm_call(state: MessagesState) -> dict:
     return {
         "messages": [
             llm_with_tools.invoke(
-                [SystemMessage(content=rag_prompt)] + state["messages"]
+                [cached_system_message(rag_prompt)] + state["messages"]
             )
         ]
     }
@@ -8,11 +8,12 @@ from langgraph.store.memory import InMemoryStore
 from langgraph_bigtool.utils import convert_positional_only_function_to_tool
 
 from utils import save_workflow_png, format_messages
+from studies_common.prompt_cache import cached_system_message, stable_tools
 from langchain_anthropic import ChatAnthropic
 from utils import get_anthropic_api_key, get_openai_api_key
 from typing import Dict, Any
 from typing_extensions import Literal
-from langchain_core.messages import SystemMessage, ToolMessage, HumanMessage
+from langchain_core.messages import ToolMessage, HumanMessage
 from langgraph.store.base import BaseStore
 from langgraph.graph import END, START, StateGraph, MessagesState
 
@@ -115,12 +116,13 @@ def llm_call(state: ToolLoadoutState, store: BaseStore) -> dict:
             relevant_tools.append(tool)
             tools_by_name[tool.name] = tool
     
-    # Bind only relevant tools to avoid context overload
-    llm_with_tools = llm.bind_tools(relevant_tools) if relevant_tools else llm
+    # Bind only relevant tools to avoid context overload (in a stable order, so the
+    # same tool set always produces the same cacheable prompt prefix)
+    llm_with_tools = llm.bind_tools(stable_tools(relevant_tools)) if relevant_tools else llm
     
     # Generate response with focused context
     response = llm_with_tools.invoke(
-        [SystemMessage(content=system_prompt)] + state["messages"]
+        [cached_system_message(system_prompt)] + state["messages"]
     )
     
     return {
@@ -1,10 +1,27 @@
 # Import organization and setup
-from langgraph.prebuilt import create_react_agent
+from collections import deque
+from typing import Annotated, Literal
+from pydantic import BaseModel, Field
+from typing_extensions import TypedDict
+from langgraph.prebuilt import InjectedState, create_react_agent
 from langgraph_supervisor import create_supervisor
+from langgraph_supervisor.handoff import METADATA_KEY_HANDOFF_DESTINATION
+from langgraph.graph import END, START, MessagesState, StateGraph
+from langgraph.types import Command, Send
 from langchain_anthropic import ChatAnthropic
+from langchain_core.messages import AnyMessage, HumanMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.tools import InjectedToolCallId, tool
 from utils import get_anthropic_api_key, save_workflow_png, format_messages
+from studies_common.prompt_cache import cached_system_message
+from studies_common.calculator import evaluate_expression
 
 
+# Handoff mode: "task_brief" gives a sub-agent only a distilled task brief written by
+# the supervisor; "full_history" forwards the supervisor's whole message history.
+# Either way the full history stays in the supervisor's state.
+HANDOFF_MODE = "task_brief"
+
 # Initialize the language model
 llm = ChatAnthropic(model="claude-sonnet-4-20250514", temperature=0, anthropic_api_key=get_anthropic_api_key())
 
@@ -58,27 +75,28 @@ def web_search(query: str) -> str:
 # Improved agent prompts with clear role definitions and constraints
 math_agent = create_react_agent(
     model=llm,
-    tools=[add, multiply],
+    tools=[evaluate_expression, add, multiply],
     name="math_expert",
-    prompt="""You are a specialized mathematics expert with access to addition and multiplication tools.
+    prompt=cached_system_message("""You are a specialized mathematics expert with access to an expression evaluator and addition and multiplication tools.
 
 Your responsibilities:
 - Solve mathematical problems using the available tools
 - Always use tools for calculations rather than computing mentally
-- Use one tool at a time and show your work clearly
+- Write the whole calculation as one expression and compute it with a single evaluate_expression call (e.g. a sum of many numbers); only use add or multiply for a single step
+- Show your work clearly
 - Focus exclusively on mathematical computations
 
 Constraints:
 - Do NOT attempt research, web searches, or data gathering
 - Do NOT perform calculations without using the provided tools
-- Always explain your mathematical reasoning step by step"""
+- Always explain your mathematical reasoning step by step""")
 )
 
 research_agent = create_react_agent(
     model=llm,
     tools=[web_search],
     name="research_expert",  
-    prompt="""You are a specialized research expert with access to web search capabilities.
+    prompt=cached_system_message("""You are a specialized research expert with access to web search capabilities.
 
 Your responsibilities:
 - Find and retrieve factual information using web search
@@ -89,7 +107,7 @@ Constraints:
 - Do NOT perform mathematical calculations or computations
 - Do NOT attempt to solve math problems - delegate those to the math expert
 - Always use your search tool to find current, accurate information
-- Present findings clearly and cite sources when available"""
+- Present findings clearly and cite sources when available""")
 )
 
 # Enhanced supervisor prompt with clear delegation strategy
@@ -108,12 +126,221 @@ Delegation Rules:
 
 Important: You are a coordinator, not a doer. Always delegate work to your specialists rather than attempting tasks yourself. Never perform calculations or research directly."""
 
+# In task_brief mode the specialists don't see the conversation, so the briefs must stand on their own
+if HANDOFF_MODE == "task_brief":
+    supervisor_prompt += """
+
+Handoffs: specialists only see what you pass them. Write a self-contained task description and put only the facts they need (e.g. the researched numbers to add up) in the context."""
+
+# Token accounting of the task-brief handoffs (full history vs. brief), last ones only
+# so a long-running server does not grow it without bound
+handoff_token_log = deque(maxlen=1000)
+
+
+def build_task_brief(task_description: str, context: str = "") -> list:
+    """Messages a sub-agent receives in task_brief mode.
+    
+    Args:
+        task_description: What the sub-agent has to do
+        context: Facts from earlier results the sub-agent needs (e.g. numbers to compute with)
+        
+    Returns:
+        List with a single HumanMessage holding the brief
+    """
+    brief = task_description if not context else f"{task_description}\n\nRelevant context:\n{context}"
+    return [HumanMessage(content=brief)]
+
+
+def create_task_brief_handoff_tool(agent_name: str):
+    """Create a handoff tool that sends a sub-agent only a distilled task brief.
+    
+    The supervisor's history (plus the handoff ToolMessage) is written back to the
+    supervisor's state, while the sub-agent is started via Send() with just the
+    brief, so its context stays quarantined from the rest of the conversation.
+    
+    Args:
+        agent_name: Name of the sub-agent node to hand off to
+        
+    Returns:
+        Handoff tool recognised by create_supervisor
+    """
+    name = f"transfer_to_{agent_name}"
+
+    @tool(name, description=f"Hand off a task to {agent_name} with a self-contained brief.")
+    def handoff_to_agent(
+        task_description: Annotated[str, "Self-contained description of what the agent should do"],
+        context: Annotated[str, "Only the facts from earlier results the agent needs (e.g. numbers), or empty"],
+        state: Annotated[dict, InjectedState],
+        tool_call_id: Annotated[str, InjectedToolCallId],
+    ) -> Command:
+        tool_message = ToolMessage(
+            content=f"Successfully transferred to {agent_name}",
+            name=name,
+            tool_call_id=tool_call_id,
+        )
+        brief = build_task_brief(task_description, context)
+        handoff_token_log.append({
+            "agent": agent_name,
+            "full_history_tokens": count_tokens_approximately(state["messages"] + [tool_message]),
+            "brief_tokens": count_tokens_approximately(brief),
+        })
+        # A single Send (not a list) keeps the update: ToolNode only merges list-of-Send
+        # parent commands, and drops their updates when it does
+        return Command(
+            graph=Command.PARENT,
+            goto=Send(agent_name, {"messages": brief}),
+            update={"messages": state["messages"] + [tool_message]},
+        )
+
+    handoff_to_agent.metadata = {METADATA_KEY_HANDOFF_DESTINATION: agent_name}
+    return handoff_to_agent
+
+
+def print_handoff_token_report() -> None:
+    """Print the token reduction of each task-brief handoff."""
+    for entry in handoff_token_log:
+        full, brief = entry["full_history_tokens"], entry["brief_tokens"]
+        print(f"Handoff to {entry['agent']}: {full} tokens (full history) -> {brief} tokens (brief), "
+              f"{100 * (1 - brief / full):.0f}% fewer")
+
+
 # Create supervisor workflow for coordinating agents
 workflow = create_supervisor(
     [research_agent, math_agent],
     model=llm,
-    prompt=supervisor_prompt
+    prompt=cached_system_message(supervisor_prompt),
+    tools=(
+        [create_task_brief_handoff_tool(a.name) for a in [research_agent, math_agent]]
+        if HANDOFF_MODE == "task_brief"
+        else None
+    ),
 )
 
 # Compile the multi-agent application
 agent = workflow.compile()
+
+
+# ============================================================================
+# PARALLEL DISPATCH MODE
+# ============================================================================
+# The supervisor above delegates one expert at a time. In parallel mode the
+# supervisor hands off independent subtasks in a single turn: each DelegateTask
+# call becomes a Send to `run_expert`, all experts run in the same step, and the
+# supervisor only runs again once every result is back (join). A turn with a
+# research and a math subtask then takes max(subtask) instead of sum(subtask).
+
+experts_by_name = {expert.name: expert for expert in [research_agent, math_agent]}
+
+
+class DelegateTask(BaseModel):
+    """Hand off a self-contained subtask to one expert.
+    
+    Call this tool several times in the same turn to run independent subtasks in parallel."""
+    expert: Literal["research_expert", "math_expert"] = Field(description="Expert that should handle the subtask")
+    task: str = Field(description="Self-contained description of the subtask, including any numbers or facts it needs")
+
+
+class ExpertTask(TypedDict):
+    """Input of one expert run (sent by the supervisor)."""
+    expert: str
+    task: str
+    tool_call_id: str
+    messages: list[AnyMessage]
+
+
+parallel_supervisor_prompt = """You are an intelligent team supervisor managing two specialized experts: a research expert and a math expert.
+
+Your role is to:
+1. Break the request into subtasks and decide which expert handles each one
+2. Delegate subtasks with the DelegateTask tool
+3. Synthesize the experts' results into the final answer
+
+Delegation Rules:
+- For data gathering, company information, current events, or factual research → research_expert
+- For calculations, mathematical operations, or numerical analysis → math_expert
+- Subtasks that do not depend on each other → call DelegateTask for all of them in the same turn, so they run in parallel
+- A subtask that needs another subtask's result (e.g. math on researched numbers) → delegate it in a later turn, once that result is back, and include the numbers in its task description
+
+Important: You are a coordinator, not a doer. Always delegate work to your specialists rather than attempting tasks yourself. Never perform calculations or research directly."""
+
+parallel_supervisor_llm = llm.bind_tools([DelegateTask])
+
+
+def parallel_supervisor(state: MessagesState) -> dict:
+    """Plan the next wave of subtasks, or synthesize the final answer.
+    
+    Args:
+        state: Conversation state including the experts' results so far
+        
+    Returns:
+        Dictionary with the supervisor's response
+    """
+    response = parallel_supervisor_llm.invoke(
+        [cached_system_message(parallel_supervisor_prompt)] + state["messages"]
+    )
+    return {"messages": [response]}
+
+
+def assign_experts(state: MessagesState):
+    """Fan out every DelegateTask call of the last supervisor turn via Send().
+    
+    Args:
+        state: Conversation state ending with the supervisor's response
+        
+    Returns:
+        One Send per delegated subtask, or END when the supervisor answered
+    """
+    last_message = state["messages"][-1]
+    if not last_message.tool_calls:
+        return END
+    # In task_brief mode experts see only their subtask; otherwise also the
+    # user/assistant conversation so far (no supervisor tool traffic)
+    history = [] if HANDOFF_MODE == "task_brief" else [
+        m for m in state["messages"][:-1]
+        if not isinstance(m, ToolMessage) and not getattr(m, "tool_calls", None)
+    ]
+    return [
+        Send(
+            "run_expert",
+            {
+                "expert": tool_call["args"]["expert"],
+                "task": tool_call["args"]["task"],
+                "tool_call_id": tool_call["id"],
+                "messages": history,
+            },
+        )
+        for tool_call in last_message.tool_calls
+    ]
+
+
+def run_expert(state: ExpertTask) -> dict:
+    """Run one expert on its subtask and report back as a ToolMessage.
+    
+    Args:
+        state: Subtask sent by the supervisor
+        
+    Returns:
+        Dictionary with the expert's answer to the supervisor's tool call
+    """
+    expert = experts_by_name[state["expert"]]
+    result = expert.invoke({"messages": state["messages"] + [HumanMessage(content=state["task"])]})
+    return {
+        "messages": [
+            ToolMessage(
+                content=result["messages"][-1].content,
+                name=state["expert"],
+                tool_call_id=state["tool_call_id"],
+            )
+        ]
+    }
+
+
+# Build the parallel supervisor workflow
+parallel_builder = StateGraph(MessagesState)
+parallel_builder.add_node("supervisor", parallel_supervisor)
+parallel_builder.add_node("run_expert", run_expert)
+parallel_builder.add_edge(START, "supervisor")
+parallel_builder.add_conditional_edges("supervisor", assign_experts, ["run_expert", END])
+parallel_builder.add_edge("run_expert", "supervisor")
+
+parallel_agent = parallel_builder.compile()
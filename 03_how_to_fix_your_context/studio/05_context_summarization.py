@@ -1,5 +1,6 @@
 from langchain_community.document_loaders import WebBaseLoader
 from utils import save_workflow_png, get_anthropic_api_key, get_openai_api_key, format_messages
+from studies_common.prompt_cache import cached_system_message
 from langchain_anthropic import ChatAnthropic
 from langchain_openai import ChatOpenAI
 from langchain_openai import OpenAIEmbeddings
@@ -7,7 +8,7 @@ from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_core.vectorstores import InMemoryVectorStore
 from langchain.tools.retriever import create_retriever_tool
 from typing_extensions import Literal
-from langchain_core.messages import SystemMessage, ToolMessage
+from langchain_core.messages import ToolMessage
 from langgraph.graph import END, START, MessagesState, StateGraph
 
 urls = [
@@ -82,7 +83,7 @@ def llm_call(state: State) -> dict:
     Returns:
         Dictionary with new messages
     """
-    messages = [SystemMessage(content=rag_prompt)] + state["messages"]
+    messages = [cached_system_message(rag_prompt)] + state["messages"]
     response = llm_with_tools.invoke(messages)
     return {"messages": [response]}
 
@@ -7,17 +7,23 @@ adapted to this repo's multiple-provider model configuration.
 from __future__ import annotations
 
 import os
+import sys
+import uuid
 from dataclasses import dataclass
+from pathlib import Path
 
 from dotenv import load_dotenv
 from langchain.agents import create_agent
 from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import tool
 from langchain_openai import AzureChatOpenAI, ChatOpenAI
-from langgraph.checkpoint.memory import InMemorySaver
 from langgraph.runtime import get_runtime
 from rich import print
 
+# Shared helpers (studies_common) live at the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from studies_common.checkpoint import SqliteWalSaver
+
 load_dotenv(override=True)
 
 model = ChatOpenAI(model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"))
@@ -66,7 +72,9 @@ class WeatherResponse:
     punny_response: str
 
 
-checkpointer = InMemorySaver()
+# Durable checkpointer: conversations survive restarts (delete the file to start over).
+# Each script has its own database, so the agents never resume each other's threads
+checkpointer = SqliteWalSaver(Path(__file__).resolve().parent / ".quickstart.checkpoints.sqlite")
 
 agent = create_agent(
     model=model,
@@ -78,7 +86,9 @@ agent = create_agent(
 
 
 def main():
-    config = {"configurable": {"thread_id": "1"}}
+    # A new conversation per run, unless a thread id is given to resume one
+    thread_id = sys.argv[1] if len(sys.argv) > 1 else f"quickstart-{uuid.uuid4().hex[:8]}"
+    config = {"configurable": {"thread_id": thread_id}}
     context = UserContext(user_id="1")
 
     r1 = agent.invoke(
@@ -92,6 +102,7 @@ def main():
         context=context,
     )
     print(r2.get("structured_response"))
+    print(f"To resume this conversation: python {Path(__file__).name} {thread_id}")
 
 
 if __name__ == "__main__":
@@ -1,13 +1,19 @@
 # https://github.com/JRAlexander/IntroToAgents1-Oxford/blob/main/intro-langgraph/time-travel.ipynb
 import os
+import sys
+import uuid
+from pathlib import Path
 
 from dotenv import load_dotenv
 from langchain_core.messages import HumanMessage
 from langchain_core.tools import tool
 from langchain_openai import ChatOpenAI
-from langgraph.checkpoint.memory import MemorySaver
 from langgraph.graph import END, START, MessagesState, StateGraph
 from langgraph.prebuilt import ToolNode
+
+# Shared helpers (studies_common) live at the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from studies_common.checkpoint import SqliteWalSaver
     
 load_dotenv(override=True)
 model = ChatOpenAI(model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"))
@@ -88,8 +94,10 @@ workflow.add_conditional_edges(
 # This means that after `tools` is called, `agent` node is called next.
 workflow.add_edge("action", "agent")
 
-# Set up memory
-memory = MemorySaver()
+# Set up memory: a durable SQLite checkpointer, so the thread and its history
+# survive restarts (delete the file to start over). Each script has its own
+# database, so the agents never resume each other's threads
+memory = SqliteWalSaver(Path(__file__).resolve().parent / ".langgraph_agent.checkpoints.sqlite")
 
 # Finally, we compile it!
 # This compiles it into a LangChain Runnable,
@@ -99,7 +107,22 @@ memory = MemorySaver()
 # This will add a breakpoint before the `action` node is called
 app = workflow.compile(checkpointer=memory)
 
-config = {"configurable": {"thread_id": "1"}}
+# A new thread per run, unless a thread id is given to resume one
+thread_id = sys.argv[1] if len(sys.argv) > 1 else f"langgraph-agent-{uuid.uuid4().hex[:8]}"
+config = {"configurable": {"thread_id": thread_id}}
+print(f"To resume this thread: python {Path(__file__).name} {thread_id}")
 input_message = HumanMessage(content="Can you play Taylor Swift's most popular song?")
 for event in app.stream({"messages": [input_message]}, config, stream_mode="values"):
     event["messages"][-1].pretty_print()
+
+# Time travel: the checkpointer indexes the history by step, next node and time,
+# so the replay point (the checkpoint right before the tool call) is a keyed
+# lookup instead of a walk over get_state_history
+for entry in memory.history(config, limit=5):
+    print(entry.step, entry.source, entry.next, entry.checkpoint_id)
+
+replay_point = memory.find_checkpoint(config, node="action")
+if replay_point is not None:
+    # Replay from there: the tool runs again and the agent answers anew
+    for event in app.stream(None, replay_point.config, stream_mode="values"):
+        event["messages"][-1].pretty_print()
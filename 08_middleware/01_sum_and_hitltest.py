@@ -1,15 +1,26 @@
+import sys
+from pathlib import Path
+
 from langchain.agents import create_agent
 from langchain.agents.middleware import SummarizationMiddleware, HumanInTheLoopMiddleware
 from langchain_openai import ChatOpenAI
-from langgraph.checkpoint.memory import InMemorySaver
 from langgraph.types import Command
 
+# Shared helpers (studies_common) live at the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from studies_common.calculator import evaluate_expression
+from studies_common.retention import RetainingMemorySaver, RetentionPolicy
+
 from dotenv import load_dotenv
 
 load_dotenv(override=True)
 
 model = ChatOpenAI(model="gpt-4o-mini")
-prompt = "You are a helpful assistant that can perform addition, subtraction, multiplication, and division. Use the tools sequentially to perform the operations."
+prompt = (
+    "You are a helpful assistant that can perform addition, subtraction, multiplication, and division. "
+    "Write the whole calculation as a single expression and compute it with one evaluate_expression call; "
+    "only use the single-operation tools for a single step."
+)
 
 def addition(a: int, b: int) -> int:
     """Add a and b."""
@@ -27,9 +38,13 @@ def division(a: int, b: int) -> int:
     """Divide a and b."""
     return a / b
 
-tools = [addition, subtraction, multiplication, division]
+# evaluate_expression computes the whole chain in one call (one model round trip
+# and one approval instead of one per operation)
+tools = [evaluate_expression, addition, subtraction, multiplication, division]
 
-memory = InMemorySaver()
+# Keep the last 20 checkpoints of each thread (enough to step back through an
+# approval round) and at most 100 threads, instead of every checkpoint forever
+memory = RetainingMemorySaver(RetentionPolicy(keep_last=20, max_threads=100))
 config = {"configurable": {"thread_id": "1"}}
 
 agent = create_agent(
@@ -45,6 +60,10 @@ agent = create_agent(
         ),
         HumanInTheLoopMiddleware(
             tool_configs={
+                "evaluate_expression": {
+                    "require_approval": True,
+                    "description": "🚨 Expression evaluation requires approval",
+                },
                 "addition": {
                     "require_approval": True,
                     "description": "⚠️ Addition operation requires approval",
@@ -3,13 +3,18 @@ from langchain.agents.middleware import SummarizationMiddleware, HumanInTheLoopM
 from langchain_openai import ChatOpenAI
 from langgraph.checkpoint.memory import InMemorySaver
 from langgraph.types import Command
+from studies_common.calculator import evaluate_expression
 
 from dotenv import load_dotenv
 
 load_dotenv(override=True)
 
 model = ChatOpenAI(model="gpt-4o-mini")
-prompt = "You are a helpful assistant that can perform addition, subtraction, multiplication, and division. Use the tools sequentially to perform the operations."
+prompt = (
+    "You are a helpful assistant that can perform addition, subtraction, multiplication, and division. "
+    "Write the whole calculation as a single expression and compute it with one evaluate_expression call; "
+    "only use the single-operation tools for a single step."
+)
 
 def addition(a: int, b: int) -> int:
     """Add a and b."""
@@ -27,7 +32,9 @@ def division(a: int, b: int) -> int:
     """Divide a and b."""
     return a / b
 
-tools = [addition, subtraction, multiplication, division]
+# evaluate_expression computes the whole chain in one call (one model round trip
+# and one approval instead of one per operation)
+tools = [evaluate_expression, addition, subtraction, multiplication, division]
 
 memory = InMemorySaver()
 config = {"configurable": {"thread_id": "1"}}
@@ -45,6 +52,10 @@ agent = create_agent(
         ),
         HumanInTheLoopMiddleware(
             tool_configs={
+                "evaluate_expression": {
+                    "require_approval": True,
+                    "description": "🚨 Expression evaluation requires approval",
+                },
                 "addition": {
                     "require_approval": True,
                     "description": "⚠️ Addition operation requires approval",
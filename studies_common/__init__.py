@@ -0,0 +1,59 @@
+"""
+Shared helpers for the study scripts and Studio graphs.
+
+Nothing heavy is imported up front: each helper is resolved from its submodule
+on first attribute access (PEP 562), so importing this package costs well under
+a millisecond and `rich`, `dotenv`, etc. are only loaded by the graphs that use
+them. Run `python -m studies_common.importtime` to measure the import time of
+every Studio graph module.
+"""
+
+import importlib
+
+
+# Public name -> submodule that defines it
+_EXPORTS = {
+    # Environment and API keys
+    "load_env": "env",
+    "find_env_file": "env",
+    "get_api_key": "env",
+    "get_openai_api_key": "env",
+    "get_anthropic_api_key": "env",
+    "get_tavily_api_key": "env",
+    "validate_api_keys": "env",
+    # Message display
+    "console": "display",
+    "format_message_content": "display",
+    "format_messages": "display",
+    "format_message": "display",
+    "format_retriever_results": "display",
+    "truncate_content": "display",
+    "stream_messages": "display",
+    # Workflow graphs
+    "MERMAID_CACHE_DIRNAME": "graphs",
+    "save_workflow_png": "graphs",
+    "save_workflow_mermaid": "graphs",
+    # Agent tools
+    "evaluate_arithmetic": "calculator",
+    "evaluate_expression": "calculator",
+    # Checkpointing
+    "SqliteWalSaver": "checkpoint",
+    "RetentionPolicy": "retention",
+    "RetainingMemorySaver": "retention",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    submodule = _EXPORTS.get(name)
+    if submodule is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{submodule}"), name)
+    # Cache it so later lookups skip __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
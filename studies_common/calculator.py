@@ -0,0 +1,114 @@
+"""
+Safe arithmetic expression evaluator, usable as a single-call agent tool.
+
+Instead of one LLM round trip per add/multiply/divide step, the model writes
+the whole calculation as one expression, e.g. "((3 + 4) * 2) / 5", and the
+tool evaluates the expression tree in a single call. Only numeric literals,
+parentheses and arithmetic operators are accepted; the expression is parsed
+with `ast` and never passed to eval().
+"""
+
+import ast
+import math
+import operator
+from typing import Any, Union
+
+
+Number = Union[int, float]
+
+# Guards against expressions that are expensive to evaluate
+MAX_EXPRESSION_LENGTH = 1000
+MAX_RESULT_BITS = 4096  # Integers up to ~1e1233, intermediate results included
+
+
+def _power(left: Number, right: Number) -> Number:
+    """left ** right, refused before computing it when the integer result would exceed MAX_RESULT_BITS."""
+    if isinstance(left, int) and isinstance(right, int) and right > 0 and abs(left) > 1:
+        if right * math.log2(abs(left)) > MAX_RESULT_BITS:
+            raise ValueError(f"Result too large: the power exceeds {MAX_RESULT_BITS} bits")
+    # Float powers raise OverflowError instead of growing (handled by evaluate_arithmetic)
+    return operator.pow(left, right)
+
+
+# Supported operators
+BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: _power,
+}
+
+UNARY_OPERATORS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+
+def _check_result(value: Any) -> Number:
+    """Reject results that are not real numbers of a bounded size."""
+    if isinstance(value, complex):
+        raise ValueError(f"Result is not a real number: {value}")
+    if isinstance(value, int) and value.bit_length() > MAX_RESULT_BITS:
+        raise ValueError(f"Result too large: exceeds {MAX_RESULT_BITS} bits")
+    if isinstance(value, float) and not math.isfinite(value):
+        raise ValueError(f"Result too large: {value}")
+    return value
+
+
+def _evaluate_node(node: ast.AST) -> Number:
+    """Recursively evaluate a parsed arithmetic expression node."""
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        return _check_result(node.value)
+
+    if isinstance(node, ast.BinOp) and type(node.op) in BINARY_OPERATORS:
+        left = _evaluate_node(node.left)
+        right = _evaluate_node(node.right)
+        return _check_result(BINARY_OPERATORS[type(node.op)](left, right))
+
+    if isinstance(node, ast.UnaryOp) and type(node.op) in UNARY_OPERATORS:
+        return UNARY_OPERATORS[type(node.op)](_evaluate_node(node.operand))
+
+    raise ValueError(f"Unsupported element in expression: {ast.dump(node)}")
+
+
+def evaluate_arithmetic(expression: str) -> Number:
+    """
+    Evaluate an arithmetic expression safely.
+
+    Args:
+        expression: Expression with numbers, parentheses and + - * / // % ** operators
+
+    Returns:
+        Value of the expression
+
+    Raises:
+        ValueError: If the expression is invalid, uses anything but arithmetic,
+            divides by zero, or its value (or an intermediate value) is too large
+    """
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise ValueError(f"Expression longer than {MAX_EXPRESSION_LENGTH} characters")
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid expression: {expression!r}") from e
+    try:
+        return _evaluate_node(tree.body)
+    except ZeroDivisionError as e:
+        raise ValueError(f"Division by zero in expression: {expression!r}") from e
+    except OverflowError as e:
+        raise ValueError(f"Result too large in expression: {expression!r}") from e
+
+
+def evaluate_expression(expression: str) -> Number:
+    """Evaluate a whole arithmetic expression in one call.
+
+    Prefer this tool over chaining single add/multiply/divide calls: write the full
+    calculation as one expression, e.g. "((3 + 4) * 2) / 5".
+
+    Args:
+        expression: Arithmetic expression using numbers, parentheses and + - * / // % **
+    """
+    return evaluate_arithmetic(expression)
@@ -0,0 +1,929 @@
+"""
+Durable SQLite checkpointer for the study chatbots and agents.
+
+`SqliteWalSaver(path)` is a drop-in replacement for `MemorySaver` /
+`InMemorySaver` that keeps every thread on disk, so a conversation survives a
+restart and memory use no longer grows with the history:
+
+- the database runs in WAL mode, so readers (`get_state`, history, Studio)
+  never block the writer and the writer never blocks them; every reading
+  thread gets its own connection
+- the pending writes of a super-step are buffered and committed together with
+  the step's checkpoint in a single transaction (a short timer flushes them
+  when no checkpoint follows, e.g. on an interrupt)
+- every statement is a constant SQL string, so sqlite3 prepares it once per
+  connection and reuses it from its statement cache
+
+Message lists (the `messages` channel of MessagesState) are delta-encoded:
+a checkpoint stores only the messages added or changed since its parent
+(`{"__message_delta__": {"base", "keep", "append"}}`: the first `keep`
+messages of the base checkpoint, then `append`), with a full keyframe every
+`keyframe_interval` checkpoints, so writing a step no longer costs the whole
+conversation. Reads rebuild the list from the nearest keyframe.
+
+The history is indexed: every checkpoint row carries its step, source and
+creation time, and the nodes it is about to run are kept in their own table,
+so `find_checkpoint(config, node=..., step=..., at=...)` locates a replay
+point with an index lookup, and `history(config, limit=..., before=...)`
+pages through a thread's checkpoints without deserializing any state.
+
+With `retention=RetentionPolicy(...)` (see studies_common.retention) the
+saver compacts its history every `compact_every` checkpoints: threads past
+their TTL or beyond the LRU limit are deleted, dropped checkpoints lose their
+writes, kept checkpoints are re-linked to their nearest kept ancestor, and a
+kept delta whose base is dropped is rewritten as a keyframe.
+
+With `synchronous=NORMAL` (the usual WAL setting) a committed step survives a
+crash of the process; buffered writes of a step in progress may be lost and
+the step re-runs, as it would without pending writes.
+
+Run `python -m studies_common.checkpoint_benchmark` to compare its throughput
+with MemorySaver and langgraph's SqliteSaver.
+"""
+
+import asyncio
+import atexit
+import json
+import random
+import re
+import sqlite3
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from langgraph.checkpoint.serde.base import SerializerProtocol
+
+from studies_common.retention import DEFAULT_COMPACT_EVERY, CompactionReport, RetentionPolicy, relink, timestamp
+
+
+# Seconds pending writes wait for their step's checkpoint before they are committed alone
+DEFAULT_FLUSH_INTERVAL = 0.05
+# Prepared statements cached per connection
+STATEMENT_CACHE_SIZE = 256
+# Delta-encoded channels, and checkpoints between two full keyframes of them (a read
+# of the latest state replays at most DEFAULT_KEYFRAME_INTERVAL - 1 deltas)
+DEFAULT_DELTA_CHANNELS = ("messages",)
+DEFAULT_KEYFRAME_INTERVAL = 8
+# Threads whose latest message fingerprints are kept in memory to diff the next checkpoint against
+MAX_DELTA_HEADS = 128
+DELTA_KEY = "__message_delta__"
+
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS checkpoints (
+        thread_id TEXT NOT NULL,
+        checkpoint_ns TEXT NOT NULL DEFAULT '',
+        checkpoint_id TEXT NOT NULL,
+        parent_checkpoint_id TEXT,
+        type TEXT,
+        checkpoint BLOB,
+        metadata BLOB,
+        step INTEGER,
+        source TEXT,
+        created_at TEXT,
+        PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+    )""",
+    """CREATE TABLE IF NOT EXISTS writes (
+        thread_id TEXT NOT NULL,
+        checkpoint_ns TEXT NOT NULL DEFAULT '',
+        checkpoint_id TEXT NOT NULL,
+        task_id TEXT NOT NULL,
+        task_path TEXT NOT NULL DEFAULT '',
+        idx INTEGER NOT NULL,
+        channel TEXT NOT NULL,
+        type TEXT,
+        value BLOB,
+        PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+    )""",
+    # Nodes a checkpoint is about to run (StateSnapshot.next), one row per node
+    """CREATE TABLE IF NOT EXISTS checkpoint_nodes (
+        thread_id TEXT NOT NULL,
+        checkpoint_ns TEXT NOT NULL DEFAULT '',
+        checkpoint_id TEXT NOT NULL,
+        node TEXT NOT NULL,
+        PRIMARY KEY (thread_id, checkpoint_ns, node, checkpoint_id)
+    )""",
+)
+
+# Columns added to the checkpoints table after its first version (name -> type)
+HISTORY_COLUMNS = {"step": "INTEGER", "source": "TEXT", "created_at": "TEXT"}
+
+INDEXES = (
+    "CREATE INDEX IF NOT EXISTS checkpoints_by_step ON checkpoints (thread_id, checkpoint_ns, step)",
+    "CREATE INDEX IF NOT EXISTS checkpoints_by_time ON checkpoints (thread_id, checkpoint_ns, created_at)",
+    "CREATE INDEX IF NOT EXISTS checkpoint_nodes_by_checkpoint ON checkpoint_nodes (thread_id, checkpoint_ns, checkpoint_id)",
+)
+
+INSERT_CHECKPOINT = (
+    "INSERT OR REPLACE INTO checkpoints "
+    "(thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata, step, source, created_at) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+INSERT_NODE = "INSERT OR IGNORE INTO checkpoint_nodes (thread_id, checkpoint_ns, checkpoint_id, node) VALUES (?, ?, ?, ?)"
+# Special channels (errors, interrupts, ...) replace a previous write; regular writes keep the first
+INSERT_WRITE = {
+    True: "INSERT OR REPLACE INTO writes "
+    "(thread_id, checkpoint_ns, checkpoint_id, task_id, task_path, idx, channel, type, value) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    False: "INSERT OR IGNORE INTO writes "
+    "(thread_id, checkpoint_ns, checkpoint_id, task_id, task_path, idx, channel, type, value) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+}
+SELECT_CHECKPOINT = (
+    "SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata FROM checkpoints "
+    "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?"
+)
+SELECT_LATEST_CHECKPOINT = (
+    "SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata FROM checkpoints "
+    "WHERE thread_id = ? AND checkpoint_ns = ? ORDER BY checkpoint_id DESC LIMIT 1"
+)
+SELECT_HISTORY = "SELECT checkpoint_id, parent_checkpoint_id, step FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?"
+SELECT_THREAD_ACTIVITY = "SELECT thread_id, MAX(created_at) FROM checkpoints GROUP BY thread_id"
+SELECT_WRITES = (
+    "SELECT task_id, channel, type, value FROM writes "
+    "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? "
+    "ORDER BY task_path, task_id, idx"
+)
+
+# Metadata keys usable in list(filter=...); the indexed ones are matched on their column
+FILTER_KEY = re.compile(r"^[a-zA-Z0-9_.-]+$")
+INDEXED_METADATA = ("step", "source")
+
+# Channels through which a checkpoint schedules its next nodes
+BRANCH_PREFIX = "branch:to:"
+START_CHANNEL = "__start__"
+TASKS_CHANNEL = "__pregel_tasks"
+
+# Buffered write row (replace flag, parameters of INSERT_WRITE)
+WriteRow = Tuple[bool, tuple]
+
+
+def is_delta(value: Any) -> bool:
+    return isinstance(value, dict) and DELTA_KEY in value
+
+
+def _frozen(value: Any) -> Any:
+    """Immutable copy of a message field (strings are already immutable)."""
+    if value is None or isinstance(value, (str, bytes, int, float)):
+        return value
+    return json.dumps(value, sort_keys=True, default=str)
+
+
+def message_fingerprint(message: Any) -> tuple:
+    """
+    What the delta encoding compares a message on: its type, id, content and
+    tool calls, copied when the message is saved.
+
+    Comparing the objects themselves would miss a message edited in place
+    (same object, new content), and the stored delta would restore the old one.
+    """
+    return (
+        type(message).__name__,
+        getattr(message, "id", None),
+        _frozen(getattr(message, "content", message)),
+        _frozen(getattr(message, "tool_calls", None)),
+    )
+
+
+def common_prefix(old: Sequence[tuple], new: Sequence[tuple]) -> int:
+    """Number of leading messages two lists of message fingerprints share."""
+    n = min(len(old), len(new))
+    for i in range(n):
+        if old[i] != new[i]:
+            return i
+    return n
+
+
+class DeltaHead:
+    """Latest checkpoint of a thread, with the message fingerprints the next checkpoint is diffed against."""
+
+    def __init__(self, checkpoint_id: str, depth: int, values: Dict[str, tuple]) -> None:
+        self.checkpoint_id = checkpoint_id
+        self.depth = depth  # Checkpoints since the last keyframe
+        self.values = values
+
+
+def _filter_value(value: Any) -> Tuple[str, Any]:
+    """SQL comparison and parameter matching json_extract() of a metadata value."""
+    if value is None:
+        return "IS ?", None
+    if isinstance(value, bool):
+        return "= ?", int(value)
+    if isinstance(value, (str, int, float)):
+        return "= ?", value
+    if isinstance(value, (dict, list)):
+        # json_extract() returns objects and arrays as compact JSON text
+        return "= ?", json.dumps(value, separators=(",", ":"))
+    return "= ?", str(value)
+
+
+def next_nodes(checkpoint: Checkpoint) -> List[str]:
+    """Nodes a checkpoint is about to run: edges it triggered, the input node and Send targets."""
+    nodes = []
+    for channel in checkpoint.get("updated_channels") or ():
+        if channel.startswith(BRANCH_PREFIX):
+            nodes.append(channel[len(BRANCH_PREFIX):])
+        elif channel == START_CHANNEL:
+            nodes.append(START_CHANNEL)
+        elif channel == TASKS_CHANNEL:
+            nodes.extend(getattr(send, "node", None) for send in checkpoint["channel_values"].get(TASKS_CHANNEL, ()))
+    return sorted({node for node in nodes if node})
+
+
+def to_timestamp(at: Union[str, datetime]) -> str:
+    """Checkpoint timestamp (ISO 8601, UTC) comparable with the stored `ts` of checkpoints."""
+    if isinstance(at, str):
+        return at
+    if at.tzinfo is None:
+        at = at.astimezone()
+    return at.astimezone(timezone.utc).isoformat()
+
+
+class HistoryEntry(NamedTuple):
+    """A checkpoint of a thread's history, without its state."""
+
+    config: RunnableConfig  # Pass to get_state / update_state / invoke to inspect, fork or replay
+    checkpoint_id: str
+    parent_checkpoint_id: Optional[str]
+    step: Optional[int]
+    source: Optional[str]
+    created_at: Optional[str]
+    next: Tuple[str, ...]
+
+
+class SaverStats:
+    """Checkpoints, writes and transactions committed by a SqliteWalSaver."""
+
+    def __init__(self) -> None:
+        self.checkpoints = 0
+        self.writes = 0
+        self.transactions = 0
+        self.bytes_written = 0
+        self.put_seconds = 0.0
+        self.keyframes = 0
+        self.deltas = 0
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "checkpoints": self.checkpoints,
+            "writes": self.writes,
+            "transactions": self.transactions,
+            "writes_per_transaction": round(self.writes / self.transactions, 2) if self.transactions else 0.0,
+            "bytes_written": self.bytes_written,
+            "avg_put_ms": round(self.put_seconds / self.checkpoints * 1000, 3) if self.checkpoints else 0.0,
+            "keyframes": self.keyframes,
+            "deltas": self.deltas,
+        }
+
+
+def _close_at_exit(ref: "weakref.ReferenceType[SqliteWalSaver]") -> None:
+    saver = ref()
+    if saver is not None:
+        saver.close()
+
+
+class SqliteWalSaver(BaseCheckpointSaver[str]):
+    """Checkpoint saver on a SQLite database in WAL mode, with one transaction per super-step."""
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        *,
+        serde: Optional[SerializerProtocol] = None,
+        flush_interval: Optional[float] = DEFAULT_FLUSH_INTERVAL,
+        delta_channels: Sequence[str] = DEFAULT_DELTA_CHANNELS,
+        keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL,
+        retention: Optional[RetentionPolicy] = None,
+        compact_every: Optional[int] = DEFAULT_COMPACT_EVERY,
+    ) -> None:
+        """
+        Args:
+            path: SQLite database file (created if missing)
+            serde: Serializer of checkpoints and writes (langgraph's default if None)
+            flush_interval: Seconds pending writes wait for their step's checkpoint
+                (0 commits every put_writes call on its own)
+            delta_channels: List channels stored as deltas against the parent
+                checkpoint (empty: every checkpoint stores full values)
+            keyframe_interval: A full copy of the delta channels is stored every
+                keyframe_interval checkpoints, bounding the chain a read replays
+            retention: Checkpoints and threads kept by compact() (None keeps everything)
+            compact_every: Checkpoints saved between two automatic compactions when
+                a retention policy is set (None or 0: only explicit compact() calls)
+        """
+        super().__init__(serde=serde)
+        self.path = str(path)
+        self.flush_interval = flush_interval
+        self.stats = SaverStats()
+        self._lock = threading.RLock()  # Guards the write connection and the write buffer
+        self._buffer: List[WriteRow] = []
+        self._timer: Optional[threading.Timer] = None
+        self._local = threading.local()
+        self._readers: List[Tuple[threading.Thread, sqlite3.Connection]] = []
+        self._closed = False
+        self.delta_channels = tuple(delta_channels)
+        self.keyframe_interval = keyframe_interval
+        self._heads: "OrderedDict[Tuple[str, str], DeltaHead]" = OrderedDict()
+        self.retention = retention
+        self.compact_every = compact_every
+        self.report = CompactionReport()
+        self._puts = 0
+
+        self._conn = self._connect()
+        with self._conn:
+            for statement in SCHEMA:
+                self._conn.execute(statement)
+            self._migrate()
+            for statement in INDEXES:
+                self._conn.execute(statement)
+        # Commit buffered writes before the interpreter exits
+        atexit.register(_close_at_exit, weakref.ref(self))
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    def _migrate(self) -> None:
+        """Add the history columns to a database created before they existed."""
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(checkpoints)")}
+        missing = [name for name in HISTORY_COLUMNS if name not in columns]
+        for name in missing:
+            self._conn.execute(f"ALTER TABLE checkpoints ADD COLUMN {name} {HISTORY_COLUMNS[name]}")
+        if missing:
+            # Step and source are in the metadata; creation times and next nodes stay unknown
+            self._conn.execute(
+                "UPDATE checkpoints SET "
+                "step = json_extract(CAST(metadata AS TEXT), '$.step'), "
+                "source = json_extract(CAST(metadata AS TEXT), '$.source')"
+            )
+
+    def _reader(self) -> sqlite3.Connection:
+        """Connection of the calling thread for reads (WAL readers run alongside the writer).
+
+        Every reader is tracked with its thread: close() closes them all, and the
+        readers of threads that have exited are closed when a new one is opened.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            conn.execute("PRAGMA query_only=ON")
+            self._local.conn = conn
+            with self._lock:
+                alive = []
+                for thread, reader in self._readers:
+                    if thread.is_alive():
+                        alive.append((thread, reader))
+                    else:
+                        reader.close()
+                self._readers = alive + [(threading.current_thread(), conn)]
+        return conn
+
+    # ------------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------------
+
+    def _commit_writes(self, rows: List[WriteRow]) -> None:
+        """Insert buffered write rows (caller holds the lock and the transaction)."""
+        for replace in (True, False):
+            params = [row for flag, row in rows if flag is replace]
+            if params:
+                self._conn.executemany(INSERT_WRITE[replace], params)
+        self.stats.writes += len(rows)
+        self.stats.bytes_written += sum(len(row[-1] or b"") for _, row in rows)
+
+    def _take_buffer(self) -> List[WriteRow]:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        rows, self._buffer = self._buffer, []
+        return rows
+
+    def flush(self) -> None:
+        """Commit the buffered writes now."""
+        with self._lock:
+            rows = self._take_buffer()
+            if not rows or self._closed:
+                return
+            with self._conn:
+                self._commit_writes(rows)
+            self.stats.transactions += 1
+
+    def _encode_deltas(
+        self, key: Tuple[str, str], parent_id: Optional[str], checkpoint: Checkpoint
+    ) -> Tuple[Checkpoint, Optional[DeltaHead]]:
+        """
+        Checkpoint to store, with its delta channels encoded against the parent checkpoint.
+
+        A channel is stored in full (a keyframe) when the parent is not the
+        thread's latest checkpoint known to this saver (first write after a
+        restart, a fork from an older checkpoint ...) or every keyframe_interval
+        checkpoints.
+
+        Returns:
+            Tuple of (checkpoint to serialize, new head of the thread or None if
+            it has no delta channel)
+        """
+        values = checkpoint["channel_values"]
+        lists = {c: values[c] for c in self.delta_channels if isinstance(values.get(c), list)}
+        if not lists:
+            return checkpoint, None
+        previous = self._heads.get(key)
+        chained = previous is not None and parent_id is not None and previous.checkpoint_id == parent_id
+        depth = previous.depth + 1 if chained and previous.depth + 1 < self.keyframe_interval else 0
+
+        encoded = dict(values)
+        fingerprints = {c: tuple(map(message_fingerprint, m)) for c, m in lists.items()}
+        for channel, messages in lists.items():
+            base = previous.values.get(channel) if depth else None
+            if base is None:
+                self.stats.keyframes += 1
+                continue
+            keep = common_prefix(base, fingerprints[channel])
+            encoded[channel] = {DELTA_KEY: {"base": parent_id, "keep": keep, "append": messages[keep:]}}
+            self.stats.deltas += 1
+        head = DeltaHead(checkpoint["id"], depth, fingerprints)
+        return {**checkpoint, "channel_values": encoded}, head
+
+    def _decode_deltas(
+        self, conn: sqlite3.Connection, thread_id: str, checkpoint_ns: str, checkpoint: Checkpoint
+    ) -> Checkpoint:
+        """Rebuild the delta-encoded channels of a stored checkpoint from their keyframe."""
+        values = checkpoint["channel_values"]
+        for channel, value in list(values.items()):
+            if not is_delta(value):
+                continue
+            # Walk back to the nearest full value, then replay the deltas forward
+            chain = []
+            while is_delta(value):
+                delta = value[DELTA_KEY]
+                chain.append(delta)
+                row = conn.execute(SELECT_CHECKPOINT, (thread_id, checkpoint_ns, delta["base"])).fetchone()
+                if row is None:
+                    raise ValueError(f"Base checkpoint {delta['base']} of a {channel!r} delta is missing")
+                value = self.serde.loads_typed((row[2], row[3]))["channel_values"].get(channel, [])
+            messages = list(value)
+            for delta in reversed(chain):
+                messages = messages[: delta["keep"]] + list(delta["append"])
+            values[channel] = messages
+        return checkpoint
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """Save a checkpoint, in one transaction with the writes buffered during its step."""
+        start = time.perf_counter()
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        parent_id = config["configurable"].get("checkpoint_id")
+        with self._lock:
+            stored, head = self._encode_deltas((thread_id, checkpoint_ns), parent_id, checkpoint)
+        type_, serialized_checkpoint = self.serde.dumps_typed(stored)
+        full_metadata = get_checkpoint_metadata(config, metadata)
+        serialized_metadata = json.dumps(full_metadata, ensure_ascii=False).encode("utf-8", "ignore")
+        row = (
+            thread_id,
+            checkpoint_ns,
+            checkpoint["id"],
+            parent_id,
+            type_,
+            serialized_checkpoint,
+            serialized_metadata,
+            full_metadata.get("step"),
+            full_metadata.get("source"),
+            checkpoint.get("ts"),
+        )
+        node_rows = [(thread_id, checkpoint_ns, checkpoint["id"], node) for node in next_nodes(checkpoint)]
+        with self._lock:
+            rows = self._take_buffer()
+            with self._conn:
+                self._commit_writes(rows)
+                self._conn.execute(INSERT_CHECKPOINT, row)
+                self._conn.executemany(INSERT_NODE, node_rows)
+            if head is not None:
+                self._heads[(thread_id, checkpoint_ns)] = head
+                self._heads.move_to_end((thread_id, checkpoint_ns))
+                while len(self._heads) > MAX_DELTA_HEADS:
+                    self._heads.popitem(last=False)
+            self.stats.checkpoints += 1
+            self.stats.transactions += 1
+            self.stats.bytes_written += len(serialized_checkpoint) + len(serialized_metadata)
+            self.stats.put_seconds += time.perf_counter() - start
+            self._puts += 1
+            if self.retention is not None and self.compact_every and self._puts % self.compact_every == 0:
+                self.compact()
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        """Buffer the writes of a task until its step's checkpoint (or the flush timer)."""
+        replace = all(channel in WRITES_IDX_MAP for channel, _ in writes)
+        configurable = config["configurable"]
+        rows = [
+            (
+                replace,
+                (
+                    str(configurable["thread_id"]),
+                    str(configurable.get("checkpoint_ns", "")),
+                    str(configurable["checkpoint_id"]),
+                    task_id,
+                    task_path,
+                    WRITES_IDX_MAP.get(channel, idx),
+                    channel,
+                    *self.serde.dumps_typed(value),
+                ),
+            )
+            for idx, (channel, value) in enumerate(writes)
+        ]
+        with self._lock:
+            self._buffer.extend(rows)
+            if not self.flush_interval:
+                self.flush()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def delete_thread(self, thread_id: str) -> None:
+        """Delete all checkpoints and writes of a thread."""
+        with self._lock:
+            self.flush()
+            with self._conn:
+                self._conn.execute("DELETE FROM checkpoints WHERE thread_id = ?", (str(thread_id),))
+                self._conn.execute("DELETE FROM writes WHERE thread_id = ?", (str(thread_id),))
+                self._conn.execute("DELETE FROM checkpoint_nodes WHERE thread_id = ?", (str(thread_id),))
+            for key in [key for key in self._heads if key[0] == str(thread_id)]:
+                del self._heads[key]
+
+    # ------------------------------------------------------------------------
+    # Compaction
+    # ------------------------------------------------------------------------
+
+    def _compact_namespace(self, thread_id: str, checkpoint_ns: str) -> Tuple[int, int]:
+        """Drop the checkpoints of one namespace the policy does not keep; return (checkpoints, writes) dropped."""
+        rows = self._conn.execute(SELECT_HISTORY, (thread_id, checkpoint_ns)).fetchall()
+        kept = self.retention.retained([(checkpoint_id, step) for checkpoint_id, _, step in rows])
+        if len(kept) == len(rows):
+            return 0, 0
+        relinked = relink({checkpoint_id: parent for checkpoint_id, parent, _ in rows}, kept)
+
+        # A kept checkpoint whose parent is dropped loses its delta base: store it in full
+        keyframes = []
+        for checkpoint_id in relinked:
+            _, _, type_, blob, _ = self._conn.execute(SELECT_CHECKPOINT, (thread_id, checkpoint_ns, checkpoint_id)).fetchone()
+            checkpoint = self.serde.loads_typed((type_, blob))
+            if any(is_delta(value) for value in checkpoint["channel_values"].values()):
+                checkpoint = self._decode_deltas(self._conn, thread_id, checkpoint_ns, checkpoint)
+                keyframes.append((*self.serde.dumps_typed(checkpoint), thread_id, checkpoint_ns, checkpoint_id))
+
+        dropped = [(thread_id, checkpoint_ns, checkpoint_id) for checkpoint_id, _, _ in rows if checkpoint_id not in kept]
+        key = "thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?"
+        with self._conn:
+            self._conn.executemany(f"UPDATE checkpoints SET type = ?, checkpoint = ? WHERE {key}", keyframes)
+            self._conn.executemany(
+                f"UPDATE checkpoints SET parent_checkpoint_id = ? WHERE {key}",
+                [(parent, thread_id, checkpoint_ns, checkpoint_id) for checkpoint_id, parent in relinked.items()],
+            )
+            self._conn.executemany(f"DELETE FROM checkpoints WHERE {key}", dropped)
+            self._conn.executemany(f"DELETE FROM checkpoint_nodes WHERE {key}", dropped)
+            writes = self._conn.executemany(f"DELETE FROM writes WHERE {key}", dropped).rowcount
+        self.stats.keyframes += len(keyframes)
+        head = self._heads.get((thread_id, checkpoint_ns))
+        if head is not None and head.checkpoint_id not in kept:
+            del self._heads[(thread_id, checkpoint_ns)]
+        return len(dropped), writes
+
+    def compact(self, thread_ids: Optional[Sequence[str]] = None) -> CompactionReport:
+        """
+        Apply the retention policy: delete expired threads and drop the checkpoints it does not keep.
+
+        Args:
+            thread_ids: Threads to compact (all of them if None); threads are
+                only deleted by TTL or LRU when compacting all of them
+
+        Returns:
+            What this compaction removed (also added to `report`)
+        """
+        start = time.perf_counter()
+        report = CompactionReport()
+        if self.retention is None:
+            return report
+        report.runs = 1
+        with self._lock:
+            self.flush()
+            if thread_ids is None:
+                activity = {
+                    thread_id: timestamp(created_at)
+                    for thread_id, created_at in self._conn.execute(SELECT_THREAD_ACTIVITY).fetchall()
+                }
+                expired = self.retention.expired(activity)
+                for thread_id in expired:
+                    report.checkpoints_dropped += self._conn.execute(
+                        "SELECT COUNT(*) FROM checkpoints WHERE thread_id = ?", (thread_id,)
+                    ).fetchone()[0]
+                    report.writes_dropped += self._conn.execute(
+                        "SELECT COUNT(*) FROM writes WHERE thread_id = ?", (thread_id,)
+                    ).fetchone()[0]
+                    self.delete_thread(thread_id)
+                    report.threads_deleted += 1
+                thread_ids = [thread_id for thread_id in activity if thread_id not in expired]
+            for thread_id in thread_ids:
+                namespaces = self._conn.execute(
+                    "SELECT DISTINCT checkpoint_ns FROM checkpoints WHERE thread_id = ?", (str(thread_id),)
+                ).fetchall()
+                for (checkpoint_ns,) in namespaces:
+                    checkpoints, writes = self._compact_namespace(str(thread_id), checkpoint_ns)
+                    report.checkpoints_dropped += checkpoints
+                    report.writes_dropped += writes
+        report.seconds = time.perf_counter() - start
+        self.report.add(report)
+        return report
+
+    # ------------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------------
+
+    def _tuple(
+        self,
+        conn: sqlite3.Connection,
+        thread_id: str,
+        checkpoint_ns: str,
+        row: tuple,
+    ) -> CheckpointTuple:
+        checkpoint_id, parent_checkpoint_id, type_, checkpoint, metadata = row
+        writes = conn.execute(SELECT_WRITES, (thread_id, checkpoint_ns, checkpoint_id)).fetchall()
+        return CheckpointTuple(
+            {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id}},
+            self._decode_deltas(conn, thread_id, checkpoint_ns, self.serde.loads_typed((type_, checkpoint))),
+            json.loads(metadata) if metadata is not None else {},
+            (
+                {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": parent_checkpoint_id}}
+                if parent_checkpoint_id
+                else None
+            ),
+            [(task_id, channel, self.serde.loads_typed((t, v))) for task_id, channel, t, v in writes],
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """Get the checkpoint of the config (the latest of the thread if it has no checkpoint_id)."""
+        self.flush()
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        conn = self._reader()
+        if checkpoint_id := get_checkpoint_id(config):
+            row = conn.execute(SELECT_CHECKPOINT, (thread_id, checkpoint_ns, checkpoint_id)).fetchone()
+        else:
+            row = conn.execute(SELECT_LATEST_CHECKPOINT, (thread_id, checkpoint_ns)).fetchone()
+        return self._tuple(conn, thread_id, checkpoint_ns, row) if row else None
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        """List checkpoints, newest first, optionally filtered by thread, metadata and position."""
+        self.flush()
+        predicates, params = [], []
+        if config is not None:
+            predicates.append("thread_id = ?")
+            params.append(str(config["configurable"]["thread_id"]))
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                predicates.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                predicates.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        for key, value in (filter or {}).items():
+            if not FILTER_KEY.match(key):
+                raise ValueError(f"Invalid filter key: {key!r}")
+            operator, param = _filter_value(value)
+            column = key if key in INDEXED_METADATA else f"json_extract(CAST(metadata AS TEXT), '$.{key}')"
+            predicates.append(f"{column} {operator}")
+            params.append(param)
+        if before is not None:
+            predicates.append("checkpoint_id < ?")
+            params.append(get_checkpoint_id(before))
+
+        # Select the keys first and load each checkpoint as it is consumed, so a caller
+        # that stops early (e.g. after the first match) deserializes nothing more
+        query = "SELECT thread_id, checkpoint_ns, checkpoint_id FROM checkpoints"
+        if predicates:
+            query += " WHERE " + " AND ".join(predicates)
+        query += " ORDER BY checkpoint_id DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        conn = self._reader()
+        for thread_id, checkpoint_ns, checkpoint_id in conn.execute(query, params).fetchall():
+            row = conn.execute(SELECT_CHECKPOINT, (thread_id, checkpoint_ns, checkpoint_id)).fetchone()
+            if row is not None:
+                yield self._tuple(conn, thread_id, checkpoint_ns, row)
+
+    # ------------------------------------------------------------------------
+    # Indexed history
+    # ------------------------------------------------------------------------
+
+    def history(
+        self,
+        config: RunnableConfig,
+        *,
+        limit: int = 50,
+        before: Optional[Union[str, RunnableConfig]] = None,
+        step: Optional[int] = None,
+        node: Optional[str] = None,
+        since: Optional[Union[str, datetime]] = None,
+        until: Optional[Union[str, datetime]] = None,
+    ) -> List[HistoryEntry]:
+        """
+        One page of a thread's checkpoints, newest first, without deserializing any state.
+
+        Args:
+            config: Config of the thread (thread_id and optional checkpoint_ns)
+            limit: Maximum number of entries of the page
+            before: Checkpoint id (or config) the page starts after; pass the last
+                entry of the previous page to get the next one
+            step: Only checkpoints of this step
+            node: Only checkpoints about to run this node
+            since: Only checkpoints created at or after this time
+            until: Only checkpoints created at or before this time
+
+        Returns:
+            History entries; their config can be passed to get_state, update_state
+            (to fork) or invoke(None, config) (to replay)
+        """
+        self.flush()
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        predicates, params = ["c.thread_id = ?", "c.checkpoint_ns = ?"], [thread_id, checkpoint_ns]
+        if before is not None:
+            predicates.append("c.checkpoint_id < ?")
+            params.append(before if isinstance(before, str) else get_checkpoint_id(before))
+        if step is not None:
+            predicates.append("c.step = ?")
+            params.append(step)
+        if since is not None:
+            predicates.append("c.created_at >= ?")
+            params.append(to_timestamp(since))
+        if until is not None:
+            predicates.append("c.created_at <= ?")
+            params.append(to_timestamp(until))
+        if node is not None:
+            predicates.append(
+                "c.checkpoint_id IN (SELECT checkpoint_id FROM checkpoint_nodes "
+                "WHERE thread_id = ? AND checkpoint_ns = ? AND node = ?)"
+            )
+            params.extend((thread_id, checkpoint_ns, node))
+        params.append(limit)
+
+        rows = self._reader().execute(
+            "SELECT c.checkpoint_id, c.parent_checkpoint_id, c.step, c.source, c.created_at, "
+            "(SELECT group_concat(n.node) FROM checkpoint_nodes n WHERE n.thread_id = c.thread_id "
+            "AND n.checkpoint_ns = c.checkpoint_ns AND n.checkpoint_id = c.checkpoint_id) "
+            f"FROM checkpoints c WHERE {' AND '.join(predicates)} ORDER BY c.checkpoint_id DESC LIMIT ?",
+            params,
+        ).fetchall()
+        return [
+            HistoryEntry(
+                {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id}},
+                checkpoint_id,
+                parent_checkpoint_id,
+                step_,
+                source,
+                created_at,
+                tuple(sorted(nodes.split(","))) if nodes else (),
+            )
+            for checkpoint_id, parent_checkpoint_id, step_, source, created_at, nodes in rows
+        ]
+
+    def find_checkpoint(
+        self,
+        config: RunnableConfig,
+        *,
+        step: Optional[int] = None,
+        node: Optional[str] = None,
+        at: Optional[Union[str, datetime]] = None,
+    ) -> Optional[HistoryEntry]:
+        """
+        Latest checkpoint of a thread matching a step, a next node and/or a point in time.
+
+        Args:
+            config: Config of the thread (thread_id and optional checkpoint_ns)
+            step: Step of the checkpoint
+            node: Node the checkpoint is about to run (the replay point before that node)
+            at: Time; the last checkpoint created at or before it
+
+        Returns:
+            The matching history entry, or None
+        """
+        entries = self.history(config, limit=1, step=step, node=node, until=at)
+        return entries[0] if entries else None
+
+    # ------------------------------------------------------------------------
+    # Async API (the same operations, off the event loop)
+    # ------------------------------------------------------------------------
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        tuples = await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for checkpoint_tuple in tuples:
+            yield checkpoint_tuple
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        # Off the event loop: put_writes waits for the lock, which put() holds while
+        # it rewrites a keyframe or compacts
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    async def acompact(self, thread_ids: Optional[Sequence[str]] = None) -> CompactionReport:
+        return await asyncio.to_thread(self.compact, thread_ids)
+
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        """Monotonically increasing channel version (same format as langgraph's savers)."""
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+    # ------------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------------
+
+    def close(self) -> None:
+        """Commit the buffered writes and close every connection."""
+        with self._lock:
+            if self._closed:
+                return
+            self.flush()
+            self._closed = True
+            for conn in [self._conn, *(reader for _, reader in self._readers)]:
+                conn.close()
+            self._readers = []
+
+    def __enter__(self) -> "SqliteWalSaver":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
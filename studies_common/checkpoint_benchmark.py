@@ -0,0 +1,179 @@
+"""
+Throughput benchmark of the checkpointers.
+
+Runs a chat-like graph (one message appended per super-step, two parallel
+nodes per step) on several threads and reports the super-steps per second
+with:
+
+- MemorySaver (langgraph's in-memory saver, the baseline)
+- SqliteSaver (langgraph-checkpoint-sqlite, one transaction per write call),
+  if installed
+- SqliteWalSaver (studies_common.checkpoint)
+
+then repeats the SQLite runs with reader threads polling `get_state` to
+show that WAL readers do not stall the writer. Finally it grows single
+conversations to increasing lengths with full and delta-encoded message
+checkpoints, reporting the bytes written, the write latency per step and the
+latency of reading the final state, and the memory an InMemorySaver holds
+for them with and without a retention policy (keep the last 20 checkpoints).
+
+    python -m studies_common.checkpoint_benchmark --threads 20 --steps 50 --readers 4 --lengths 100,300,1000
+
+No API keys or network access are needed.
+"""
+
+import argparse
+import operator
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Annotated, Callable, Dict, Optional
+
+from langchain_core.messages import AIMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, START, StateGraph
+from langgraph.graph.message import add_messages
+from typing_extensions import TypedDict
+
+from studies_common.checkpoint import SqliteWalSaver
+from studies_common.retention import RetainingMemorySaver, RetentionPolicy, memory_size
+
+
+MESSAGE = "lorem ipsum dolor sit amet " * 8  # ~200 characters per message
+
+
+class State(TypedDict):
+    step: int
+    messages: Annotated[list, add_messages]
+    notes: Annotated[list, operator.add]
+
+
+def build_graph(checkpointer, steps: int):
+    """Loop of `steps` super-steps, each running a chat node and a note-taking node in parallel."""
+
+    def chat(state: State):
+        return {"step": state["step"] + 1, "messages": [AIMessage(content=f"{state['step']}: {MESSAGE}")]}
+
+    def take_note(state: State):
+        return {"notes": [state["step"]]}
+
+    def route(state: State):
+        return END if state["step"] >= steps else ["chat", "take_note"]
+
+    builder = StateGraph(State)
+    builder.add_node("chat", chat)
+    builder.add_node("take_note", take_note)
+    builder.add_edge(START, "chat")
+    builder.add_edge(START, "take_note")
+    builder.add_conditional_edges("chat", route, ["chat", "take_note", END])
+    return builder.compile(checkpointer=checkpointer)
+
+
+def langgraph_sqlite_saver(path: Path):
+    """langgraph's SqliteSaver on the file, or None if langgraph-checkpoint-sqlite is missing."""
+    try:
+        from langgraph.checkpoint.sqlite import SqliteSaver
+    except ImportError:
+        return None
+    return SqliteSaver(sqlite3.connect(str(path), check_same_thread=False))
+
+
+def run(name: str, checkpointer, threads: int, steps: int, readers: int = 0) -> Dict[str, float]:
+    """Run `threads` conversations of `steps` super-steps; return steps/s (and reads/s)."""
+    graph = build_graph(checkpointer, steps)
+    done = threading.Event()
+    reads = [0] * readers
+
+    def read(i: int) -> None:
+        config = {"configurable": {"thread_id": "bench-0"}}
+        while not done.is_set():
+            graph.get_state(config)
+            reads[i] += 1
+
+    reader_threads = [threading.Thread(target=read, args=(i,), daemon=True) for i in range(readers)]
+    start = time.perf_counter()
+    for reader in reader_threads:
+        reader.start()
+    for t in range(threads):
+        state = graph.invoke({"step": 0, "messages": [], "notes": []}, {"configurable": {"thread_id": f"bench-{t}"}})
+        assert state["step"] == steps
+    wall = time.perf_counter() - start
+    done.set()
+    for reader in reader_threads:
+        reader.join()
+
+    result = {"steps_per_s": threads * steps / wall, "reads_per_s": sum(reads) / wall}
+    line = f"{name:<34} {result['steps_per_s']:8.0f} steps/s"
+    if readers:
+        line += f"   {result['reads_per_s']:8.0f} get_state/s ({readers} readers)"
+    print(line)
+    return result
+
+
+def run_growth(name: str, saver: SqliteWalSaver, length: int) -> None:
+    """Grow one conversation to `length` messages and report bytes written and latencies."""
+    graph = build_graph(saver, length)
+    config = {"configurable": {"thread_id": "growth"}, "recursion_limit": 2 * length + 10}
+    graph.invoke({"step": 0, "messages": [], "notes": []}, config)
+    start = time.perf_counter()
+    state = graph.get_state(config)
+    read_ms = (time.perf_counter() - start) * 1000
+    assert len(state.values["messages"]) == length
+    stats = saver.stats.summary()
+    print(f"{name:<10} {length:>6} messages  {stats['bytes_written'] / 1e6:9.2f} MB written  "
+          f"{stats['avg_put_ms']:7.3f} ms/checkpoint  {read_ms:7.2f} ms to read the final state")
+
+
+def run_retention(name: str, saver: MemorySaver, length: int) -> None:
+    """Grow one conversation to `length` messages and report what the in-memory saver holds."""
+    graph = build_graph(saver, length)
+    config = {"configurable": {"thread_id": "growth"}, "recursion_limit": 2 * length + 10}
+    graph.invoke({"step": 0, "messages": [], "notes": []}, config)
+    size = memory_size(saver)
+    print(f"{name:<10} {length:>6} messages  {size['bytes'] / 1e6:9.2f} MB held  {size['checkpoints']:>6} checkpoints")
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, default=20, help="conversations (thread ids) to run")
+    parser.add_argument("--steps", type=int, default=50, help="super-steps per conversation")
+    parser.add_argument("--readers", type=int, default=4, help="reader threads of the concurrent runs")
+    parser.add_argument("--lengths", default="100,300,1000", help="conversation lengths of the growth runs")
+    args = parser.parse_args(argv)
+
+    print(f"{args.threads} threads x {args.steps} super-steps\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        # Saver name -> factory taking a fresh database path
+        savers: Dict[str, Callable[[Path], object]] = {
+            "MemorySaver": lambda path: MemorySaver(),
+            "SqliteSaver (langgraph)": langgraph_sqlite_saver,
+            "SqliteWalSaver": SqliteWalSaver,
+        }
+        runs = [(name, 0) for name in savers]
+        if args.readers:
+            runs += [(name, args.readers) for name in list(savers)[1:]]
+        for i, (name, readers) in enumerate(runs):
+            if i == len(savers):
+                print()
+            saver = savers[name](Path(tmp) / f"run-{i}.sqlite")
+            if saver is None:
+                print(f"{name:<34} skipped (langgraph-checkpoint-sqlite is not installed)")
+                continue
+            run(f"{name} + readers" if readers else name, saver, args.threads, args.steps, readers=readers)
+
+        print()
+        for length in (int(n) for n in args.lengths.split(",") if n):
+            for name, delta_channels in [("full", ()), ("delta", ("messages",))]:
+                path = Path(tmp) / f"growth-{name}-{length}.sqlite"
+                run_growth(name, SqliteWalSaver(path, delta_channels=delta_channels), length)
+
+        print()
+        for length in (int(n) for n in args.lengths.split(",") if n):
+            run_retention("memory", MemorySaver(), length)
+            run_retention("retained", RetainingMemorySaver(RetentionPolicy(keep_last=20), compact_every=20), length)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""
+Rich console rendering of messages and retriever results.
+
+`format_messages` prints a finished message list; `stream_messages` renders a
+graph run while it executes (tokens as they arrive, oversized payloads
+collapsed to a configurable size).
+"""
+
+import json
+import os
+from typing import Any, Dict, Optional
+
+from rich.console import Console
+from rich.markup import escape
+from rich.panel import Panel
+
+from studies_common.local_router import SPECULATIVE_TAG
+
+
+# Initialize console for rich formatting
+console = Console()
+
+# Default cap (characters) on a rendered message, overridable with RENDER_MAX_CHARS
+DEFAULT_MAX_CHARS = int(os.environ.get("RENDER_MAX_CHARS", 2000))
+
+# Panel title and border style per message type
+MESSAGE_STYLES = {
+    'Human': ("🧑 Human", "blue"),
+    'Ai': ("🤖 Assistant", "green"),
+    'Tool': ("🔧 Tool Output", "yellow"),
+}
+
+
+def truncate_content(text: str, max_chars: Optional[int]) -> str:
+    """
+    Collapse the middle of a text longer than max_chars.
+    
+    Args:
+        text: Text to display
+        max_chars: Maximum number of characters kept (None or 0 keeps everything)
+    
+    Returns:
+        The text, or its beginning and end around a note on how much was hidden
+    """
+    if not max_chars or len(text) <= max_chars:
+        return text
+    head = max_chars * 3 // 4
+    tail = max_chars - head
+    hidden = len(text) - head - tail
+    return f"{text[:head]}\n… ({hidden} characters hidden) …\n{text[-tail:] if tail else ''}"
+
+
+# Format message content
+def format_message_content(message):
+    """Convert message content to displayable string"""
+    if isinstance(message.content, str):
+        return message.content
+    elif isinstance(message.content, list):
+        # Handle complex content like tool calls
+        parts = []
+        for item in message.content:
+            if item.get('type') == 'text':
+                parts.append(item['text'])
+            elif item.get('type') == 'tool_use':
+                parts.append(f"\n🔧 Tool Call: {item['name']}")
+                parts.append(f"   Args: {json.dumps(item['input'], indent=2)}")
+        return "\n".join(parts)
+    else:
+        return str(message.content)
+
+
+# Format messages
+def format_messages(messages, max_chars: Optional[int] = None):
+    """Format and display a list of messages with Rich formatting
+    
+    Args:
+        messages: Messages to display
+        max_chars: Optional cap on the characters shown per message
+    """
+    for m in messages:
+        print_message_panel(m, max_chars)
+
+
+def print_message_panel(message, max_chars: Optional[int] = None, subtitle: Optional[str] = None):
+    """Display one message in a Rich panel, collapsed to max_chars"""
+    msg_type = message.__class__.__name__.replace('Chunk', '').replace('Message', '')
+    title, border_style = MESSAGE_STYLES.get(msg_type, (f"📝 {msg_type}", "white"))
+    content = truncate_content(format_message_content(message), max_chars)
+    console.print(Panel(content, title=title, subtitle=subtitle, border_style=border_style))
+
+
+# Format message
+def format_message(messages):
+    """Alias for format_messages for backward compatibility"""
+    return format_messages(messages)
+
+
+# Format retriever results
+def format_retriever_results(result, title="Retriever Tool Results"):
+    """Format and display retriever tool results with proper text wrapping
+    
+    Args:
+        result: List of documents from retriever tool or a string
+        title: Title to display above the results
+    """
+    # Initialize console for rich formatting with width limit
+    formatted_console = Console(width=100)
+    
+    formatted_console.print(f"[bold green]{title}:[/bold green]")
+    
+    # Handle case where result is a string
+    if isinstance(result, str):
+        formatted_console.print("\n[yellow]Content:[/yellow]")
+        formatted_console.print(result, style="white")
+        return
+    
+    # Handle case where result is a list of documents
+    for i, doc in enumerate(result):
+        formatted_console.print(f"\n[bold blue]Document {i+1}:[/bold blue]")
+        
+        # Check if doc has metadata attribute (Document object)
+        if hasattr(doc, 'metadata'):
+            formatted_console.print(f"[cyan]Source:[/cyan] {doc.metadata.get('source', 'Unknown')}")
+            formatted_console.print("[yellow]Content:[/yellow]")
+            formatted_console.print(doc.page_content, style="white")
+        else:
+            # Handle case where doc is just a string
+            formatted_console.print("[yellow]Content:[/yellow]")
+            formatted_console.print(str(doc), style="white")
+
+
+# ============================================================================
+# STREAMING RENDERER
+# ============================================================================
+
+def _chunk_text(chunk) -> str:
+    """Text carried by a streamed message chunk (tool call fragments are skipped)"""
+    if isinstance(chunk.content, str):
+        return chunk.content
+    return "".join(
+        item.get('text', '') for item in chunk.content
+        if isinstance(item, dict) and item.get('type') == 'text'
+    )
+
+
+class _StreamPrinter:
+    """Prints the token stream of one AI message at a time, up to a character cap"""
+
+    def __init__(self, max_chars: Optional[int]):
+        self.max_chars = max_chars
+        self.message = None  # Accumulated chunks of the message being streamed
+        self.printed = 0
+        self.hidden = 0
+
+    def add(self, chunk, node: str):
+        """Print a token chunk, starting a new message if it belongs to another one"""
+        if self.message is None or chunk.id != self.message.id:
+            self.finish()
+            self.message = chunk
+            console.print(f"[bold green]🤖 Assistant[/bold green] [dim]({node})[/dim]")
+        else:
+            self.message = self.message + chunk
+        text = _chunk_text(chunk)
+        # Print tokens as they arrive until the cap is reached, then only count them
+        room = len(text) if not self.max_chars else max(self.max_chars - self.printed, 0)
+        if room:
+            console.print(text[:room], end="", markup=False, highlight=False, soft_wrap=True)
+            self.printed += min(room, len(text))
+        self.hidden += len(text) - min(room, len(text))
+
+    def finish(self):
+        """Close the current message: report hidden characters and list its tool calls"""
+        if self.message is None:
+            return
+        if self.printed:
+            console.print()
+        if self.hidden:
+            console.print(f"[dim]… ({self.hidden} characters hidden)[/dim]")
+        for tool_call in getattr(self.message, 'tool_calls', []):
+            args = truncate_content(json.dumps(tool_call['args']), self.max_chars)
+            console.print(f"[green]🔧 Tool Call:[/green] {escape(tool_call['name'])} {escape(args)}", highlight=False)
+        console.print()
+        self.message, self.printed, self.hidden = None, 0, 0
+
+
+def stream_messages(
+    graph,
+    inputs: Dict[str, Any],
+    config: Optional[Dict[str, Any]] = None,
+    max_chars: Optional[int] = DEFAULT_MAX_CHARS,
+    subgraphs: bool = False,
+) -> Dict[str, Any]:
+    """Run a graph and render its messages while it executes
+    
+    Consumes `graph.stream(..., stream_mode=["messages", "values"])`: LLM tokens
+    are printed as soon as they arrive and complete messages (tool outputs,
+    messages returned by nodes) are shown in panels collapsed to max_chars, so
+    large tool payloads do not flood the terminal. LLM calls tagged
+    SPECULATIVE_TAG are not rendered: their output may belong to a route that
+    is thrown away.
+    
+    Args:
+        graph: Compiled graph to run
+        inputs: Graph input, e.g. {"messages": [{"role": "user", "content": query}]}
+        config: Optional runnable config (thread id, recursion limit, ...)
+        max_chars: Cap on the characters shown per message (None shows everything)
+        subgraphs: Whether to also render the messages of subgraphs (e.g. supervisor agents)
+    
+    Returns:
+        The final graph state, like `graph.invoke` would
+    """
+    from langchain_core.messages import AIMessageChunk, convert_to_messages
+    
+    # Show the input messages first (a bare string or message counts as one message)
+    input_messages = inputs.get("messages", [])
+    if not isinstance(input_messages, list):
+        input_messages = [input_messages]
+    for message in convert_to_messages(input_messages):
+        print_message_panel(message, max_chars)
+    
+    printer = _StreamPrinter(max_chars)
+    final_state = None
+    try:
+        for part in graph.stream(inputs, config, stream_mode=["messages", "values"], subgraphs=subgraphs):
+            # With subgraphs=True every part is prefixed by the namespace of the emitting graph
+            namespace, mode, data = part if subgraphs else ((), *part)
+            if mode == "values":
+                if not namespace:
+                    final_state = data
+                continue
+            message, metadata = data
+            if SPECULATIVE_TAG in (metadata.get('tags') or ()):
+                continue
+            node = metadata.get('langgraph_node', '')
+            if namespace:
+                node = f"{namespace[-1].split(':')[0]} › {node}"
+            if isinstance(message, AIMessageChunk):
+                printer.add(message, node)
+            else:
+                printer.finish()
+                print_message_panel(message, max_chars, subtitle=node)
+    finally:
+        printer.finish()
+    return final_state
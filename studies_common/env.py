@@ -0,0 +1,121 @@
+"""
+Environment configuration and API key management.
+
+The .env file is loaded once per process, on the first call to `load_env()`
+(or to any of the API key getters). `dotenv` itself is only imported when a
+.env file exists.
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+_env_loaded = False
+
+
+def find_env_file(start_dir: Optional[str] = None) -> Optional[Path]:
+    """Find the nearest .env file in start_dir (default: the working directory) or its parents."""
+    directory = Path(start_dir or os.getcwd()).resolve()
+    for candidate in (directory, *directory.parents):
+        env_file = candidate / ".env"
+        if env_file.is_file():
+            return env_file
+    return None
+
+
+def load_env(start_dir: Optional[str] = None, override: bool = False) -> None:
+    """
+    Load environment variables from the nearest .env file, once per process.
+    
+    Args:
+        start_dir: Directory to start looking for .env from (default: the working directory)
+        override: Whether .env values replace variables that are already set
+    """
+    global _env_loaded
+    if _env_loaded:
+        return
+    _env_loaded = True
+    env_file = find_env_file(start_dir)
+    if env_file is None:
+        return
+    from dotenv import load_dotenv
+    
+    load_dotenv(env_file, override=override)
+
+
+def get_api_key(provider: str, required: bool = True) -> Optional[str]:
+    """
+    Get API key for a specific provider from environment variables.
+    
+    Args:
+        provider: Provider name (e.g., 'openai', 'anthropic', 'tavily')
+        required: Whether the API key is required (raises error if not found)
+    
+    Returns:
+        API key string or None if not found and not required
+    
+    Raises:
+        ValueError: If API key is required but not found
+    """
+    load_env()
+    
+    # Map provider names to environment variable names
+    provider_map = {
+        'openai': 'OPENAI_API_KEY',
+        'anthropic': 'ANTHROPIC_API_KEY',
+        'tavily': 'TAVILY_API_KEY',
+        'google': 'GOOGLE_API_KEY',
+        'cohere': 'COHERE_API_KEY',
+        'huggingface': 'HUGGINGFACE_API_KEY',
+        'mistral': 'MISTRAL_API_KEY',
+    }
+    
+    env_var = provider_map.get(provider.lower())
+    if not env_var:
+        raise ValueError(f"Unknown provider: {provider}")
+    
+    api_key = os.environ.get(env_var)
+    
+    if not api_key and required:
+        print(f"{provider.title()} API key not found in environment variables.")
+        print(f"Please set {env_var} in your .env file or environment variables.")
+        print("You can copy env_example.txt to .env and add your actual API keys.")
+        raise ValueError(f"{provider.title()} API key is required. Please check your .env file.")
+    
+    return api_key
+
+
+def get_openai_api_key() -> str:
+    """Get OpenAI API key from environment variables."""
+    return get_api_key('openai')
+
+
+def get_anthropic_api_key() -> str:
+    """Get Anthropic API key from environment variables."""
+    return get_api_key('anthropic')
+
+
+def get_tavily_api_key() -> str:
+    """Get Tavily API key from environment variables."""
+    return get_api_key('tavily')
+
+
+def validate_api_keys(providers: List[str]) -> Dict[str, bool]:
+    """
+    Validate that API keys for specified providers are available.
+    
+    Args:
+        providers: List of provider names to check
+    
+    Returns:
+        Dictionary mapping provider names to availability status
+    """
+    results = {}
+    for provider in providers:
+        try:
+            get_api_key(provider, required=False)
+            results[provider] = True
+        except ValueError:
+            results[provider] = False
+    return results
@@ -0,0 +1,223 @@
+"""
+Workflow graph export: PNG (with render cache) and Mermaid markdown.
+"""
+
+import hashlib
+import inspect
+import os
+import shutil
+import subprocess
+import threading
+from pathlib import Path
+from typing import Optional
+
+
+# Directory (next to the saved PNG) caching rendered graphs by structure hash
+MERMAID_CACHE_DIRNAME = ".mermaid_cache"
+
+
+def _render_mermaid_png(graph, mmd_path: Path, renderer: str) -> bytes:
+    """
+    Render a graph to PNG bytes with the selected backend.
+    
+    Args:
+        graph: Drawable graph (from workflow.get_graph())
+        mmd_path: File holding the graph's Mermaid source
+        renderer: 'mmdc' (local mermaid-cli), 'pyppeteer' (local headless browser)
+            or 'api' (mermaid.ink web service)
+    
+    Returns:
+        PNG image data
+    """
+    if renderer == "mmdc":
+        tmp_png = mmd_path.with_suffix(".tmp.png")
+        subprocess.run(
+            ["mmdc", "-i", str(mmd_path), "-o", str(tmp_png), "-b", "white"],
+            check=True,
+            capture_output=True,
+        )
+        png_data = tmp_png.read_bytes()
+        tmp_png.unlink()
+        return png_data
+    
+    from langchain_core.runnables.graph import MermaidDrawMethod
+    
+    if renderer == "pyppeteer":
+        return graph.draw_mermaid_png(draw_method=MermaidDrawMethod.PYPPETEER)
+    if renderer == "api":
+        return graph.draw_mermaid_png(draw_method=MermaidDrawMethod.API)
+    raise ValueError(f"Unknown Mermaid renderer: {renderer}")
+
+
+def save_workflow_png(workflow, filename: str, directory: Optional[str] = None, background: bool = True) -> str:
+    """
+    Save a workflow graph as a PNG file.
+    
+    Rendered PNGs are cached in a .mermaid_cache directory, keyed by a hash of
+    the graph's Mermaid source, so a graph is only rendered again when its
+    structure changes. The renderer is picked with MERMAID_RENDERER: 'mmdc'
+    (local mermaid-cli), 'pyppeteer', 'api' (mermaid.ink), 'none' (only save
+    the Mermaid source) or 'auto' (default: mmdc if installed, else api; if
+    that fails too, e.g. offline, only the Mermaid source is saved).
+    
+    Args:
+        workflow: LangGraph workflow object with get_graph() method
+        filename: Name of the PNG file (with or without .png extension)
+        directory: Directory to save the file in (defaults to caller's directory)
+        background: Render cache misses in a background thread instead of blocking
+    
+    Returns:
+        Full path to the saved PNG file (written later when rendering in the background),
+        or to the Mermaid source when it is not rendered
+    
+    Raises:
+        AttributeError: If workflow doesn't have get_graph() method
+        ValueError: If filename is invalid
+    """
+    
+    # Ensure filename has .png extension
+    if not filename.lower().endswith('.png'):
+        filename += '.png'
+    
+    # Get the directory of the calling script if not specified
+    if directory is None:
+        # Get the frame of the calling function
+        caller_frame = inspect.currentframe().f_back
+        if caller_frame:
+            caller_file = caller_frame.f_globals.get('__file__')
+            if caller_file:
+                directory = str(Path(caller_file).parent)
+            else:
+                directory = os.getcwd()
+        else:
+            directory = os.getcwd()
+    
+    # Create the full file path
+    file_path = Path(directory) / filename
+    
+    try:
+        # Get the graph and its Mermaid source (cheap, no rendering)
+        graph = workflow.get_graph(xray=True)
+        mermaid_code = graph.draw_mermaid()
+    except AttributeError as e:
+        raise AttributeError("Workflow object must have a get_graph() method") from e
+    
+    # Rendered PNGs are cached by a hash of the graph structure
+    digest = hashlib.sha256(mermaid_code.encode("utf-8")).hexdigest()[:16]
+    cache_dir = Path(directory) / MERMAID_CACHE_DIRNAME
+    cache_dir.mkdir(exist_ok=True)
+    cached_png = cache_dir / f"{digest}.png"
+    mmd_path = cache_dir / f"{digest}.mmd"
+    
+    # Graph unchanged since the last render: reuse the cached PNG
+    if cached_png.exists():
+        png_data = cached_png.read_bytes()
+        if not file_path.exists() or file_path.read_bytes() != png_data:
+            file_path.write_bytes(png_data)
+        print(f"Workflow graph saved to: {file_path} (cached)")
+        return str(file_path)
+    
+    # Keep the Mermaid source, so the graph can be rendered offline later
+    mmd_path.write_text(mermaid_code, encoding="utf-8")
+    
+    renderer = os.environ.get("MERMAID_RENDERER", "auto").lower()
+    auto = renderer == "auto"
+    if auto:
+        renderer = "mmdc" if shutil.which("mmdc") else "api"
+    if renderer == "none":
+        print(f"Workflow graph Mermaid source saved to: {mmd_path}")
+        return str(mmd_path)
+    
+    def render() -> Path:
+        try:
+            png_data = _render_mermaid_png(graph, mmd_path, renderer)
+        except Exception as e:
+            if not auto:
+                raise
+            # No local renderer and mermaid.ink unreachable (offline): keep the source only
+            reason = str(e).splitlines()[0] if str(e) else type(e).__name__
+            print(f"Workflow graph not rendered ({renderer}: {reason}); Mermaid source saved to: {mmd_path}")
+            return mmd_path
+        cached_png.write_bytes(png_data)
+        file_path.write_bytes(png_data)
+        print(f"Workflow graph saved to: {file_path}")
+        return file_path
+    
+    if not background:
+        try:
+            return str(render())
+        except Exception as e:
+            raise ValueError(f"Failed to save workflow graph: {str(e)}") from e
+    
+    # Render in a background thread, so the script doesn't wait for the renderer
+    def render_in_background():
+        try:
+            render()
+        except Exception as e:
+            print(f"Failed to save workflow graph: {str(e)} (Mermaid source: {mmd_path})")
+    
+    threading.Thread(target=render_in_background, name=f"render-{filename}").start()
+    return str(file_path)
+
+
+def save_workflow_mermaid(workflow, filename: str, directory: Optional[str] = None) -> str:
+    """
+    Save a workflow graph as a Mermaid markdown file.
+    
+    Args:
+        workflow: LangGraph workflow object with get_graph() method
+        filename: Name of the markdown file (with or without .md extension)
+        directory: Directory to save the file in (defaults to caller's directory)
+    
+    Returns:
+        Full path to the saved markdown file
+    
+    Raises:
+        AttributeError: If workflow doesn't have get_graph() method
+        ValueError: If filename is invalid
+    """
+    
+    # Ensure filename has .md extension
+    if not filename.lower().endswith('.md'):
+        filename += '.md'
+    
+    # Get the directory of the calling script if not specified
+    if directory is None:
+        # Get the frame of the calling function
+        caller_frame = inspect.currentframe().f_back
+        if caller_frame:
+            caller_file = caller_frame.f_globals.get('__file__')
+            if caller_file:
+                directory = str(Path(caller_file).parent)
+            else:
+                directory = os.getcwd()
+        else:
+            directory = os.getcwd()
+    
+    # Create the full file path
+    file_path = Path(directory) / filename
+    
+    try:
+        # Get the graph and save as Mermaid markdown
+        graph = workflow.get_graph(xray=True)
+        mermaid_code = graph.draw_mermaid()
+        
+        # Create markdown content with Mermaid code block
+        markdown_content = f"""# Workflow Graph
+
+```mermaid
+{mermaid_code}
+```
+"""
+        
+        # Save the markdown content to file
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(markdown_content)
+        
+        print(f"Workflow Mermaid saved to: {file_path}")
+        return str(file_path)
+        
+    except AttributeError as e:
+        raise AttributeError("Workflow object must have a get_graph() method") from e
+    except Exception as e:
+        raise ValueError(f"Failed to save workflow Mermaid: {str(e)}") from e
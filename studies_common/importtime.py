@@ -0,0 +1,146 @@
+"""
+Import-time benchmark of the Studio graph modules.
+
+For every graph listed in a studio/langgraph.json, imports its module in a
+fresh interpreter under `python -X importtime` (the way `langgraph dev` loads
+it on a cold start) and reports the total import time, the time spent in the
+shared helpers (util/utils and studies_common) and the heaviest top-level
+packages.
+
+    python -m studies_common.importtime                  # every studio directory
+    python -m studies_common.importtime 03_how_to_fix_your_context/studio
+
+Graph modules are imported with placeholder API keys, so no network access is
+needed, but their dependencies (langgraph, langchain_* ...) must be installed.
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+# Helper modules whose cost is reported separately
+HELPER_MODULES = ("util", "utils", "studies_common")
+
+# Placeholder keys so graph modules that check for API keys at import time load
+PLACEHOLDER_ENV = {
+    "OPENAI_API_KEY": "sk-placeholder",
+    "ANTHROPIC_API_KEY": "sk-ant-placeholder",
+    "TAVILY_API_KEY": "tvly-placeholder",
+    "MERMAID_RENDERER": "none",
+}
+
+# "import time: self [us] | cumulative | imported package"
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def find_graph_modules(studio_dir: Path) -> List[str]:
+    """Module names of the graphs registered in a studio's langgraph.json."""
+    with open(studio_dir / "langgraph.json", encoding="utf-8") as f:
+        config = json.load(f)
+    modules = []
+    for target in config.get("graphs", {}).values():
+        module = Path(target.split(":")[0]).stem
+        if module not in modules:
+            modules.append(module)
+    return modules
+
+
+def parse_importtime(stderr: str) -> List[Dict]:
+    """Parse `-X importtime` output into entries with self/cumulative microseconds and depth."""
+    entries = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append({
+                "name": name,
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+                "depth": (len(indent) - 1) // 2,
+            })
+    return entries
+
+
+def measure_module(studio_dir: Path, module: str) -> Optional[List[Dict]]:
+    """Import one module in a fresh interpreter and return its importtime entries (None on failure)."""
+    env = dict(os.environ, **PLACEHOLDER_ENV)
+    # The graphs import studies_common as an installed dependency; make the checkout's copy
+    # importable too, so the measurement does not depend on `pip install -e ./studies_common`
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(REPO_ROOT), os.environ.get("PYTHONPATH")]))
+    # __import__ goes through the C import machinery that -X importtime instruments
+    # (importlib.import_module does not, so the module itself would not be reported)
+    code = f"__import__({module!r})"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=studio_dir,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        lines = [line for line in result.stderr.splitlines() if line.strip() and not IMPORTTIME_LINE.match(line)]
+        error = lines[-1] if lines else "unknown error"
+        print(f"  {module}: import failed ({error})")
+        return None
+    return parse_importtime(result.stderr)
+
+
+def summarize(entries: List[Dict], module: str) -> Dict:
+    """Total, helper and per-package import times (ms) of one module import."""
+    total = next((e["cumulative_us"] for e in reversed(entries) if e["name"] == module), 0)
+    # Only count a helper at its outermost import, so nested helpers are not counted twice
+    helpers = sum(
+        e["cumulative_us"] for e in entries
+        if e["name"].split(".")[0] in HELPER_MODULES and e["depth"] <= 1 and e["name"] != module
+    )
+    packages = defaultdict(int)
+    for e in entries:
+        packages[e["name"].split(".")[0]] += e["self_us"]
+    return {"total_ms": total / 1000, "helpers_ms": helpers / 1000, "packages": packages}
+
+
+def benchmark_studio(studio_dir: Path, repeats: int, top: int) -> None:
+    """Print the import times of every graph module of a studio directory (best of `repeats`)."""
+    print(f"\n{studio_dir.relative_to(REPO_ROOT)}")
+    print(f"  {'module':<28} {'total (ms)':>10} {'helpers (ms)':>12}   heaviest packages (self time)")
+    for module in find_graph_modules(studio_dir):
+        best = None
+        for _ in range(repeats):
+            entries = measure_module(studio_dir, module)
+            if entries is None:
+                break
+            summary = summarize(entries, module)
+            if best is None or summary["total_ms"] < best["total_ms"]:
+                best = summary
+        if best is None:
+            continue
+        heaviest = sorted(best["packages"].items(), key=lambda item: item[1], reverse=True)[:top]
+        packages = ", ".join(f"{name} {us / 1000:.0f}" for name, us in heaviest)
+        print(f"  {module:<28} {best['total_ms']:>10.1f} {best['helpers_ms']:>12.1f}   {packages}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("studio_dirs", nargs="*", help="Studio directories (default: every */studio with a langgraph.json)")
+    parser.add_argument("--repeats", type=int, default=3, help="Imports per module; the fastest is reported")
+    parser.add_argument("--top", type=int, default=5, help="Number of heaviest packages to list")
+    args = parser.parse_args()
+
+    studio_dirs = [Path(d).resolve() for d in args.studio_dirs] or sorted(
+        p.parent for p in REPO_ROOT.glob("*/studio/langgraph.json")
+    )
+    for studio_dir in studio_dirs:
+        benchmark_studio(studio_dir, args.repeats, args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Local router for the routing workflow, with an LLM fallback.
+
+Most requests name their route outright ("write me a poem ..."), so routing
+them with a structured-output LLM call is wasted latency. `LocalRouter`
+answers locally when it is confident:
+
+1. keyword rules: exactly one route's keywords appear in the input
+2. a centroid classifier over hashed bag-of-words embeddings, trained from
+   logged routing decisions (cosine similarity to each route's centroid,
+   accepted above a similarity and margin threshold)
+
+and returns None otherwise, so the caller falls back to the LLM router. Every
+decision made by the LLM is logged (JSONL) and learned, so the classifier
+keeps improving across runs.
+"""
+
+import json
+import math
+import re
+import threading
+import time
+import zlib
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+ROUTES = ("poem", "story", "joke")
+
+# Tag of the LLM calls that write a branch speculatively (from best_guess) before
+# the route is confirmed: their tokens may be thrown away, so streams skip them
+SPECULATIVE_TAG = "speculative"
+
+# Words that name a route outright
+KEYWORD_RULES = {
+    "poem": re.compile(r"\b(poems?|poetry|poetic|haikus?|sonnets?|verses?|limericks?|rhym\w*|odes?|ballads?)\b"),
+    "story": re.compile(r"\b(story|stories|tales?|narratives?|fables?|fairy ?tales?|short fiction)\b"),
+    "joke": re.compile(r"\b(jokes?|puns?|one-liners?|gags?|funny|laugh\w*|humou?r\w*)\b"),
+}
+
+# Centroid classifier settings
+EMBEDDING_DIMS = 1024
+MIN_SIMILARITY = 0.25  # cosine similarity to the best centroid
+MIN_MARGIN = 0.08  # lead of the best centroid over the second best
+
+
+def tokenize(text: str) -> List[str]:
+    return re.findall(r"[a-z0-9']+", text.lower())
+
+
+def embed(text: str) -> Dict[int, float]:
+    """Sparse, L2-normalized hashed embedding of the unigrams and bigrams of a text."""
+    tokens = tokenize(text)
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    vector: Dict[int, float] = {}
+    for feature in features:
+        index = zlib.crc32(feature.encode("utf-8")) % EMBEDDING_DIMS
+        vector[index] = vector.get(index, 0.0) + 1.0
+    norm = math.sqrt(sum(v * v for v in vector.values())) or 1.0
+    return {i: v / norm for i, v in vector.items()}
+
+
+def cosine(a: Dict[int, float], b: Dict[int, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    dot = sum(v * b.get(i, 0.0) for i, v in a.items())
+    norm_b = math.sqrt(sum(v * v for v in b.values())) or 1.0
+    return dot / norm_b  # `a` is always a normalized embedding
+
+
+class CentroidClassifier:
+    """Nearest-centroid classifier over hashed embeddings, trainable one example at a time."""
+
+    def __init__(self) -> None:
+        self.sums: Dict[str, Dict[int, float]] = {}
+        self.counts: Dict[str, int] = {}
+
+    def learn(self, text: str, route: str) -> None:
+        centroid = self.sums.setdefault(route, {})
+        for i, v in embed(text).items():
+            centroid[i] = centroid.get(i, 0.0) + v
+        self.counts[route] = self.counts.get(route, 0) + 1
+
+    def scores(self, text: str) -> List[Tuple[str, float]]:
+        """Routes ranked by cosine similarity to their centroid."""
+        vector = embed(text)
+        ranked = [(route, cosine(vector, centroid)) for route, centroid in self.sums.items()]
+        return sorted(ranked, key=lambda item: item[1], reverse=True)
+
+
+class RouterStats:
+    """Decisions and latencies of a LocalRouter, per source (keyword, centroid, llm).
+
+    Only the last `max_latencies` latencies of each source are kept, so a
+    long-running server does not grow without bound.
+    """
+
+    def __init__(self, max_latencies: int = 10_000) -> None:
+        self.decisions: Dict[str, int] = {}
+        self.latencies: Dict[str, deque] = {}
+        self.max_latencies = max_latencies
+        self._lock = threading.Lock()
+
+    def record(self, source: str, latency: float) -> None:
+        with self._lock:
+            self.decisions[source] = self.decisions.get(source, 0) + 1
+            self.latencies.setdefault(source, deque(maxlen=self.max_latencies)).append(latency)
+
+    @property
+    def fallback_rate(self) -> float:
+        total = sum(self.decisions.values())
+        return self.decisions.get("llm", 0) / total if total else 0.0
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        summary = {}
+        with self._lock:
+            latencies_by_source = {source: sorted(latencies) for source, latencies in self.latencies.items()}
+        for source, ordered in latencies_by_source.items():
+            summary[source] = {
+                "decisions": self.decisions[source],
+                "p50_ms": round(ordered[len(ordered) // 2] * 1000, 3),
+                "max_ms": round(ordered[-1] * 1000, 3),
+            }
+        return summary
+
+
+class LocalRouter:
+    """Keyword rules, then a centroid classifier; None when neither is confident."""
+
+    def __init__(self, log_path: Optional[str] = None) -> None:
+        """
+        Args:
+            log_path: JSONL file of logged routing decisions; the classifier is trained
+                from it on startup and every learned decision is appended to it
+        """
+        self.classifier = CentroidClassifier()
+        self.stats = RouterStats()
+        self.log_path = Path(log_path) if log_path else None
+        self._lock = threading.Lock()
+        if self.log_path and self.log_path.exists():
+            with open(self.log_path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        self.classifier.learn(record["input"], record["route"])
+
+    def predict(self, text: str) -> Tuple[Optional[str], str, float]:
+        """
+        Route an input locally.
+
+        Returns:
+            Tuple of (route or None if not confident, source of the decision,
+            confidence). The source is 'keyword', 'centroid' or 'none'.
+        """
+        matches = [route for route, pattern in KEYWORD_RULES.items() if pattern.search(text.lower())]
+        if len(matches) == 1:
+            return matches[0], "keyword", 1.0
+
+        ranked = self.classifier.scores(text)
+        if ranked:
+            best, similarity = ranked[0]
+            margin = similarity - (ranked[1][1] if len(ranked) > 1 else 0.0)
+            if similarity >= MIN_SIMILARITY and margin >= MIN_MARGIN:
+                return best, "centroid", similarity
+        return None, "none", 0.0
+
+    def best_guess(self, text: str) -> str:
+        """Most likely route even when not confident (keyword match, nearest centroid, most frequent route)."""
+        for route, pattern in KEYWORD_RULES.items():
+            if pattern.search(text.lower()):
+                return route
+        ranked = self.classifier.scores(text)
+        if ranked and ranked[0][1] > 0:
+            return ranked[0][0]
+        counts = self.classifier.counts
+        return max(counts, key=counts.get) if counts else ROUTES[0]
+
+    def learn(self, text: str, route: str, source: str = "llm") -> None:
+        """Train on a routing decision and append it to the log."""
+        with self._lock:
+            self.classifier.learn(text, route)
+            if self.log_path:
+                self.log_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"input": text, "route": route, "source": source}) + "\n")
+
+    def train(self, examples: Iterable[Tuple[str, str]]) -> None:
+        """Train on (input, route) pairs without logging them."""
+        for text, route in examples:
+            self.classifier.learn(text, route)
+
+    def route(self, text: str, fallback) -> Tuple[str, str]:
+        """
+        Route locally when confident, otherwise call `fallback(text)` and learn its answer.
+
+        Returns:
+            Tuple of (route, source), source being 'keyword', 'centroid' or 'llm'
+        """
+        start = time.perf_counter()
+        route, source, _ = self.predict(text)
+        if route is None:
+            route, source = fallback(text), "llm"
+            self.learn(text, route)
+        self.stats.record(source, time.perf_counter() - start)
+        return route, source
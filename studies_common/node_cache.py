@@ -0,0 +1,239 @@
+"""
+Node-level result cache for deterministic workflow steps.
+
+Workflow nodes such as a planner or a joke generator return the same output
+for the same input slice and model, so a repeated run can skip them:
+
+- `node_cache_policy(*fields, llm=...)` is a CachePolicy whose key is the
+  node's input state slice (the given fields) plus the model configuration
+  (model name, temperature, ...), so changing the model invalidates the entry
+- `NodeCache` is the graph cache: an in-memory LRU, optionally persisted to
+  SQLite so entries survive across processes (read through on a memory miss)
+
+Attach both with `builder.add_node(name, node, cache_policy=...)` and
+`builder.compile(cache=NodeCache(...))`; cached node runs are reported with
+`{"__metadata__": {"cached": True}}` in the "updates" stream.
+"""
+
+import asyncio
+import datetime
+import hashlib
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Sequence, Tuple, Union
+
+from langgraph.cache.base import BaseCache, FullKey, Namespace
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.types import CachePolicy
+
+
+DEFAULT_MAX_ENTRIES = 256
+
+# Serialized value: (encoding, bytes, expiry timestamp or None)
+Entry = Tuple[str, bytes, Optional[float]]
+
+
+def model_config(llm: Any) -> Dict[str, Any]:
+    """Parameters that determine a model's output (model name, temperature, ...)."""
+    params = getattr(llm, "_identifying_params", None)
+    if params is None:
+        return {"model": repr(llm)}
+    return {k: v for k, v in params.items() if k != "stream"}
+
+
+def node_cache_policy(*fields: str, llm: Any = None, ttl: Optional[int] = None) -> CachePolicy:
+    """
+    Cache policy keyed by a slice of the node's input state and the model configuration.
+
+    Args:
+        *fields: State keys the node reads (the whole input state when empty)
+        llm: Model the node calls; its configuration is part of the key
+        ttl: Seconds an entry stays valid (None: until evicted or cleared)
+
+    Returns:
+        CachePolicy for `add_node(..., cache_policy=...)`
+    """
+    config = model_config(llm) if llm is not None else None
+
+    def key_func(state: Mapping[str, Any]) -> str:
+        inputs = {field: state.get(field) for field in fields} if fields else dict(state)
+        payload = json.dumps({"inputs": inputs, "model": config}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    return CachePolicy(key_func=key_func, ttl=ttl)
+
+
+class CacheStats:
+    """Hits (from memory or disk), misses and evictions of a NodeCache."""
+
+    def __init__(self) -> None:
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def summary(self) -> Dict[str, Any]:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        hits = self.memory_hits + self.disk_hits
+        return {
+            "lookups": lookups,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+class NodeCache(BaseCache):
+    """In-memory LRU cache of node results, optionally persisted to SQLite."""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        path: Optional[Union[str, Path]] = None,
+        *,
+        serde: Optional[SerializerProtocol] = None,
+    ) -> None:
+        """
+        Args:
+            max_entries: Entries kept in memory; the least recently used are evicted
+                (they stay on disk when persisted)
+            path: SQLite file persisting every entry (None keeps the cache in memory)
+            serde: Serializer of the cached node writes
+        """
+        super().__init__(serde=serde)
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[FullKey, Entry]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._conn = None
+        if path is not None:
+            self._conn = sqlite3.connect(str(path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL;")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS node_cache (
+                    ns TEXT,
+                    key TEXT,
+                    expiry REAL,
+                    encoding TEXT NOT NULL,
+                    val BLOB NOT NULL,
+                    PRIMARY KEY (ns, key)
+                )"""
+            )
+            self._conn.commit()
+
+    @staticmethod
+    def _now() -> float:
+        return datetime.datetime.now(datetime.timezone.utc).timestamp()
+
+    def _remember(self, key: FullKey, entry: Entry) -> None:
+        """Insert an entry as most recently used, evicting beyond max_entries."""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def _load(self, keys: Sequence[FullKey], now: float) -> Dict[FullKey, Entry]:
+        """Unexpired persisted entries of the given keys."""
+        if self._conn is None or not keys:
+            return {}
+        placeholders = ",".join("(?, ?)" for _ in keys)
+        params = [value for ns, key in keys for value in (",".join(ns), key)]
+        with self._conn:
+            rows = self._conn.execute(
+                f"SELECT ns, key, expiry, encoding, val FROM node_cache WHERE (ns, key) IN ({placeholders})",
+                params,
+            ).fetchall()
+            loaded = {}
+            for ns, key, expiry, encoding, raw in rows:
+                if expiry is not None and now >= expiry:
+                    self._conn.execute("DELETE FROM node_cache WHERE ns = ? AND key = ?", (ns, key))
+                    continue
+                loaded[(tuple(ns.split(",")), key)] = (encoding, raw, expiry)
+        return loaded
+
+    def get(self, keys: Sequence[FullKey]) -> Dict[FullKey, Any]:
+        """Get the cached values for the given keys (memory first, then disk)."""
+        with self._lock:
+            now = self._now()
+            found: Dict[FullKey, Entry] = {}
+            missing = []
+            for full_key in keys:
+                full_key = (tuple(full_key[0]), full_key[1])
+                entry = self._entries.get(full_key)
+                if entry is not None and entry[2] is not None and now >= entry[2]:
+                    del self._entries[full_key]
+                    entry = None
+                if entry is None:
+                    missing.append(full_key)
+                    continue
+                self._entries.move_to_end(full_key)
+                found[full_key] = entry
+                self.stats.memory_hits += 1
+
+            loaded = self._load(missing, now)
+            for full_key, entry in loaded.items():
+                self._remember(full_key, entry)
+                found[full_key] = entry
+            self.stats.disk_hits += len(loaded)
+            self.stats.misses += len(missing) - len(loaded)
+
+            return {key: self.serde.loads_typed(entry[:2]) for key, entry in found.items()}
+
+    async def aget(self, keys: Sequence[FullKey]) -> Dict[FullKey, Any]:
+        """Asynchronously get the cached values for the given keys."""
+        if self._conn is None:
+            return self.get(keys)
+        return await asyncio.to_thread(self.get, keys)
+
+    def set(self, pairs: Mapping[FullKey, Tuple[Any, Optional[int]]]) -> None:
+        """Set the cached values for the given keys and TTLs."""
+        with self._lock:
+            now = self._now()
+            rows = []
+            for (ns, key), (value, ttl) in pairs.items():
+                encoding, raw = self.serde.dumps_typed(value)
+                expiry = now + ttl if ttl is not None else None
+                self._remember((tuple(ns), key), (encoding, raw, expiry))
+                rows.append((",".join(ns), key, expiry, encoding, raw))
+            if self._conn is not None and rows:
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO node_cache (ns, key, expiry, encoding, val) VALUES (?, ?, ?, ?, ?)",
+                        rows,
+                    )
+
+    async def aset(self, pairs: Mapping[FullKey, Tuple[Any, Optional[int]]]) -> None:
+        """Asynchronously set the cached values for the given keys and TTLs."""
+        if self._conn is None:
+            return self.set(pairs)
+        await asyncio.to_thread(self.set, pairs)
+
+    def clear(self, namespaces: Optional[Sequence[Namespace]] = None) -> None:
+        """Delete the cached values of the given namespaces (all values if None)."""
+        with self._lock:
+            if namespaces is None:
+                self._entries.clear()
+            else:
+                cleared = {tuple(ns) for ns in namespaces}
+                for full_key in [k for k in self._entries if k[0] in cleared]:
+                    del self._entries[full_key]
+            if self._conn is not None:
+                with self._conn:
+                    if namespaces is None:
+                        self._conn.execute("DELETE FROM node_cache")
+                    else:
+                        self._conn.executemany(
+                            "DELETE FROM node_cache WHERE ns = ?", [(",".join(ns),) for ns in namespaces]
+                        )
+
+    async def aclear(self, namespaces: Optional[Sequence[Namespace]] = None) -> None:
+        """Asynchronously delete the cached values of the given namespaces."""
+        if self._conn is None:
+            return self.clear(namespaces)
+        await asyncio.to_thread(self.clear, namespaces)
@@ -0,0 +1,161 @@
+"""
+Prompt-prefix caching for the ChatAnthropic agents.
+
+Every call of the context-engineering agents resends the same system prompt
+and tool definitions. Anthropic caches a request prefix (tools, then system,
+then messages) up to a `cache_control` breakpoint, so reads of an unchanged
+prefix are billed at a fraction of the price and processed faster:
+
+- `cached_system_message(prompt)` marks the end of the system prompt as a
+  cache breakpoint, which covers the tool definitions before it
+- `stable_tools(tools)` orders a tool set by name, so the same set always
+  serializes to the same bytes
+- `PromptCacheMonitor` is a callback handler that records the cacheable
+  prefix (bound tools and system blocks) of every request (and flags any
+  change between calls of the same node) along with the cache read/write
+  tokens reported in the usage metadata
+
+Prefixes shorter than the model's minimum cacheable length (1024 tokens for
+Sonnet) are not cached; the cached-token ratio of the monitor shows it.
+"""
+
+import hashlib
+import json
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import BaseMessage, SystemMessage
+from langchain_core.outputs import LLMResult
+from langchain_core.tools import BaseTool
+
+
+CACHE_CONTROL = {"type": "ephemeral"}
+
+
+def cached_system_message(prompt: str) -> SystemMessage:
+    """System message whose end is a prompt cache breakpoint (covers tools + system)."""
+    return SystemMessage(content=[{"type": "text", "text": prompt, "cache_control": dict(CACHE_CONTROL)}])
+
+
+def stable_tools(tools: Sequence[BaseTool]) -> List[BaseTool]:
+    """Tools in a deterministic order, so a given tool set always yields the same prefix."""
+    return sorted(tools, key=lambda tool: tool.name)
+
+
+def request_prefix(messages: Sequence[BaseMessage], invocation_params: Optional[Dict[str, Any]] = None) -> bytes:
+    """
+    Cacheable prefix (tools and system blocks) of a request.
+
+    Built from the callback arguments only: bind_tools has already converted the
+    tools to the provider format, and the system messages are sent as they are.
+
+    Args:
+        messages: Messages of the request
+        invocation_params: Invocation parameters of the call (holds the bound tools)
+
+    Returns:
+        Serialized tools + system part of the request
+    """
+    tools = (invocation_params or {}).get("tools")
+    system = [m.content for m in messages if isinstance(m, SystemMessage)]
+    return json.dumps({"tools": tools, "system": system}, default=str).encode("utf-8")
+
+
+def has_cache_breakpoint(messages: Sequence[BaseMessage]) -> bool:
+    """Whether the leading system message carries a cache_control breakpoint."""
+    if not messages or not isinstance(messages[0], SystemMessage) or isinstance(messages[0].content, str):
+        return False
+    return any(isinstance(block, dict) and "cache_control" in block for block in messages[0].content)
+
+
+class PromptCacheMonitor(BaseCallbackHandler):
+    """Records request prefixes and cache usage of every call of a chat model.
+
+    Attach it with `PromptCacheMonitor(llm)`: it adds itself to the model's callbacks.
+    Only the last `max_records` requests are kept, so a long-running process
+    does not grow without bound.
+    """
+
+    def __init__(self, llm: Any = None, max_records: int = 10_000) -> None:
+        self.llm = llm
+        self.records: deque = deque(maxlen=max_records)
+        self._last_prefix: Dict[str, str] = {}
+        self._pending: Dict[Any, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        if llm is not None:
+            llm.callbacks = list(llm.callbacks or []) + [self]
+
+    def on_chat_model_start(
+        self,
+        serialized: Dict[str, Any],
+        messages: List[List[BaseMessage]],
+        *,
+        run_id: Any,
+        invocation_params: Optional[Dict[str, Any]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        request = messages[0]
+        prefix = request_prefix(request, invocation_params)
+        node = (metadata or {}).get("langgraph_node", "")
+        prefix_hash = hashlib.sha256(prefix).hexdigest()[:16]
+        with self._lock:
+            changed = node in self._last_prefix and self._last_prefix[node] != prefix_hash
+            self._last_prefix[node] = prefix_hash
+            self._pending[run_id] = {
+                "node": node,
+                "prefix_hash": prefix_hash,
+                "prefix_bytes": len(prefix),
+                "marked": has_cache_breakpoint(request),
+                "prefix_changed": changed,
+            }
+
+    def on_llm_end(self, response: LLMResult, *, run_id: Any, **kwargs: Any) -> None:
+        with self._lock:
+            record = self._pending.pop(run_id, None)
+        if record is None:
+            return
+        usage = {}
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                if message is not None and getattr(message, "usage_metadata", None):
+                    usage = message.usage_metadata
+        details = usage.get("input_token_details") or {}
+        record.update(
+            input_tokens=usage.get("input_tokens", 0),
+            cache_read_tokens=details.get("cache_read") or 0,
+            cache_creation_tokens=details.get("cache_creation") or 0,
+        )
+        with self._lock:
+            self.records.append(record)
+
+    def on_llm_error(self, error: BaseException, *, run_id: Any, **kwargs: Any) -> None:
+        # A failed call reports no usage: drop its pending record
+        with self._lock:
+            self._pending.pop(run_id, None)
+
+    def summary(self) -> Dict[str, Any]:
+        """Calls, prefix stability and cached-token ratio over the recorded requests."""
+        with self._lock:
+            records = list(self.records)
+        input_tokens = sum(r["input_tokens"] for r in records)
+        cache_read = sum(r["cache_read_tokens"] for r in records)
+        return {
+            "calls": len(records),
+            "marked_calls": sum(r["marked"] for r in records),
+            "distinct_prefixes": len({(r["node"], r["prefix_hash"]) for r in records}),
+            "prefix_changes": sum(r["prefix_changed"] for r in records),
+            "input_tokens": input_tokens,
+            "cache_read_tokens": cache_read,
+            "cache_creation_tokens": sum(r["cache_creation_tokens"] for r in records),
+            "cached_ratio": round(cache_read / input_tokens, 3) if input_tokens else 0.0,
+        }
+
+    def dump(self, path: str) -> None:
+        """Write the recorded requests as JSON lines (for diffing runs)."""
+        with self._lock, open(path, "w", encoding="utf-8") as f:
+            for record in self.records:
+                f.write(json.dumps(record) + "\n")
@@ -0,0 +1,148 @@
+"""
+Requests-per-minute / tokens-per-minute scheduler for fanned-out LLM workers.
+
+Workers call `acquire()` before their LLM request and `settle()` once the
+actual token usage is known. A request is admitted only when both the request
+count and the token count of the last minute (a sliding window) leave room
+for it, so a large fan-out runs at the provider's rate limit instead of
+tripping it and backing off. Waiting workers are admitted strictly by
+priority (e.g. the section's position in the plan), then by arrival.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+DEFAULT_WINDOW_SECONDS = 60.0
+
+
+class Reservation:
+    """Budget taken by one admitted request."""
+
+    def __init__(self, admitted_at: float, tokens: int) -> None:
+        self.admitted_at = admitted_at
+        self.tokens = tokens
+
+
+class SchedulerStats:
+    """Counters and waiting times of a RateLimitScheduler."""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.tokens = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "tokens": self.tokens,
+            "avg_wait_s": round(self.total_wait / self.requests, 3) if self.requests else 0.0,
+            "max_wait_s": round(self.max_wait, 3),
+        }
+
+
+class RateLimitScheduler:
+    """Admits LLM requests against a shared request and token budget per window."""
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        window_seconds: float = DEFAULT_WINDOW_SECONDS,
+    ) -> None:
+        """
+        Args:
+            requests_per_minute: Maximum number of requests admitted per window
+            tokens_per_minute: Maximum number of tokens (prompt + completion) per window
+            window_seconds: Length of the sliding window (60 s matches provider limits;
+                shorter windows scale the limits down for tests and benchmarks)
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.window_seconds = window_seconds
+        self.stats = SchedulerStats()
+        self._condition = threading.Condition()
+        self._admitted = []  # Reservations of the current window, oldest first
+        self._waiting = []  # Heap of (priority, arrival) of the workers waiting for budget
+        self._arrivals = itertools.count()
+
+    def _expire(self, now: float) -> None:
+        self._admitted = [r for r in self._admitted if now - r.admitted_at < self.window_seconds]
+        self._admitted.sort(key=lambda r: r.admitted_at)
+
+    def _delay(self, tokens: int, now: float) -> float:
+        """Seconds until a request of `tokens` fits in the window (0 if it fits now)."""
+        requests = len(self._admitted)
+        used = sum(r.tokens for r in self._admitted)
+        # Walk the window from the oldest reservation until enough budget has expired
+        for i, reservation in enumerate(itertools.chain([None], self._admitted)):
+            if reservation is not None:
+                requests -= 1
+                used -= reservation.tokens
+            if requests < self.requests_per_minute and used + tokens <= self.tokens_per_minute:
+                return 0.0 if i == 0 else reservation.admitted_at + self.window_seconds - now
+        return self.window_seconds
+
+    def acquire(self, tokens: int, priority: int = 0) -> Reservation:
+        """
+        Block until the request fits in the budget and no higher-priority request is waiting.
+
+        Args:
+            tokens: Estimated tokens of the request (prompt + expected completion)
+            priority: Lower values are admitted first
+
+        Returns:
+            Reservation to pass to `settle()` once the actual usage is known
+        """
+        # A request larger than the whole budget is admitted on an empty window
+        tokens = min(tokens, self.tokens_per_minute)
+        start = time.monotonic()
+        with self._condition:
+            key = (priority, next(self._arrivals))
+            heapq.heappush(self._waiting, key)
+            self._condition.notify_all()
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._expire(now)
+                    timeout = None
+                    if self._waiting[0] == key:
+                        timeout = self._delay(tokens, now)
+                        if timeout <= 0:
+                            break
+                    self._condition.wait(timeout)
+            finally:
+                self._waiting.remove(key)
+                heapq.heapify(self._waiting)
+                self._condition.notify_all()
+
+            reservation = Reservation(now, tokens)
+            self._admitted.append(reservation)
+            waited = now - start
+            self.stats.requests += 1
+            self.stats.tokens += tokens
+            self.stats.total_wait += waited
+            self.stats.max_wait = max(self.stats.max_wait, waited)
+        return reservation
+
+    def settle(self, reservation: Reservation, tokens: Optional[int]) -> None:
+        """
+        Record that an admitted request completed, with its actual token usage.
+
+        The provider may have counted the request at any point until its response
+        arrived, so from now on the reservation is dated to its completion.
+
+        Args:
+            reservation: Reservation returned by `acquire()`
+            tokens: Actual tokens of the request (None keeps the estimate)
+        """
+        with self._condition:
+            reservation.admitted_at = time.monotonic()
+            if tokens is not None:
+                self.stats.tokens += tokens - reservation.tokens
+                reservation.tokens = tokens
+            self._condition.notify_all()
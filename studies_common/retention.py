@@ -0,0 +1,333 @@
+"""
+Checkpoint retention and compaction for long-lived threads.
+
+`MemorySaver` / `InMemorySaver` keep every intermediate checkpoint of every
+thread forever, so a long-running server grows without bound. A
+`RetentionPolicy` says which checkpoints are worth keeping:
+
+- `keep_last`: the N most recent checkpoints of each thread (the time-travel
+  window)
+- `keyframe_every`: also every checkpoint whose step is a multiple of K, for
+  coarse time travel further back
+- `ttl`: threads idle for longer than this many seconds are deleted
+- `max_threads`: beyond this many threads, the least recently active ones
+  are deleted (LRU)
+
+and compaction rewrites the history accordingly: dropped checkpoints lose
+their pending writes (and, in memory, the channel values only they
+referenced), and every kept checkpoint is re-linked to its nearest kept
+ancestor, so `get_state_history` walks the retained window without gaps and
+`get_state` / `update_state` / replay work from any checkpoint in it.
+
+`RetainingMemorySaver(policy)` is an `InMemorySaver` that compacts itself
+every `compact_every` checkpoints; `SqliteWalSaver(path, retention=policy)`
+does the same on disk. Both expose `compact()` for a scheduled job.
+
+The latest checkpoint of a thread is always kept. A thread's activity is the
+time of its latest checkpoint. Channels that store per-step deltas in pending
+writes (langgraph's DeltaChannel) need their full ancestry and are not
+supported by compaction.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Sequence, Set, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import ChannelVersions, Checkpoint, CheckpointMetadata, CheckpointTuple
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.serde.base import SerializerProtocol
+
+
+DEFAULT_COMPACT_EVERY = 100
+
+# Checkpoint of a thread's history: (checkpoint id, step or None)
+HistoryItem = Tuple[str, Optional[int]]
+
+
+def timestamp(ts: Optional[str]) -> Optional[float]:
+    """Seconds since the epoch of a checkpoint's ISO `ts` (None if missing or unreadable)."""
+    if not ts:
+        return None
+    try:
+        return datetime.fromisoformat(ts).timestamp()
+    except ValueError:
+        return None
+
+
+class RetentionPolicy:
+    """Which checkpoints and threads a compaction keeps."""
+
+    def __init__(
+        self,
+        keep_last: Optional[int] = None,
+        keyframe_every: Optional[int] = None,
+        ttl: Optional[float] = None,
+        max_threads: Optional[int] = None,
+    ) -> None:
+        """
+        Args:
+            keep_last: Most recent checkpoints kept per thread (None keeps them all)
+            keyframe_every: Also keep the checkpoints whose step is a multiple of it
+            ttl: Seconds after its latest checkpoint a thread is deleted (None: never)
+            max_threads: Threads kept, the least recently active are deleted (None: all)
+        """
+        if keep_last is not None and keep_last < 1:
+            raise ValueError("keep_last must be at least 1 (the latest checkpoint is always kept)")
+        if keyframe_every is not None and keyframe_every < 1:
+            raise ValueError("keyframe_every must be at least 1")
+        self.keep_last = keep_last
+        self.keyframe_every = keyframe_every
+        self.ttl = ttl
+        self.max_threads = max_threads
+
+    def __repr__(self) -> str:
+        return (
+            f"RetentionPolicy(keep_last={self.keep_last}, keyframe_every={self.keyframe_every}, "
+            f"ttl={self.ttl}, max_threads={self.max_threads})"
+        )
+
+    def retained(self, history: Sequence[HistoryItem]) -> Set[str]:
+        """
+        Checkpoints of one thread (and namespace) to keep.
+
+        Args:
+            history: (checkpoint id, step) of every checkpoint, in any order
+
+        Returns:
+            Ids of the checkpoints to keep
+        """
+        ordered = sorted(history, reverse=True)
+        if self.keep_last is None:
+            return {checkpoint_id for checkpoint_id, _ in ordered}
+        kept = {checkpoint_id for checkpoint_id, _ in ordered[: self.keep_last]}
+        if self.keyframe_every:
+            kept.update(
+                checkpoint_id
+                for checkpoint_id, step in ordered
+                if step is not None and step >= 0 and step % self.keyframe_every == 0
+            )
+        return kept
+
+    def expired(self, last_active: Dict[str, Optional[float]], now: Optional[float] = None) -> Set[str]:
+        """
+        Threads to delete: idle beyond the TTL, then the least recently active beyond max_threads.
+
+        Args:
+            last_active: Thread id -> time of its latest checkpoint (None if unknown,
+                which counts as active now)
+            now: Current time (seconds since the epoch)
+
+        Returns:
+            Ids of the threads to delete
+        """
+        now = time.time() if now is None else now
+        activity = {thread_id: now if active is None else active for thread_id, active in last_active.items()}
+        expired = set()
+        if self.ttl is not None:
+            expired.update(thread_id for thread_id, active in activity.items() if now - active > self.ttl)
+        if self.max_threads is not None:
+            alive = sorted((t for t in activity if t not in expired), key=lambda t: activity[t], reverse=True)
+            expired.update(alive[self.max_threads :])
+        return expired
+
+
+def relink(parents: Dict[str, Optional[str]], kept: Set[str]) -> Dict[str, Optional[str]]:
+    """
+    New parents of the kept checkpoints whose parent is dropped.
+
+    Args:
+        parents: Checkpoint id -> parent checkpoint id, for the whole history
+        kept: Ids of the kept checkpoints
+
+    Returns:
+        Kept checkpoint id -> nearest kept ancestor (None if there is none)
+    """
+    relinked = {}
+    for checkpoint_id in kept:
+        parent = parents.get(checkpoint_id)
+        if parent is None or parent in kept:
+            continue
+        while parent is not None and parent not in kept:
+            parent = parents.get(parent)
+        relinked[checkpoint_id] = parent
+    return relinked
+
+
+def memory_size(saver: InMemorySaver) -> Dict[str, int]:
+    """Threads, checkpoints and serialized bytes held by an in-memory saver."""
+    saved = [entry for namespaces in saver.storage.values() for ns in namespaces.values() for entry in ns.values()]
+    return {
+        "threads": sum(1 for namespaces in saver.storage.values() if any(namespaces.values())),
+        "checkpoints": len(saved),
+        "bytes": sum(len(checkpoint[1]) + len(metadata[1]) for checkpoint, metadata, _ in saved)
+        + sum(len(blob[1]) for blob in saver.blobs.values())
+        + sum(len(write[2][1]) for writes in saver.writes.values() for write in writes.values()),
+    }
+
+
+class CompactionReport:
+    """Checkpoints, writes and threads removed by compactions."""
+
+    def __init__(self) -> None:
+        self.runs = 0
+        self.checkpoints_dropped = 0
+        self.writes_dropped = 0
+        self.threads_deleted = 0
+        self.seconds = 0.0
+
+    def add(self, other: "CompactionReport") -> None:
+        self.runs += other.runs
+        self.checkpoints_dropped += other.checkpoints_dropped
+        self.writes_dropped += other.writes_dropped
+        self.threads_deleted += other.threads_deleted
+        self.seconds += other.seconds
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "checkpoints_dropped": self.checkpoints_dropped,
+            "writes_dropped": self.writes_dropped,
+            "threads_deleted": self.threads_deleted,
+            "avg_ms": round(self.seconds / self.runs * 1000, 3) if self.runs else 0.0,
+        }
+
+
+class RetainingMemorySaver(InMemorySaver):
+    """InMemorySaver that compacts its history with a RetentionPolicy."""
+
+    def __init__(
+        self,
+        policy: RetentionPolicy,
+        *,
+        compact_every: Optional[int] = DEFAULT_COMPACT_EVERY,
+        serde: Optional[SerializerProtocol] = None,
+    ) -> None:
+        """
+        Args:
+            policy: Checkpoints and threads to keep
+            compact_every: Checkpoints saved between two automatic compactions
+                (None or 0: only explicit compact() calls)
+            serde: Serializer of checkpoints and writes (langgraph's default if None)
+        """
+        super().__init__(serde=serde)
+        self.policy = policy
+        self.compact_every = compact_every
+        self.report = CompactionReport()
+        self._lock = threading.RLock()
+        self._puts = 0
+        # Thread id -> time of its latest checkpoint, least recently active first
+        self._activity: "OrderedDict[str, float]" = OrderedDict()
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """Save a checkpoint, compacting every compact_every checkpoints."""
+        with self._lock:
+            saved = super().put(config, checkpoint, metadata, new_versions)
+            thread_id = config["configurable"]["thread_id"]
+            self._activity[thread_id] = timestamp(checkpoint.get("ts")) or time.time()
+            self._activity.move_to_end(thread_id)
+            self._puts += 1
+            if self.compact_every and self._puts % self.compact_every == 0:
+                self.compact()
+        return saved
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        with self._lock:
+            super().put_writes(config, writes, task_id, task_path)
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        with self._lock:
+            return super().get_tuple(config)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            super().delete_thread(thread_id)
+            self._activity.pop(thread_id, None)
+
+    def _compact_namespace(self, thread_id: str, checkpoint_ns: str) -> Tuple[int, int]:
+        """Drop the checkpoints of one namespace the policy does not keep; return (checkpoints, writes) dropped."""
+        saved = self.storage[thread_id][checkpoint_ns]
+        history = [
+            (checkpoint_id, self.serde.loads_typed(metadata).get("step"))
+            for checkpoint_id, (_, metadata, _) in saved.items()
+        ]
+        kept = self.policy.retained(history)
+        if len(kept) == len(saved):
+            return 0, 0
+
+        parents = {checkpoint_id: parent for checkpoint_id, (_, _, parent) in saved.items()}
+        for checkpoint_id, parent in relink(parents, kept).items():
+            checkpoint, metadata, _ = saved[checkpoint_id]
+            saved[checkpoint_id] = (checkpoint, metadata, parent)
+        writes = 0
+        for checkpoint_id in [c for c in saved if c not in kept]:
+            del saved[checkpoint_id]
+            writes += len(self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), ()))
+
+        # Channel values are shared between checkpoints by version: keep the referenced ones
+        referenced = {
+            (channel, version)
+            for checkpoint, _, _ in saved.values()
+            for channel, version in self.serde.loads_typed(checkpoint)["channel_versions"].items()
+        }
+        for key in [
+            k for k in self.blobs if k[0] == thread_id and k[1] == checkpoint_ns and (k[2], k[3]) not in referenced
+        ]:
+            del self.blobs[key]
+        return len(history) - len(kept), writes
+
+    def compact(self, thread_ids: Optional[Iterable[str]] = None) -> CompactionReport:
+        """
+        Apply the retention policy: delete expired threads and drop the checkpoints it does not keep.
+
+        Args:
+            thread_ids: Threads to compact (all of them if None); threads are
+                only deleted by TTL or LRU when compacting all of them
+
+        Returns:
+            What this compaction removed (also added to `report`)
+        """
+        start = time.perf_counter()
+        report = CompactionReport()
+        report.runs = 1
+        with self._lock:
+            if thread_ids is None:
+                threads = [thread_id for thread_id, namespaces in self.storage.items() if any(namespaces.values())]
+                for thread_id in threads:
+                    self._activity.setdefault(thread_id, time.time())
+                for thread_id in self.policy.expired({thread_id: self._activity[thread_id] for thread_id in threads}):
+                    report.checkpoints_dropped += sum(len(saved) for saved in self.storage.get(thread_id, {}).values())
+                    report.writes_dropped += sum(len(w) for k, w in self.writes.items() if k[0] == thread_id)
+                    self.delete_thread(thread_id)
+                    report.threads_deleted += 1
+                thread_ids = list(self.storage)
+            for thread_id in thread_ids:
+                for checkpoint_ns in list(self.storage.get(thread_id, {})):
+                    checkpoints, writes = self._compact_namespace(thread_id, checkpoint_ns)
+                    report.checkpoints_dropped += checkpoints
+                    report.writes_dropped += writes
+        report.seconds = time.perf_counter() - start
+        self.report.add(report)
+        return report
+
+    async def acompact(self, thread_ids: Optional[Iterable[str]] = None) -> CompactionReport:
+        return self.compact(thread_ids)
+
+    def size(self) -> Dict[str, int]:
+        """Threads, checkpoints and serialized bytes currently held."""
+        with self._lock:
+            return memory_size(self)
@@ -0,0 +1,174 @@
+"""
+Append-only scratchpad backed by a LangGraph BaseStore.
+
+Every note is stored as its own item in a per-thread namespace, keyed by a
+zero-padded sequence number. Writes never overwrite earlier notes and reads
+fetch a contiguous page of keys, so the cost of a read depends on the page
+size rather than on how many notes the thread has accumulated.
+
+When the store is created with an index (embeddings), each note is embedded
+as it is written and `search_notes` returns only the notes most relevant to
+a query, packed under a token budget.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.store.base import BaseStore, GetOp
+
+
+# Default number of notes returned by a single read
+DEFAULT_PAGE_SIZE = 10
+
+# Default token budget of a query-driven read
+DEFAULT_TOKEN_BUDGET = 1000
+
+# Key of the per-thread counter item
+COUNTER_KEY = "counter"
+
+
+def get_thread_id(config: Optional[RunnableConfig]) -> str:
+    """Get the thread id from a runnable config (falls back to 'default')."""
+    if not config:
+        return "default"
+    return str(config.get("configurable", {}).get("thread_id") or "default")
+
+
+def notes_namespace(thread_id: str) -> Tuple[str, ...]:
+    """Namespace holding the note entries of a thread."""
+    return ("scratchpad", thread_id, "notes")
+
+
+def meta_namespace(thread_id: str) -> Tuple[str, ...]:
+    """Namespace holding the bookkeeping items of a thread."""
+    return ("scratchpad", thread_id, "meta")
+
+
+def note_key(index: int) -> str:
+    """Store key for the note at the given position (sorts lexicographically)."""
+    return f"{index:08d}"
+
+
+def get_note_count(store: BaseStore, thread_id: str) -> int:
+    """Return how many notes have been written to the thread's scratchpad."""
+    item = store.get(meta_namespace(thread_id), COUNTER_KEY)
+    return item.value["count"] if item else 0
+
+
+def append_note(store: BaseStore, thread_id: str, notes: str) -> int:
+    """
+    Append a new note entry to the scratchpad.
+
+    Args:
+        store: Store backing the scratchpad
+        thread_id: Conversation thread the note belongs to
+        notes: Note text to save
+
+    Returns:
+        Index of the new note
+    """
+    index = get_note_count(store, thread_id)
+    # Only the note text is embedded (if the store has an index); the counter never is
+    store.put(notes_namespace(thread_id), note_key(index), {"index": index, "notes": notes}, index=["notes"])
+    store.put(meta_namespace(thread_id), COUNTER_KEY, {"count": index + 1}, index=False)
+    return index
+
+
+def read_notes(
+    store: BaseStore,
+    thread_id: str,
+    start: int = 0,
+    limit: int = DEFAULT_PAGE_SIZE,
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Read a page of notes starting at the given index.
+
+    Args:
+        store: Store backing the scratchpad
+        thread_id: Conversation thread to read from
+        start: Index of the first note to return
+        limit: Maximum number of notes to return
+
+    Returns:
+        Tuple of (notes on the page, total number of notes in the scratchpad)
+    """
+    total = get_note_count(store, thread_id)
+    start = max(start, 0)
+    end = min(start + max(limit, 0), total)
+    if start >= end:
+        return [], total
+
+    # Fetch only the keys on the requested page in a single batch
+    namespace = notes_namespace(thread_id)
+    items = store.batch([GetOp(namespace, note_key(i)) for i in range(start, end)])
+    return [item.value for item in items if item is not None], total
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token)."""
+    return max(1, len(text) // 4)
+
+
+def search_notes(
+    store: BaseStore,
+    thread_id: str,
+    query: str,
+    limit: int = DEFAULT_PAGE_SIZE,
+    max_tokens: int = DEFAULT_TOKEN_BUDGET,
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Return the notes most relevant to a query, under a token budget.
+
+    Requires a store created with an index, e.g.
+    InMemoryStore(index={"embed": embeddings, "dims": 1536}).
+
+    Args:
+        store: Store backing the scratchpad
+        thread_id: Conversation thread to search
+        query: What the agent is looking for
+        limit: Maximum number of notes to return (top-k)
+        max_tokens: Token budget for the returned note text
+
+    Returns:
+        Tuple of (notes ordered by relevance, total number of notes in the scratchpad)
+    """
+    total = get_note_count(store, thread_id)
+    results = store.search(notes_namespace(thread_id), query=query, limit=limit)
+
+    # Pack the best matches until the budget is used up; trim the first one if it alone is too long
+    notes, used = [], 0
+    for item in results:
+        note = dict(item.value, score=item.score)
+        tokens = estimate_tokens(note["notes"])
+        if used + tokens > max_tokens:
+            if notes:
+                break
+            note["notes"] = note["notes"][: max_tokens * 4] + " ..."
+            tokens = max_tokens
+        notes.append(note)
+        used += tokens
+    return notes, total
+
+
+def format_notes(notes: List[Dict[str, Any]], total: int) -> str:
+    """Format a page of notes for a ToolMessage."""
+    if not notes:
+        return f"No new notes in the scratchpad ({total} notes in total)."
+
+    first, last = notes[0]["index"], notes[-1]["index"]
+    lines = [f"Notes {first + 1}-{last + 1} of {total}:"]
+    lines += [f"[{note['index'] + 1}] {note['notes']}" for note in notes]
+    remaining = total - (last + 1)
+    if remaining > 0:
+        lines.append(f"({remaining} more notes; read again to continue.)")
+    return "\n".join(lines)
+
+
+def format_search_results(notes: List[Dict[str, Any]], total: int, query: str) -> str:
+    """Format the notes returned by a query-driven read for a ToolMessage."""
+    if not notes:
+        return f"No notes matching '{query}' ({total} notes in total)."
+
+    lines = [f"{len(notes)} most relevant notes for '{query}' ({total} notes in total):"]
+    lines += [f"[{note['index'] + 1}] {note['notes']}" for note in notes]
+    return "\n".join(lines)
@@ -0,0 +1,392 @@
+"""
+Cached and replayable web search for TavilySearch tools.
+
+`cached_search_tool(TavilySearch(...))` returns a drop-in tool (same name,
+description and argument schema) that adds:
+
+- an on-disk SQLite result cache with a TTL and LRU eviction, shared across
+  threads, graphs and restarts
+- single-flight de-duplication, so concurrent identical queries trigger one
+  backend call
+- record/replay: `record` saves every backend result to a JSON cassette,
+  `replay` serves the cassette through a local stand-in backend (no network)
+
+The mode is picked with the SEARCH_MODE environment variable (live, record,
+replay or off). Hit rate and latency are tracked in `SearchStats`.
+"""
+
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from langchain_core.tools import BaseTool, StructuredTool
+
+
+# Defaults, overridable through the SEARCH_CACHE_DIR, SEARCH_CACHE_TTL and
+# SEARCH_CACHE_MAX_ENTRIES environment variables
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "my-langgraph-studies"
+DEFAULT_TTL_SECONDS = 24 * 3600.0
+DEFAULT_MAX_ENTRIES = 2000
+
+SEARCH_MODES = ("live", "record", "replay", "off")
+
+
+def cache_dir() -> Path:
+    """Cache directory: SEARCH_CACHE_DIR (read on each call, so a later load_dotenv applies) or the default."""
+    return Path(os.environ.get("SEARCH_CACHE_DIR") or DEFAULT_CACHE_DIR).expanduser()
+
+
+def search_key(args: Dict[str, Any]) -> str:
+    """Stable cache key for a set of search arguments (unset arguments are ignored)."""
+    normalized = {k: v for k, v in sorted(args.items()) if v is not None}
+    payload = json.dumps(normalized, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ============================================================================
+# RESULT CACHE
+# ============================================================================
+
+class SearchCache:
+    """SQLite-backed search result cache with a TTL and LRU eviction.
+
+    The database (and its directory) is only created by the first stored
+    result, so building a cached tool at import time touches no files.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl_seconds: Optional[float] = None,
+        max_entries: Optional[int] = None,
+    ) -> None:
+        """
+        Args:
+            path: Database file (defaults to search_cache.sqlite in the cache directory)
+            ttl_seconds: Age after which a result expires (defaults to SEARCH_CACHE_TTL, then a day)
+            max_entries: Results kept before LRU eviction (defaults to SEARCH_CACHE_MAX_ENTRIES, then 2000)
+        """
+        self.path = Path(path).expanduser() if path else cache_dir() / "search_cache.sqlite"
+        if ttl_seconds is None:
+            ttl_seconds = float(os.environ.get("SEARCH_CACHE_TTL") or DEFAULT_TTL_SECONDS)
+        if max_entries is None:
+            max_entries = int(os.environ.get("SEARCH_CACHE_MAX_ENTRIES") or DEFAULT_MAX_ENTRIES)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self, create: bool) -> Optional[sqlite3.Connection]:
+        """Open the database on first use (caller holds the lock); None if it does not exist and create is False."""
+        if self._conn is None:
+            if not create and not self.path.exists():
+                return None
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            with self._conn:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS search_cache ("
+                    " key TEXT PRIMARY KEY,"
+                    " value TEXT NOT NULL,"
+                    " created_at REAL NOT NULL,"
+                    " accessed_at REAL NOT NULL)"
+                )
+                self._conn.execute(
+                    "CREATE INDEX IF NOT EXISTS search_cache_accessed ON search_cache (accessed_at)"
+                )
+        return self._conn
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached result, or None if missing or expired."""
+        now = time.time()
+        with self._lock:
+            conn = self._connection(create=False)
+            if conn is None:
+                return None
+            with conn:
+                row = conn.execute(
+                    "SELECT value, created_at FROM search_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                value, created_at = row
+                if now - created_at > self.ttl_seconds:
+                    conn.execute("DELETE FROM search_cache WHERE key = ?", (key,))
+                    return None
+                conn.execute("UPDATE search_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(value)
+
+    def put(self, key: str, value: Any) -> None:
+        """Store a result and evict the least recently used entries above the size limit."""
+        now = time.time()
+        with self._lock:
+            conn = self._connection(create=True)
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO search_cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(value, default=str), now, now),
+                )
+                conn.execute(
+                    "DELETE FROM search_cache WHERE key IN ("
+                    " SELECT key FROM search_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+
+    def clear(self) -> None:
+        """Remove every cached result."""
+        with self._lock:
+            conn = self._connection(create=False)
+            if conn is not None:
+                with conn:
+                    conn.execute("DELETE FROM search_cache")
+
+    def __len__(self) -> int:
+        with self._lock:
+            conn = self._connection(create=False)
+            return conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0] if conn is not None else 0
+
+
+# ============================================================================
+# BACKENDS
+# ============================================================================
+
+class LocalSearchBackend:
+    """Stand-in search backend that returns deterministic fake results after a delay.
+
+    Useful to measure caching behaviour offline, without API keys or network.
+    """
+
+    def __init__(self, latency: float = 0.2, jitter: float = 0.0) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency + random.uniform(0, self.jitter))
+        query = args.get("query", "")
+        return {
+            "query": query,
+            "results": [
+                {"title": f"Result {i + 1} for {query}", "url": f"https://example.com/{i}", "content": f"About {query}."}
+                for i in range(args.get("max_results") or 2)
+            ],
+        }
+
+
+class ReplayBackend:
+    """Backend that serves results recorded in a cassette file.
+
+    Raises:
+        LookupError: If the query was never recorded
+    """
+
+    def __init__(self, cassette_path: str, latency: float = 0.0) -> None:
+        self.cassette_path = Path(cassette_path)
+        self.latency = latency
+        self.calls = 0
+        with open(self.cassette_path, encoding="utf-8") as f:
+            self.recordings = json.load(f)
+
+    def __call__(self, args: Dict[str, Any]) -> Any:
+        self.calls += 1
+        key = search_key(args)
+        if key not in self.recordings:
+            raise LookupError(f"Search not recorded in {self.cassette_path}: {args}")
+        time.sleep(self.latency)
+        return self.recordings[key]["result"]
+
+
+class RecordingBackend:
+    """Backend wrapper that appends every result it returns to a cassette file."""
+
+    def __init__(self, backend: Callable[[Dict[str, Any]], Any], cassette_path: str) -> None:
+        self.backend = backend
+        self.cassette_path = Path(cassette_path)
+        self.cassette_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.recordings = {}
+        if self.cassette_path.exists():
+            with open(self.cassette_path, encoding="utf-8") as f:
+                self.recordings = json.load(f)
+
+    def __call__(self, args: Dict[str, Any]) -> Any:
+        result = self.backend(args)
+        with self._lock:
+            self.recordings[search_key(args)] = {"args": args, "result": result}
+            with open(self.cassette_path, "w", encoding="utf-8") as f:
+                json.dump(self.recordings, f, indent=2, default=str)
+        return result
+
+
+# ============================================================================
+# CACHED SEARCH
+# ============================================================================
+
+class SearchStats:
+    """Counters and latencies of a CachedSearch.
+
+    Only the last `max_latencies` latencies are kept, so a long-running server
+    does not grow without bound; the percentiles cover those.
+    """
+
+    def __init__(self, max_latencies: int = 10_000) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.latencies: deque = deque(maxlen=max_latencies)
+        self._lock = threading.Lock()
+
+    def record(self, outcome: str, latency: float) -> None:
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+            self.latencies.append(latency)
+
+    @property
+    def requests(self) -> int:
+        return self.hits + self.misses + self.coalesced + self.errors
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of requests served without their own backend call."""
+        return (self.hits + self.coalesced) / self.requests if self.requests else 0.0
+
+    def percentile(self, q: float) -> float:
+        """Latency percentile in seconds (q between 0 and 100)."""
+        with self._lock:
+            ordered = sorted(self.latencies)
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "hit_rate": round(self.hit_rate, 3),
+            "p50_ms": round(self.percentile(50) * 1000, 2),
+            "p95_ms": round(self.percentile(95) * 1000, 2),
+        }
+
+
+class CachedSearch:
+    """Search callable with a result cache and single-flight de-duplication."""
+
+    def __init__(self, backend: Callable[[Dict[str, Any]], Any], cache: Optional[SearchCache] = None) -> None:
+        self.backend = backend
+        self.cache = cache
+        self.stats = SearchStats()
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+
+    def __call__(self, args: Dict[str, Any]) -> Any:
+        start = time.perf_counter()
+        key = search_key(args)
+
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.stats.record("hits", time.perf_counter() - start)
+                return cached
+
+        # Join an identical search that is already running, or become its leader
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader and self.cache is not None:
+                # The previous leader may have stored the result since the check above
+                cached = self.cache.get(key)
+                if cached is not None:
+                    self.stats.record("hits", time.perf_counter() - start)
+                    return cached
+            if leader:
+                future = self._in_flight[key] = Future()
+
+        if not leader:
+            result = future.result()
+            self.stats.record("coalesced", time.perf_counter() - start)
+            return result
+
+        try:
+            result = self.backend(args)
+            # Tavily reports failures as {"error": ...}; never cache those
+            if self.cache is not None and not (isinstance(result, dict) and "error" in result):
+                self.cache.put(key, result)
+            future.set_result(result)
+        except Exception as e:
+            future.set_exception(e)
+            self.stats.record("errors", time.perf_counter() - start)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+        self.stats.record("misses", time.perf_counter() - start)
+        return result
+
+
+def cached_search_tool(
+    search_tool: BaseTool,
+    mode: Optional[str] = None,
+    cache: Optional[SearchCache] = None,
+    cassette_path: Optional[str] = None,
+) -> BaseTool:
+    """
+    Wrap a search tool (e.g. TavilySearch) with caching and record/replay.
+
+    Args:
+        search_tool: Tool performing the actual web search
+        mode: 'live' (cache + backend), 'record' (backend, saved to the cassette),
+            'replay' (cassette only, no network) or 'off' (no caching).
+            Defaults to the SEARCH_MODE environment variable, then 'live'.
+        cache: Result cache to use in live mode (defaults to the shared on-disk cache)
+        cassette_path: Cassette file for record/replay (defaults to SEARCH_CASSETTE
+            or cassette.json in the cache directory)
+
+    Returns:
+        Tool with the same name, description and arguments as `search_tool`.
+        The underlying CachedSearch (and its stats) is available in
+        `tool.metadata["cached_search"]`.
+    """
+    mode = (mode or os.environ.get("SEARCH_MODE", "live")).lower()
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"Unknown search mode: {mode}. Use one of {SEARCH_MODES}")
+    cassette_path = str(Path(cassette_path or os.environ.get("SEARCH_CASSETTE") or cache_dir() / "cassette.json").expanduser())
+
+    def call_search_tool(args: Dict[str, Any]) -> Any:
+        return search_tool.invoke(args)
+
+    if mode == "live":
+        cached = CachedSearch(call_search_tool, cache or SearchCache())
+    elif mode == "record":
+        cached = CachedSearch(RecordingBackend(call_search_tool, cassette_path))
+    elif mode == "replay":
+        cached = CachedSearch(ReplayBackend(cassette_path))
+    else:
+        cached = CachedSearch(call_search_tool)
+
+    def search(**kwargs: Any) -> Any:
+        return cached(kwargs)
+
+    return StructuredTool.from_function(
+        func=search,
+        name=search_tool.name,
+        description=search_tool.description,
+        args_schema=search_tool.args_schema,
+        metadata={"cached_search": cached},
+    )